@@ -1,11 +1,10 @@
 from django.contrib import admin
-from .models import User, Product, UnitOfMeasure, DeliveryZone, Order, OrderItem, Address, Category, Coupon
+from .models import User, Product, UnitOfMeasure, DeliveryZone, Order, OrderItem, Address, Category, Coupon, OrderSyncOutbox, WalletEntry
 
 admin.site.register(User)
 admin.site.register(UnitOfMeasure)
 # admin.site.register(DeliveryZone) - registered via decorator below
 admin.site.register(Category)
-admin.site.register(Coupon)
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
@@ -25,3 +24,21 @@ class OrderItemInline(admin.TabularInline):
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'total_price', 'payment_status', 'delivery_status', 'is_cod')
     inlines = [OrderItemInline]
+
+@admin.register(OrderSyncOutbox)
+class OrderSyncOutboxAdmin(admin.ModelAdmin):
+    list_display = ('order', 'status', 'attempts', 'next_attempt_at', 'last_error')
+    list_filter = ('status',)
+
+@admin.register(WalletEntry)
+class WalletEntryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'amount', 'balance_after', 'order', 'reference', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('user__phone_number', 'reference')
+
+@admin.register(Coupon)
+class CouponAdmin(admin.ModelAdmin):
+    list_display = ('code', 'discount_type', 'discount_amount', 'discount_percent', 'times_used', 'usage_limit', 'is_active')
+    list_filter = ('discount_type', 'is_active', 'stackable')
+    readonly_fields = ('times_used',)
+    filter_horizontal = ('products', 'categories')
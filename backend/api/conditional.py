@@ -0,0 +1,53 @@
+"""
+Conditional GET support for the catalog endpoints.
+
+Validators are computed from cheap aggregate queries, never from the
+response body, so a matching If-None-Match / If-Modified-Since is
+answered with a 304 before anything is fetched or serialized.
+Product.updated_at is the source of truth; Category and UnitOfMeasure
+changes touch their products (see api/signals.py) so the validators move.
+Collections (product and category lists) only send an ETag: removing a
+member leaves every remaining timestamp alone, so Last-Modified could
+not tell a client its copy is stale.
+"""
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(*parts):
+    raw = '|'.join(repr(p) for p in parts)
+    return '"%s"' % hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+
+def product_validators(queryset, *params):
+    """
+    (etag, last_modified) for a filtered product set: max(updated_at) plus
+    a count, so deletions and deactivations change it too. `params` are
+    folded into the ETag (page, search, ...). One aggregate query.
+    """
+    agg = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    last_modified = agg['last_modified']
+    return make_etag(last_modified, agg['count'], *params), last_modified
+
+
+def not_modified(request, etag, last_modified=None):
+    """The 304 response if the client's copy is current, else None."""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Let clients keep the copy, but always revalidate it
+    patch_cache_control(response, no_cache=True)
+    return response
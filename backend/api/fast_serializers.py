@@ -0,0 +1,137 @@
+"""
+Fast-path serializers for catalog list endpoints.
+
+These read `.values()` rows (unit fields joined in) and build exactly the
+JSON shape of ProductSerializer, WishlistSerializer and
+SubscriptionSerializer without DRF field machinery. Field keys are
+resolved once per row serializer, not once per row.
+api/tests/test_fast_serializers.py checks byte-for-byte parity with the
+DRF serializers, so any change to those serializers must be mirrored here.
+"""
+from decimal import Context, Decimal
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+PRODUCT_ROW_FIELDS = (
+    'id', 'name', 'slug', 'description', 'image',
+    'base_price', 'discounted_price',
+    'pricing_unit__id', 'pricing_unit__name', 'pricing_unit__symbol',
+    'weight_value',
+    'weight_unit__id', 'weight_unit__name', 'weight_unit__symbol',
+    'is_organic', 'is_active',
+)
+
+_CENT = Decimal('0.01')
+_DECIMAL_CONTEXT = Context(prec=10)  # DecimalField(max_digits=10, decimal_places=2)
+
+
+def format_decimal(value):
+    """Same string DRF's DecimalField produces for max_digits=10, decimal_places=2."""
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value).strip())
+    return '{:f}'.format(value.quantize(_CENT, context=_DECIMAL_CONTEXT))
+
+
+def format_datetime(value):
+    """Same string DRF's DateTimeField produces (ISO 8601, UTC as 'Z')."""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def format_date(value):
+    return value.isoformat() if value is not None else None
+
+
+class ProductRowSerializer:
+    """Serializes product `.values()` rows; `prefix` supports joined rows ('product__')."""
+
+    def __init__(self, prefix='', request=None):
+        self.fields = tuple(prefix + f for f in PRODUCT_ROW_FIELDS)
+        self.request = request
+
+    def image_url(self, name):
+        if not name:
+            return None
+        url = default_storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+    def __call__(self, row):
+        (pk, name, slug, description, image, base_price, discounted_price,
+         pu_id, pu_name, pu_symbol, weight_value, wu_id, wu_name, wu_symbol,
+         is_organic, is_active) = [row[f] for f in self.fields]
+        return {
+            'id': str(pk),
+            'name': name,
+            'slug': slug,
+            'description': description,
+            'image': self.image_url(image),
+            'base_price': format_decimal(base_price),
+            'discounted_price': format_decimal(discounted_price),
+            'pricing_unit': {'id': pu_id, 'name': pu_name, 'symbol': pu_symbol} if pu_id is not None else None,
+            'weight_value': format_decimal(weight_value),
+            'weight_unit': {'id': wu_id, 'name': wu_name, 'symbol': wu_symbol} if wu_id is not None else None,
+            'is_organic': is_organic,
+            'trust_badge': "Certified Organic" if is_organic else None,
+            'is_active': is_active,
+        }
+
+    def many(self, rows):
+        return [self(row) for row in rows]
+
+
+def product_values(qs, prefix='', *extra):
+    """`.values()` over a queryset with every column ProductRowSerializer needs."""
+    return qs.values(*(prefix + f for f in PRODUCT_ROW_FIELDS), *extra)
+
+
+def serialize_products(qs, request=None):
+    return ProductRowSerializer(request=request).many(product_values(qs))
+
+
+def serialize_wishlist(qs, request=None):
+    """Fast equivalent of WishlistSerializer(qs, many=True).data."""
+    product = ProductRowSerializer(prefix='product__', request=request)
+    return [
+        {
+            'id': row['id'],
+            'user': row['user_id'],
+            'product': str(row['product_id']),
+            'product_details': product(row),
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in product_values(qs, 'product__', 'id', 'user_id', 'product_id', 'created_at')
+    ]
+
+
+def serialize_subscriptions(qs, request=None):
+    """Fast equivalent of SubscriptionSerializer(qs, many=True).data."""
+    product = ProductRowSerializer(prefix='product__', request=request)
+    return [
+        {
+            'id': str(row['id']),
+            'user': row['user_id'],
+            'product': str(row['product_id']),
+            'product_details': product(row),
+            'quantity': row['quantity'],
+            'address': row['address_id'],
+            'frequency': row['frequency'],
+            'status': row['status'],
+            'start_date': format_date(row['start_date']),
+            'next_delivery_date': format_date(row['next_delivery_date']),
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in product_values(
+            qs, 'product__', 'id', 'user_id', 'product_id', 'quantity', 'address_id', 'frequency',
+            'status', 'start_date', 'next_delivery_date', 'created_at',
+        )
+    ]
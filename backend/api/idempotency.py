@@ -0,0 +1,187 @@
+"""
+Idempotency-Key support for unsafe endpoints (order placement, payment
+webhooks).
+
+A request carrying an `Idempotency-Key` header is recorded, keyed by
+endpoint scope, caller and key, together with a fingerprint of its body:
+
+- the first request runs and its response (status < 500) is stored
+- a repeat with the same body gets that stored response back, marked
+  with `Idempotent-Replayed: true`, and the view does not run again
+- a repeat arriving while the first is still running waits for it,
+  up to WAIT_TIMEOUT, and then replays. If the wait runs out it gets a 409.
+- a reused key with a different body is rejected with 422
+- 5xx responses and exceptions release the key so the client can retry
+
+Records expire after TTL. They live in the IdempotencyRecord table or
+in the Django cache, per settings.IDEMPOTENCY['STORE']. The cache store
+only holds across workers when the cache is shared (Redis); with the
+per-process local-memory cache a duplicate on another worker runs again.
+"""
+import functools
+import hashlib
+import json
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils import encoders
+from .models import IdempotencyRecord
+
+DEFAULTS = {
+    'STORE': 'db',          # 'db' or 'cache' (shared caches only)
+    'TTL': 24 * 3600,       # seconds a key (and its response) is remembered
+    'WAIT_TIMEOUT': 10.0,   # seconds a concurrent duplicate waits for the first request
+    'LOCK_TIMEOUT': 60.0,   # an IN_PROGRESS record older than this is considered abandoned
+    'POLL_INTERVAL': 0.05,
+}
+MAX_KEY_LENGTH = 200
+IN_PROGRESS, DONE = 'IN_PROGRESS', 'DONE'
+
+
+def get_option(name):
+    return getattr(settings, 'IDEMPOTENCY', {}).get(name, DEFAULTS[name])
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=encoders.JSONEncoder)
+    raw = f"{request.method}|{request.path}|{body}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _jsonable(data):
+    return json.loads(json.dumps(data, cls=encoders.JSONEncoder))
+
+
+class CacheStore:
+    """Records in the Django cache; claims rely on the atomicity of cache.add()."""
+
+    def _key(self, key):
+        return f"idempotency:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+
+    def claim(self, key, fingerprint):
+        """None if this caller now owns the key, else the existing record."""
+        record = {'fingerprint': fingerprint, 'state': IN_PROGRESS, 'started_at': time.time()}
+        if cache.add(self._key(key), record, timeout=get_option('TTL')):
+            return None
+        return cache.get(self._key(key)) or self.claim(key, fingerprint)
+
+    def complete(self, key, fingerprint, status_code, body):
+        cache.set(self._key(key), {
+            'fingerprint': fingerprint, 'state': DONE,
+            'status': status_code, 'body': body, 'started_at': time.time(),
+        }, timeout=get_option('TTL'))
+
+    def release(self, key):
+        cache.delete(self._key(key))
+
+
+class DatabaseStore:
+    """Records in IdempotencyRecord; claims rely on the unique key constraint."""
+
+    def claim(self, key, fingerprint):
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                IdempotencyRecord.objects.create(
+                    key=key, fingerprint=fingerprint,
+                    expires_at=now + timedelta(seconds=get_option('TTL')),
+                )
+            return None
+        except IntegrityError:
+            pass
+
+        row = IdempotencyRecord.objects.filter(key=key).first()
+        if row is None or row.expires_at <= now:
+            IdempotencyRecord.objects.filter(key=key, expires_at__lte=now).delete()
+            return self.claim(key, fingerprint)
+        return {
+            'fingerprint': row.fingerprint, 'state': row.state,
+            'status': row.response_status, 'body': row.response_body,
+            'started_at': row.created_at.timestamp(),
+        }
+
+    def complete(self, key, fingerprint, status_code, body):
+        IdempotencyRecord.objects.filter(key=key, fingerprint=fingerprint).update(
+            state=DONE, response_status=status_code, response_body=body,
+            expires_at=timezone.now() + timedelta(seconds=get_option('TTL')),
+        )
+
+    def release(self, key):
+        IdempotencyRecord.objects.filter(key=key, state=IN_PROGRESS).delete()
+
+
+def get_store():
+    return DatabaseStore() if get_option('STORE') == 'db' else CacheStore()
+
+
+def purge_expired():
+    """Delete expired DB records (cache records expire by themselves). Returns the count."""
+    return IdempotencyRecord.objects.filter(expires_at__lte=timezone.now()).delete()[0]
+
+
+def _error(message, status_code):
+    return Response({'error': message}, status=status_code)
+
+
+def idempotent(scope, fallback_key=None):
+    """
+    Decorator for APIView handlers. `fallback_key(request)` supplies a key
+    when the client sends no header (e.g. a provider's payment id).
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = request.headers.get('Idempotency-Key') or (fallback_key and fallback_key(request))
+            if not key:
+                return handler(view, request, *args, **kwargs)
+            key = str(key)
+            if len(key) > MAX_KEY_LENGTH:
+                return _error('Idempotency-Key is too long', status.HTTP_400_BAD_REQUEST)
+
+            user = getattr(request, 'user', None)
+            owner = user.pk if user is not None and user.is_authenticated else 'anon'
+            record_key = f"{scope}:{owner}:{key}"
+            fingerprint = request_fingerprint(request)
+            store = get_store()
+
+            deadline = time.monotonic() + get_option('WAIT_TIMEOUT')
+            while True:
+                record = store.claim(record_key, fingerprint)
+                if record is None:
+                    break
+                if record['fingerprint'] != fingerprint:
+                    return _error(
+                        'Idempotency-Key was already used for a different request',
+                        status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    )
+                if record['state'] == DONE:
+                    response = Response(record['body'], status=record['status'])
+                    response['Idempotent-Replayed'] = 'true'
+                    return response
+                if time.time() - record['started_at'] > get_option('LOCK_TIMEOUT'):
+                    store.release(record_key)  # the first request died; take over
+                    continue
+                if time.monotonic() >= deadline:
+                    return _error(
+                        'A request with this Idempotency-Key is still being processed',
+                        status.HTTP_409_CONFLICT,
+                    )
+                time.sleep(get_option('POLL_INTERVAL'))
+
+            try:
+                response = handler(view, request, *args, **kwargs)
+            except Exception:
+                store.release(record_key)
+                raise
+            if response.status_code >= 500 or not hasattr(response, 'data'):
+                store.release(record_key)
+            else:
+                store.complete(record_key, fingerprint, response.status_code, _jsonable(response.data))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+"""
+Shared helpers for the bench_* / explain_* commands: synthetic data that is
+created inside a transaction and rolled back, plus a simple timer.
+"""
+import random
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from django.db import transaction
+from api.models import Product, Category, UnitOfMeasure
+
+VEGETABLES = [
+    'Tomato', 'Potato', 'Onion', 'Spinach', 'Okra', 'Cauliflower', 'Cabbage',
+    'Carrot', 'Radish', 'Ginger', 'Garlic', 'Coriander', 'Lemon', 'Brinjal',
+    'Pumpkin', 'Cucumber', 'Capsicum', 'Beetroot', 'Mango', 'Banana',
+]
+ADJECTIVES = ['Organic', 'Desi', 'Fresh', 'Hybrid', 'Farm', 'Hill', 'Baby', 'Red', 'Green']
+CATEGORIES = ['Vegetables', 'Fruits', 'Leafy Greens', 'Exotics', 'Staples', 'Herbs']
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def create_catalog(size, batch_size=2000, seed=42):
+    """Bulk-create `size` synthetic products. Returns the list of Product objects."""
+    rng = random.Random(seed)
+    kg, _ = UnitOfMeasure.objects.get_or_create(symbol='kg', defaults={'name': 'Kilogram'})
+    pc, _ = UnitOfMeasure.objects.get_or_create(symbol='pc', defaults={'name': 'Piece'})
+    categories = [
+        Category.objects.get_or_create(
+            slug=f"bench-{name.lower().replace(' ', '-')}", defaults={'name': name}
+        )[0]
+        for name in CATEGORIES
+    ]
+
+    products = []
+    for i in range(size):
+        veg = rng.choice(VEGETABLES)
+        name = f"{rng.choice(ADJECTIVES)} {veg} {i}"
+        unit = rng.choice((kg, pc))
+        products.append(Product(
+            name=name,
+            slug=f"bench-product-{i}",
+            description=f"{name} sourced directly from certified farms. Rich in flavour.",
+            category=rng.choice(categories),
+            external_id=f"bench-{i}",
+            base_price=Decimal(rng.randint(10, 400)),
+            discounted_price=Decimal(rng.randint(5, 300)) if i % 3 == 0 else None,
+            pricing_unit=unit,
+            weight_value=Decimal('1.00'),
+            weight_unit=kg,
+            is_organic=i % 2 == 0,
+        ))
+    for start in range(0, size, batch_size):
+        Product.objects.bulk_create(products[start:start + batch_size])
+    return products
+
+
+def timed(fn, repeat=5):
+    """Run fn `repeat` times. Returns (best_ms, mean_ms, last_result)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return min(durations), sum(durations) / len(durations), result
@@ -0,0 +1,91 @@
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from api.models import Category, Coupon, Order, Product, User
+from api.services import coupons, pricing
+from api.services.order_service import OrderService
+from ._synthetic import create_catalog
+
+CODE = 'BENCHFLASH'
+
+
+class Command(BaseCommand):
+    help = ('Flash sale: many concurrent checkouts race for a limited coupon. '
+            'Checks the limit holds and reports checkout throughput. Needs committed '
+            'rows for the threads, so it creates its data and deletes it afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--attempts', type=int, default=50, help='Checkouts per thread')
+        parser.add_argument('--limit', type=int, default=100, help='Coupon usage_limit')
+
+    def handle(self, *args, **options):
+        if Coupon.objects.filter(code=CODE).exists():
+            raise CommandError(f'{CODE} already exists; is another bench running?')
+        threads, attempts, limit = options['threads'], options['attempts'], options['limit']
+        products = create_catalog(20)
+        users = [User.objects.create_user(username=f'bench-flash-{i}', phone_number=f'bench-flash-{i}',
+                                          is_phone_verified=True) for i in range(threads)]
+        Coupon.objects.create(code=CODE, discount_type='PERCENT', discount_percent=50,
+                              max_discount=100, usage_limit=limit)
+        pricing.reset()
+        coupons.reset()
+        try:
+            outcomes, retries, seconds = self._run(users, products, attempts)
+            ok = outcomes.count('ok')
+            used = Coupon.objects.get(code=CODE).times_used
+            orders = Order.objects.filter(user__in=users).count()
+            self.stdout.write(
+                f"{threads} threads x {attempts} checkouts, limit {limit}: {ok} redeemed, "
+                f"{len(outcomes) - ok} refused, {retries} lock retries"
+            )
+            self.stdout.write(f"{len(outcomes) / seconds:.0f} checkouts/s ({seconds:.2f}s)")
+            expected = min(limit, threads * attempts)
+            if not ok == used == orders == expected:
+                raise CommandError(f'Limit broken: {ok} redeemed, times_used={used}, {orders} orders, expected {expected}')
+            self.stdout.write(self.style.SUCCESS('Limit held'))
+        finally:
+            Order.objects.filter(user__in=users).delete()
+            User.objects.filter(pk__in=[u.pk for u in users]).delete()
+            Coupon.objects.filter(code=CODE).delete()
+            Product.objects.filter(pk__in=[p.pk for p in products]).delete()
+            Category.objects.filter(slug__startswith='bench-', products__isnull=True).delete()
+
+    def _run(self, users, products, attempts):
+        outcomes, retries = [], [0]
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(users) + 1)
+
+        def checkout(user, product):
+            # SQLite serialises writers; a busy database is retried, not counted
+            for _ in range(500):
+                try:
+                    return OrderService().place_order(user, {
+                        'payment_method': 'COD', 'coupon_code': CODE,
+                        'items': [{'product_id': str(product.pk), 'quantity': 1}],
+                    })
+                except OperationalError:
+                    with lock:
+                        retries[0] += 1
+                    time.sleep(0.005)
+            raise CommandError('database stayed locked')
+
+        def shop(user, index):
+            barrier.wait()
+            try:
+                for attempt in range(attempts):
+                    order, error = checkout(user, products[(index + attempt) % len(products)])
+                    with lock:
+                        outcomes.append('ok' if order else error['user_msg'])
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=shop, args=(user, i)) for i, user in enumerate(users)]
+        for worker in workers:
+            worker.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        return outcomes, retries[0], time.perf_counter() - started
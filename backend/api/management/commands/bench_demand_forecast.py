@@ -0,0 +1,71 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.models import DeliveryZone, Subscription
+from api.services import demand_forecast, serviceability, subscriptions
+from ._synthetic import rolled_back, timed
+from .bench_pick_wave import count_queries
+from .bench_subscriptions import populate_subscriptions
+
+
+def legacy_forecast(days, start):
+    """Walk every subscription day by day: one next_date() per delivery."""
+    end = start + timedelta(days=days)
+    totals = defaultdict(int)
+    for sub in Subscription.objects.filter(status='ACTIVE', product__is_active=True):
+        anchor = subscriptions.anchor(sub.frequency, sub.start_date)
+        day = sub.next_delivery_date
+        if day < start:
+            day = subscriptions.first_date(sub.frequency, start, sub.start_date)
+        while day < end:
+            totals[(sub.product_id, day)] += sub.quantity
+            day = subscriptions.next_date(sub.frequency, day, anchor)
+    return totals
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the subscription demand forecast against a per-subscription walk (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscriptions', type=int, default=100000)
+        parser.add_argument('--per-user', type=int, default=4)
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--repeat', type=int, default=2)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        start, days = today + timedelta(days=1), options['days']
+        with rolled_back():
+            populate_subscriptions(options['subscriptions'], options['per_user'], options['products'],
+                                   today, due_within=14)
+            # Pincodes are 208010..208040: four prefix zones and one exact row inside them
+            DeliveryZone.objects.bulk_create([
+                DeliveryZone(zip_code=rule, city='Kanpur', delivery_time_hrs=6)
+                for rule in ('20801x', '20802x', '20803x', '20804x', '208011')
+            ])
+            serviceability.invalidate()
+            groups = len(demand_forecast._grouped_demand(start, days))
+
+            legacy_queries = count_queries(lambda: legacy_forecast(days, start))
+            forecast_queries = count_queries(lambda: demand_forecast.forecast(days, start))
+            legacy_ms, _, totals = timed(lambda: legacy_forecast(days, start), options['repeat'])
+            forecast_ms, _, result = timed(lambda: demand_forecast.forecast(days, start), options['repeat'])
+
+            # Both must agree before the timings mean anything
+            grouped = {
+                (row['product_id'], result['dates'][offset]): quantity
+                for row in result['products'] for offset, quantity in enumerate(row['quantities']) if quantity
+            }
+            assert grouped == dict(totals), 'forecast disagrees with the per-subscription walk'
+
+            self.stdout.write(
+                f"{options['subscriptions']} subscriptions, {days} days: "
+                f"{sum(row['total'] for row in result['products'])} units over {len(result['products'])} products, "
+                f"{len(result['zones'])} zone rows, {groups} SQL groups"
+            )
+            self.stdout.write(f"{'':<12}{'queries':>10}{'best ms':>10}")
+            self.stdout.write(f"{'per-sub':<12}{legacy_queries:>10}{legacy_ms:>10.0f}")
+            self.stdout.write(f"{'grouped':<12}{forecast_queries:>10}{forecast_ms:>10.0f}")
+            self.stdout.write(f"speed-up {legacy_ms / forecast_ms:.1f}x")
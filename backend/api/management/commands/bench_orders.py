@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.models import Order, OrderItem, Product, User
+from api.services.adapters.local_adapter import LocalOrderAdapter
+from api.services.order_service import OrderService
+from ._synthetic import rolled_back, create_catalog, timed
+
+
+def legacy_place_order(user, data):
+    """The previous per-item path: two lookups and one INSERT per line, no transaction."""
+    order = Order.objects.create(user=user, total_price=data['total_price'], is_cod=True)
+    for item in data['items']:
+        product_id = item['product_id']
+        try:
+            product = Product.objects.get(external_id=str(product_id))
+        except Product.DoesNotExist:
+            try:
+                product = Product.objects.get(id=product_id)
+            except (Product.DoesNotExist, ValueError):
+                continue
+        OrderItem.objects.create(
+            order=order, product=product,
+            quantity=item['quantity'], price_at_purchase=item['price'],
+        )
+    return order
+
+
+class Command(BaseCommand):
+    help = 'Benchmark order placement (per-item vs set-based) at several basket sizes (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', nargs='+', type=int, default=[5, 30, 100])
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        service = OrderService(adapter=LocalOrderAdapter())
+        with rolled_back():
+            products = create_catalog(max(options['items']))
+            user = User.objects.create_user(
+                username='bench-orders', phone_number='bench-orders', is_phone_verified=True,
+            )
+            self.stdout.write(f"--- best of {repeat} ---")
+            self.stdout.write(
+                f"{'items':>6}{'legacy q':>10}{'orders/s':>10}{'new q':>8}{'orders/s':>10}{'speed-up':>10}"
+            )
+            for size in options['items']:
+                # Worst case for the old path: local UUIDs miss the external_id lookup first
+                data = {
+                    'payment_method': 'COD', 'total_price': 100,
+                    'items': [
+                        {'product_id': str(p.id), 'quantity': 1, 'price': p.base_price}
+                        for p in products[:size]
+                    ],
+                }
+                with CaptureQueriesContext(connection) as legacy_q:
+                    legacy_place_order(user, data)
+                with CaptureQueriesContext(connection) as new_q:
+                    service.place_order(user, data)
+
+                legacy_ms, _, _ = timed(lambda: legacy_place_order(user, data), repeat)
+                new_ms, _, _ = timed(lambda: service.place_order(user, data), repeat)
+                self.stdout.write(
+                    f"{size:>6}{len(legacy_q.captured_queries):>10}{1000 / legacy_ms:>10.0f}"
+                    f"{len(new_q.captured_queries):>8}{1000 / new_ms:>10.0f}{legacy_ms / new_ms:>9.1f}x"
+                )
@@ -0,0 +1,69 @@
+import random
+from django.core.management.base import BaseCommand
+from django.db import connection
+from api.models import Order, OrderItem, User
+from api.services import pick_waves
+from ._synthetic import rolled_back, create_catalog, timed
+
+
+def legacy_walk(cutoff):
+    """The per-order walk: load each open order, then its items and products."""
+    picks = {}
+    for order in pick_waves.wave_orders(cutoff).order_by('created_at'):
+        for item in order.items.all():
+            key = (item.product.category_id, item.product.name)
+            picks[key] = picks.get(key, 0) + item.quantity
+    return picks
+
+
+def count_queries(fn):
+    """Queries run by fn (the debug query log caps out at 9000 entries)."""
+    count = 0
+
+    def counter(execute, sql, params, many, context):
+        nonlocal count
+        count += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(counter):
+        fn()
+    return count
+
+
+class Command(BaseCommand):
+    help = 'Benchmark pick-wave planning against the per-order walk (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=5000)
+        parser.add_argument('--items', type=int, default=6, help='Lines per order')
+        parser.add_argument('--products', type=int, default=300)
+        parser.add_argument('--repeat', type=int, default=2)
+
+    def handle(self, *args, **options):
+        rng = random.Random(7)
+        with rolled_back():
+            products = create_catalog(options['products'])
+            user = User.objects.create_user(username='bench-waves', phone_number='bench-waves')
+            orders = Order.objects.bulk_create([
+                Order(user=user, total_price=100, is_cod=True) for _ in range(options['orders'])
+            ], batch_size=2000)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=rng.randint(1, 3), price_at_purchase=10)
+                for order in orders
+                for product in rng.sample(products, options['items'])
+            ], batch_size=5000)
+            cutoff = max(order.created_at for order in orders)
+
+            legacy_queries = count_queries(lambda: legacy_walk(cutoff))
+            wave_queries = count_queries(lambda: pick_waves.plan_wave(cutoff))
+            legacy_ms, _, _ = timed(lambda: legacy_walk(cutoff), options['repeat'])
+            wave_ms, _, wave = timed(lambda: pick_waves.plan_wave(cutoff), options['repeat'])
+
+            self.stdout.write(
+                f"{wave['order_count']} orders, {wave['line_count']} lines, "
+                f"{sum(len(a['products']) for a in wave['aisles'])} products in {len(wave['aisles'])} aisles"
+            )
+            self.stdout.write(f"{'':<12}{'queries':>10}{'best ms':>10}")
+            self.stdout.write(f"{'per-order':<12}{legacy_queries:>10}{legacy_ms:>10.0f}")
+            self.stdout.write(f"{'wave':<12}{wave_queries:>10}{wave_ms:>10.0f}")
+            self.stdout.write(f"speed-up {legacy_ms / wave_ms:.1f}x")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.response import Response
+from api.fast_serializers import ProductRowSerializer, product_values
+from api.models import Product
+from api.renderers import StandardResponseRenderer
+from ._synthetic import rolled_back, create_catalog, timed
+
+
+class Command(BaseCommand):
+    help = 'Benchmark StandardResponseRenderer with and without the orjson fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        size, repeat = options['size'], options['repeat']
+        with rolled_back():
+            create_catalog(size)
+            payload = ProductRowSerializer().many(
+                product_values(Product.objects.filter(slug__startswith='bench-product-'))
+            )
+
+        renderer = StandardResponseRenderer()
+        context = {'response': Response()}
+
+        def render():
+            return renderer.render(payload, 'application/json', context)
+
+        with override_settings(FAST_JSON_RENDERER=False):
+            slow_ms, _, slow_body = timed(render, repeat)
+        fast_ms, _, fast_body = timed(render, repeat)
+
+        self.stdout.write(f"--- {size} products, {len(fast_body) / 1024:.0f} KiB body (best of {repeat}) ---")
+        self.stdout.write(f"stdlib JSONRenderer: {slow_ms:8.2f} ms  ({size / slow_ms * 1000:10.0f} products/s)")
+        self.stdout.write(f"orjson fast path:    {fast_ms:8.2f} ms  ({size / fast_ms * 1000:10.0f} products/s)")
+        self.stdout.write(f"speed-up: {slow_ms / fast_ms:.1f}x, identical output: {fast_body == slow_body}")
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from api.services.adapters.local_adapter import LocalProductAdapter
+from api.services import search_engine
+from ._synthetic import rolled_back, create_catalog, timed
+
+QUERIES = ['tomato', 'tomoto', 'palak', 'org pot', 'ginger fresh', 'zzzz']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the search index against the name__icontains path (synthetic data, rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000])
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        adapter = LocalProductAdapter()
+        for size in options['sizes']:
+            with rolled_back():
+                self.stdout.write(f"--- {size} products ---")
+                create_catalog(size)
+
+                search_engine.reset()
+                build_ms, _, index = timed(search_engine.get_index, repeat=1)
+                self.stdout.write(f"Index build: {build_ms:.1f} ms ({len(index)} docs)")
+
+                self.stdout.write(f"{'query':<14}{'icontains ms':>14}{'hits':>7}{'index ms':>12}{'hits':>7}")
+                for query in QUERIES:
+                    with override_settings(PRODUCT_SEARCH_INDEX=False):
+                        db_ms, _, db_rows = timed(
+                            lambda: adapter.list_products(search=query, per_page=100),
+                            options['repeat'],
+                        )
+                    with override_settings(PRODUCT_SEARCH_INDEX=True):
+                        idx_ms, _, idx_rows = timed(
+                            lambda: adapter.list_products(search=query, per_page=100),
+                            options['repeat'],
+                        )
+                    self.stdout.write(
+                        f"{query:<14}{db_ms:>14.2f}{len(db_rows):>7}{idx_ms:>12.2f}{len(idx_rows):>7}"
+                    )
+                search_engine.reset()
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from api.fast_serializers import ProductRowSerializer, product_values
+from api.models import Product
+from api.serializers import ProductSerializer
+from ._synthetic import rolled_back, create_catalog, timed
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ProductSerializer against the fast-path row serializer per 1,000 products'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        size, repeat = options['size'], options['repeat']
+        with rolled_back():
+            create_catalog(size)
+            qs = Product.objects.filter(slug__startswith='bench-product-').order_by('name')
+            instances = list(qs.select_related('category', 'pricing_unit', 'weight_unit'))
+            rows = list(product_values(qs))
+
+            drf_ms, _, _ = timed(lambda: ProductSerializer(instances, many=True).data, repeat)
+            fast_ms, _, _ = timed(lambda: ProductRowSerializer().many(rows), repeat)
+            drf_e2e, _, _ = timed(lambda: ProductSerializer(
+                qs.select_related('category', 'pricing_unit', 'weight_unit'), many=True
+            ).data, repeat)
+            fast_e2e, _, _ = timed(lambda: ProductRowSerializer().many(product_values(qs)), repeat)
+
+        per_k = 1000 / size
+        self.stdout.write(f"--- {size} products (best of {repeat}, ms per 1,000 products) ---")
+        self.stdout.write(f"{'':<22}{'DRF':>10}{'fast':>10}{'speed-up':>10}")
+        self.stdout.write(
+            f"{'serialize only':<22}{drf_ms * per_k:>10.2f}{fast_ms * per_k:>10.2f}{drf_ms / fast_ms:>9.1f}x"
+        )
+        self.stdout.write(
+            f"{'query + serialize':<22}{drf_e2e * per_k:>10.2f}{fast_e2e * per_k:>10.2f}{drf_e2e / fast_e2e:>9.1f}x"
+        )
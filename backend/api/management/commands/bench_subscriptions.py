@@ -0,0 +1,75 @@
+import random
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.models import Address, Order, OrderItem, Subscription, User
+from api.services import pricing, subscriptions
+from ._synthetic import rolled_back, create_catalog
+from .bench_pick_wave import count_queries
+
+
+def legacy_run(run_date):
+    """The per-subscription loop: one order, one item and one save each."""
+    for sub in Subscription.objects.filter(status='ACTIVE', next_delivery_date__lte=run_date).select_related('product'):
+        order = Order.objects.create(user_id=sub.user_id, total_price=sub.product.base_price * sub.quantity,
+                                     is_cod=True, is_subscription=True)
+        OrderItem.objects.create(order=order, product=sub.product, quantity=sub.quantity,
+                                 price_at_purchase=sub.product.base_price)
+        sub.next_delivery_date = subscriptions.next_date(
+            sub.frequency, run_date, subscriptions.anchor(sub.frequency, sub.start_date))
+        sub.save()
+
+
+def populate_subscriptions(size, per_user, products, today, due_within=0, seed=5):
+    """
+    `size` ACTIVE subscriptions, `per_user` per user, each user with a default
+    address. Each is due within `due_within` days of today (default: today).
+    """
+    rng = random.Random(seed)
+    products = create_catalog(products)
+    users = User.objects.bulk_create([
+        User(username=f'bench-sub-{i}', phone_number=f'bench-sub-{i}') for i in range(-(-size // per_user))
+    ], batch_size=2000)
+    Address.objects.bulk_create([
+        Address(user=user, name='Home', street='1 Main St', city='Kanpur',
+                zip_code=f'2080{rng.randint(10, 40)}', is_default=True)
+        for user in users
+    ], batch_size=2000)
+    frequencies = [code for code, _ in Subscription.FREQUENCY_CHOICES]
+    Subscription.objects.bulk_create([
+        Subscription(
+            user=users[i // per_user], product=rng.choice(products),
+            quantity=rng.randint(1, 3), frequency=rng.choice(frequencies),
+            start_date=today - timedelta(days=rng.randint(0, 60)), next_delivery_date=today + timedelta(days=rng.randint(0, due_within)),
+        )
+        for i in range(size)
+    ], batch_size=5000)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark a nightly subscription run against the per-subscription loop (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscriptions', type=int, default=100000)
+        parser.add_argument('--per-user', type=int, default=4)
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--legacy-sample', type=int, default=5000,
+                            help='Subscriptions to time the per-subscription loop on')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        for label, size, run in (
+            ('per-sub', options['legacy_sample'], lambda: legacy_run(today)),
+            ('bulk', options['subscriptions'], lambda: subscriptions.fulfil(today)),
+        ):
+            with rolled_back():
+                populate_subscriptions(size, options['per_user'], options['products'], today)
+                pricing.reset()
+                started = timezone.now()
+                queries = count_queries(run)
+                seconds = (timezone.now() - started).total_seconds()
+                self.stdout.write(
+                    f"{label:<8}{size:>8} subs{queries:>9} queries{seconds:>9.2f}s"
+                    f"{size / seconds:>10.0f} subs/s"
+                )
+            pricing.reset()
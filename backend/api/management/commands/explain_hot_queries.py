@@ -0,0 +1,169 @@
+import random
+import re
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+from api.models import (
+    Address, Order, OrderItem, OrderSyncOutbox, Subscription, User, WalletEntry, Wishlist,
+)
+from api.services import pick_waves
+from api.services.adapters.local_adapter import LocalProductAdapter
+from ._synthetic import rolled_back, create_catalog
+
+# SQLite: "SCAN api_order" / "SCAN TABLE api_order" reads the whole table. A "SEARCH"
+# is an index lookup, and "SCAN ... USING INDEX" walks an index in order (stops at LIMIT).
+SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(?!TABLE\b)(\w+)\b(?! USING)')
+# PostgreSQL / others: "Seq Scan on api_order"
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+# A sort step: the rows are not read in index order
+SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY')
+SORT = re.compile(r'\bSort\s+\(')
+
+# Keyset pages must come straight off the index, or deep pages sort the whole active set
+ORDERED_BY_INDEX = {
+    'product list', 'product list by category',
+    'product list (next page)', 'product list (next categories)', 'product list (uncategorised)',
+}
+
+
+def hot_queries(user, category_slug, today, now, product=None):
+    """(name, queryset, tables that must not be scanned) for each hot query shape."""
+    products = LocalProductAdapter()
+    listing = products._product_queryset()
+    seek = []
+    if product is not None:
+        # The index ranges a cursor after `product` resolves to (see list_products_page)
+        in_category, later, uncategorised = products._seek(listing, product.category_id, product.name, product.pk)
+        seek = [
+            ('product list (next page)', in_category[:100], {'api_product'}),
+            ('product list (next categories)', later[:100], {'api_product'}),
+            ('product list (uncategorised)', uncategorised[:100], {'api_product'}),
+        ]
+    return [
+        ('order history',
+         Order.objects.filter(user=user).order_by('-created_at', '-id')[:21], {'api_order'}),
+        ('order history (summary)',
+         Order.objects.filter(user=user).annotate(item_count=Count('items'))
+         .order_by('-created_at', '-id')[:21], {'api_order', 'api_orderitem'}),
+        ('product list',
+         listing[:100], {'api_product'}),
+        ('product list by category',
+         products._product_queryset(category_slug=category_slug)[:100], {'api_product'}),
+        *seek,
+        ('subscriptions',
+         Subscription.objects.filter(user=user).order_by('-created_at'), {'api_subscription'}),
+        ('due subscriptions',
+         Subscription.objects.filter(status='ACTIVE', next_delivery_date__lte=today), {'api_subscription'}),
+        ('wishlist',
+         Wishlist.objects.filter(user=user).order_by('-created_at'), {'api_wishlist'}),
+        ('addresses',
+         Address.objects.filter(user=user).order_by('-is_default', '-created_at'), {'api_address'}),
+        ('wallet entries',
+         WalletEntry.objects.filter(user=user).order_by('-created_at', '-id')[:20], {'api_walletentry'}),
+        ('pick wave',
+         pick_waves.wave_orders(cutoff=now), {'api_order'}),
+        ('order sync outbox',
+         OrderSyncOutbox.objects.filter(status='PENDING', next_attempt_at__lte=now), {'api_ordersyncoutbox'}),
+    ]
+
+
+def scanned_tables(plan):
+    pattern = SQLITE_SCAN if connection.vendor == 'sqlite' else SEQ_SCAN
+    return set(pattern.findall(plan))
+
+
+def sorts(plan):
+    return bool((SQLITE_SORT if connection.vendor == 'sqlite' else SORT).search(plan))
+
+
+class Command(BaseCommand):
+    help = (
+        'EXPLAIN the hot query shapes on synthetic data (rolled back); fail on sequential scans, '
+        'and on sorts in the keyset-paginated listings. The verdict holds for the configured '
+        'database only: run it with DATABASE_URL pointing at PostgreSQL to check production plans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--orders-per-user', type=int, default=10)
+        parser.add_argument('--products', type=int, default=5000)
+        parser.add_argument('--show-plans', action='store_true')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user, category_slug, product = self._populate(options)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')  # give the planner real statistics
+            today, now = timezone.localdate(), timezone.now()
+
+            self.stdout.write(f"Plans from {connection.vendor}; other databases can plan these differently")
+            failures = []
+            for name, queryset, tables in hot_queries(user, category_slug, today, now, product):
+                plan = queryset.explain()
+                problems = []
+                scans = scanned_tables(plan) & tables
+                if scans:
+                    problems.append(f"SEQ SCAN on {', '.join(sorted(scans))}")
+                if name in ORDERED_BY_INDEX and sorts(plan):
+                    problems.append('SORT instead of index order')
+                self.stdout.write(f"{name:<32}{'; '.join(problems) or 'ok'}")
+                if options['show_plans'] or problems:
+                    self.stdout.write('    ' + plan.replace('\n', '\n    '))
+                if problems:
+                    failures.append(name)
+
+        if failures:
+            raise CommandError(f"Sequential scans or sorts in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f'All hot queries use an index ({connection.vendor})'))
+
+    def _populate(self, options):
+        rng = random.Random(11)
+        products = create_catalog(options['products'])
+        users = User.objects.bulk_create([
+            User(username=f'explain-{i}', phone_number=f'explain-{i}') for i in range(options['users'])
+        ], batch_size=2000)
+        now = timezone.now()
+
+        orders = Order.objects.bulk_create([
+            Order(
+                user=user, total_price=100,
+                # Most history is delivered; only the last few are still open
+                delivery_status='DELIVERED' if rng.random() < 0.95 else rng.choice(pick_waves.WAVE_STATUSES),
+            )
+            for user in users for _ in range(options['orders_per_user'])
+        ], batch_size=2000)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=rng.choice(products), quantity=1, price_at_purchase=10)
+            for order in orders for _ in range(3)
+        ], batch_size=5000)
+        OrderSyncOutbox.objects.bulk_create([
+            OrderSyncOutbox(order=order, status='DONE' if rng.random() < 0.98 else 'PENDING')
+            for order in orders
+        ], batch_size=5000)
+
+        per_user = range(3)
+        Subscription.objects.bulk_create([
+            Subscription(
+                user=user, product=rng.choice(products), start_date=now.date(),
+                next_delivery_date=now.date() + timedelta(days=rng.randint(-1, 30)),
+                status='ACTIVE' if rng.random() < 0.3 else 'CANCELLED',
+            )
+            for user in users for _ in per_user
+        ], batch_size=2000)
+        Wishlist.objects.bulk_create([
+            Wishlist(user=user, product=product)
+            for user in users for product in rng.sample(products, 5)
+        ], batch_size=5000)
+        Address.objects.bulk_create([
+            Address(user=user, name='Home', street='1 Main St', city='Kanpur', zip_code='208001', is_default=i == 0)
+            for user in users for i in per_user
+        ], batch_size=5000)
+        WalletEntry.objects.bulk_create([
+            WalletEntry(user=user, kind='CASHBACK', amount=10, balance_after=10 * (i + 1))
+            for user in users for i in range(5)
+        ], batch_size=5000)
+
+        category_slug = products[0].category.slug
+        return users[0], category_slug, products[len(products) // 2]
@@ -0,0 +1,34 @@
+import csv
+from django.core.management.base import BaseCommand
+from api.services import demand_forecast
+from .fulfil_subscriptions import _date
+
+
+class Command(BaseCommand):
+    help = 'Write committed subscription demand per day and product (or zone) as CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=_date, default=None, help='First day, YYYY-MM-DD (default: tomorrow)')
+        parser.add_argument('--days', type=int, default=7)
+        parser.add_argument('--by-zone', action='store_true', help='One row per delivery zone as well')
+        parser.add_argument('--output', default=None, help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        result = demand_forecast.forecast(days=options['days'], start=options['start'])
+        by_zone = options['by_zone']
+        rows = result['zones'] if by_zone else result['products']
+
+        out = open(options['output'], 'w', newline='') if options['output'] else self.stdout
+        try:
+            writer = csv.writer(out)
+            writer.writerow(['date', *(['zone_id', 'zip_code', 'city'] if by_zone else []), 'product_id', 'product', 'unit', 'quantity'])
+            for offset, day in enumerate(result['dates']):
+                for row in rows:
+                    if row['quantities'][offset]:
+                        writer.writerow([
+                            day.isoformat(), *([row['zone_id'], row['zip_code'], row['city']] if by_zone else []),
+                            row['product_id'], row['name'], row['unit'], row['quantities'][offset],
+                        ])
+        finally:
+            if options['output']:
+                out.close()
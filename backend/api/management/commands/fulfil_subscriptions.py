@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from api.services import subscriptions
+
+
+def _date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise CommandError(f"Not an ISO 8601 date: {value}")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Create the orders for every subscription due by a date (safe to rerun)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=_date, default=None, help='Run date, YYYY-MM-DD (default: today)')
+        parser.add_argument('--min-user-id', type=int, default=None, help='Only users with id >= this')
+        parser.add_argument('--max-user-id', type=int, default=None, help='Only users with id < this')
+        parser.add_argument('--chunk-size', type=int, default=subscriptions.USER_CHUNK_SIZE,
+                            help='Users per transaction')
+
+    def handle(self, *args, **options):
+        stats = subscriptions.fulfil(
+            run_date=options['date'], min_user_id=options['min_user_id'],
+            max_user_id=options['max_user_id'], chunk_size=options['chunk_size'],
+        )
+        rate = stats.subscriptions / stats.seconds if stats.seconds else 0
+        self.stdout.write(
+            f"{stats.subscriptions} subscriptions -> {stats.orders} orders, {stats.items} items "
+            f"in {stats.seconds:.2f}s ({rate:.0f}/s)"
+        )
+        if stats.skipped:
+            self.stdout.write(f"Skipped {stats.skipped} subscriptions for products no longer sold")
+        if stats.conflicts:
+            self.stdout.write(self.style.WARNING(
+                f"{stats.conflicts} chunks were being fulfilled by another run; rerun to pick up the rest"
+            ))
@@ -0,0 +1,44 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from api.services import pick_waves
+
+
+def _when(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise CommandError(f"Not an ISO 8601 datetime: {value}")
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+class Command(BaseCommand):
+    help = 'Print the pick list (per aisle) and put wall for open orders up to a cut-off'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cutoff', type=_when, default=None, help='ISO datetime (default: now)')
+        parser.add_argument('--since', type=_when, default=None, help='Only orders created after this')
+        parser.add_argument('--claim', action='store_true', help='Move the wave\'s PENDING orders to PACKING')
+        parser.add_argument('--json', action='store_true', help='Print the whole wave as JSON')
+
+    def handle(self, *args, **options):
+        wave = pick_waves.plan_wave(cutoff=options['cutoff'], since=options['since'], claim=options['claim'])
+        if options['json']:
+            self.stdout.write(json.dumps(wave, cls=DjangoJSONEncoder, indent=2))
+            return
+
+        self.stdout.write(
+            f"Wave up to {wave['cutoff']:%Y-%m-%d %H:%M}: {wave['order_count']} orders, "
+            f"{wave['line_count']} lines, {wave['total_quantity']} units"
+        )
+        for aisle in wave['aisles']:
+            self.stdout.write(f"\n== {aisle['aisle']} ({aisle['total_quantity']} units)")
+            for product in aisle['products']:
+                self.stdout.write(
+                    f"  {product['total_quantity']:>6} {product['unit'] or '':<4} {product['name']}"
+                    f"  [{product['order_count']} orders]"
+                )
+        self.stdout.write(f"\nPut wall: {len(wave['put_wall'])} slots")
+        if options['claim']:
+            self.stdout.write(f"Claimed {wave['claimed']} orders (PENDING -> PACKING)")
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from api.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired Idempotency-Key records (DB store only; cache records expire on their own)'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Purged {purge_expired()} expired idempotency records")
@@ -12,6 +12,7 @@ class Command(BaseCommand):
                 'code': 'WELCOME50',
                 'discount_amount': 50.00,
                 'min_order_value': 150.00,
+                'new_customers_only': True,
                 'valid_until': timezone.now() + timedelta(days=30)
             },
             {
@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from api.services import order_sync
+
+
+class Command(BaseCommand):
+    help = 'Drain the order sync outbox: push queued orders to the external system (WooCommerce)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--workers', type=int, default=None, help='Parallel pushes per batch')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to sleep when idle')
+        parser.add_argument('--once', action='store_true', help='Drain what is due now, then exit')
+        parser.add_argument('--stats', action='store_true', help='Print the backlog and exit')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._print_backlog()
+            return
+
+        self.stdout.write('Order sync worker started')
+        try:
+            while True:
+                claimed, done, failed = order_sync.run_once(options['batch_size'], workers=options['workers'])
+                if claimed:
+                    self.stdout.write(f"Batch: {claimed} claimed, {done} synced, {failed} failed")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping')
+        self._print_backlog()
+
+    def _print_backlog(self):
+        backlog = order_sync.backlog()
+        self.stdout.write(
+            f"Backlog: {backlog['pending']} pending, {backlog['processing']} processing, "
+            f"{backlog['failed']} failed, {backlog['done']} done; "
+            f"oldest unsynced {backlog['oldest_pending_age_s']}s"
+        )
@@ -30,7 +30,7 @@ class Command(BaseCommand):
         self.stdout.write(f"Selected: {product.name} (External ID: {product.external_id})")
 
         # 3. Create Coupon
-        coupon, _ = Coupon.objects.get_or_create(code='WELCOME50', is_active=True, defaults={'discount_amount': 50, 'min_order_value': 100})
+        coupon, _ = Coupon.objects.get_or_create(code='WELCOME50', is_active=True, defaults={'discount_amount': 50, 'min_order_value': 100, 'new_customers_only': True})
         self.stdout.write(f"Coupon: {coupon.code}")
 
         # 4. Place Order
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_ledgers(apps, schema_editor):
+    """One OPENING entry per existing non-zero balance, so entries sum to the balance."""
+    User = apps.get_model('api', 'User')
+    WalletEntry = apps.get_model('api', 'WalletEntry')
+    entries = [
+        WalletEntry(user_id=pk, kind='OPENING', amount=balance, balance_after=balance)
+        for pk, balance in User.objects.exclude(wallet_balance=0).values_list('pk', 'wallet_balance')
+    ]
+    WalletEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_idempotency_record'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('OPENING', 'Opening Balance'), ('DEBIT', 'Order Payment'), ('REFUND', 'Refund'), ('TOPUP', 'Top-up'), ('CASHBACK', 'Cashback'), ('ADJUSTMENT', 'Adjustment')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Signed: credits positive, debits negative', max_digits=10)),
+                ('balance_after', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('reference', models.CharField(blank=True, help_text='Campaign, payment or admin reference', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='wallet_entries', to='api.order')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='wallet_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='api_wallete_user_id_a12100_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledgers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_wallet_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='actual_weight',
+            field=models.DecimalField(blank=True, decimal_places=3, help_text='Weighed by the picker, in kg', max_digits=8, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='external_line_item_id',
+            field=models.CharField(blank=True, default='', help_text='Line item ID in the external order (stored at sync)', max_length=50),
+        ),
+    ]
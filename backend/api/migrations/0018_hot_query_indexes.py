@@ -0,0 +1,41 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_order_transition_timestamps'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['user', '-is_default', '-created_at'], name='api_address_user_id_cbf7de_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='api_order_user_id_73e58f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['delivery_status', 'created_at'], name='api_order_deliver_483b10_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'name', 'id'], name='product_active_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['user', '-created_at'], name='api_subscri_user_id_49ad8b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['status', 'next_delivery_date'], name='api_subscri_status_09f674_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wishlist',
+            index=models.Index(fields=['user', '-created_at'], name='api_wishlis_user_id_cd5069_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 16:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='delivery_address',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.address'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subscription_date',
+            field=models.DateField(blank=True, help_text='Fulfilment run that generated this order', null=True),
+        ),
+        migrations.AddField(
+            model_name='subscription',
+            name='address',
+            field=models.ForeignKey(blank=True, help_text="Delivery address; the user's default address if empty", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='subscriptions', to='api.address'),
+        ),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('subscription_date__isnull', False)), fields=('user', 'delivery_address', 'subscription_date'), name='unique_subscription_order_per_run'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:11
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill(apps, schema_editor):
+    """Users who already paid for an order are not new customers."""
+    User = apps.get_model('api', 'User')
+    Order = apps.get_model('api', 'Order')
+    User.objects.filter(
+        Exists(Order.objects.filter(user=OuterRef('pk'), payment_status='COMPLETED'))
+    ).update(has_completed_order=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_subscription_fulfilment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='has_completed_order',
+            field=models.BooleanField(default=False, help_text='Set when a payment first completes (welcome offers)'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
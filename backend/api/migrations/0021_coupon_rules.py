@@ -0,0 +1,99 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def flag_welcome_offer(apps, schema_editor):
+    """WELCOME50 was new-customers-only by its code; make that a rule."""
+    Coupon = apps.get_model('api', 'Coupon')
+    Coupon.objects.filter(code__iexact='WELCOME50').update(new_customers_only=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_user_has_completed_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coupon',
+            name='categories',
+            field=models.ManyToManyField(blank=True, related_name='coupons', to='api.category'),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='discount_percent',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Percentage off (PERCENT coupons)', max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='discount_type',
+            field=models.CharField(choices=[('FLAT', 'Flat amount'), ('PERCENT', 'Percentage')], default='FLAT', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='max_discount',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Cap in Rupees for PERCENT coupons', max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='new_customers_only',
+            field=models.BooleanField(default=False, help_text='Only before the first completed payment'),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='per_user_limit',
+            field=models.PositiveIntegerField(blank=True, help_text='Redemptions allowed per customer', null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='products',
+            field=models.ManyToManyField(blank=True, related_name='coupons', to='api.product'),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='stackable',
+            field=models.BooleanField(default=False, help_text='Can be combined with other stackable coupons'),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='times_used',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='usage_limit',
+            field=models.PositiveIntegerField(blank=True, help_text='Total redemptions allowed; empty for unlimited', null=True),
+        ),
+        migrations.AlterField(
+            model_name='coupon',
+            name='discount_amount',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Flat discount amount in Rupees', max_digits=10),
+        ),
+        migrations.CreateModel(
+            name='CouponRedemption',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=20)),
+                ('discount_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('coupon', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='redemptions', to='api.coupon')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_redemptions', to='api.order')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CouponUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('used', models.PositiveIntegerField(default=0)),
+                ('coupon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usages', to='api.coupon')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coupon_usages', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('coupon', 'user'), name='unique_coupon_usage')],
+            },
+        ),
+        migrations.RunPython(flag_welcome_offer, migrations.RunPython.noop),
+    ]
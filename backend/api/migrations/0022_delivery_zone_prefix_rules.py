@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_coupon_rules'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deliveryzone',
+            name='zip_code',
+            field=models.CharField(help_text='Pincode, or a prefix rule such as 2260xx or 2260*', max_length=10, unique=True),
+        ),
+    ]
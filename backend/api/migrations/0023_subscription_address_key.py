@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-18 17:48
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    """Earlier run orders are keyed by the address they were grouped by (0: none)."""
+    Order = apps.get_model('api', 'Order')
+    Order.objects.filter(subscription_date__isnull=False).update(
+        subscription_address_key=Coalesce('delivery_address_id', Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_delivery_zone_prefix_rules'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='order',
+            name='unique_subscription_order_per_run',
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='subscription_address_key',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Address id the fulfilment run grouped this order by (0: none); kept when the address is deleted', null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='order',
+            constraint=models.UniqueConstraint(condition=models.Q(('subscription_date__isnull', False)), fields=('user', 'subscription_address_key', 'subscription_date'), name='unique_subscription_order_per_run'),
+        ),
+    ]
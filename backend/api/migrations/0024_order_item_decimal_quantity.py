@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_subscription_address_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderitem',
+            name='quantity',
+            field=models.DecimalField(decimal_places=3, default=1, help_text='Pieces, or weight for items sold by weight', max_digits=10),
+        ),
+    ]
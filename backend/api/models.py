@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.utils.translation import gettext_lazy as _
 import uuid
@@ -17,6 +18,7 @@ class User(AbstractUser):
     is_phone_verified = models.BooleanField(default=False)
     wallet_balance = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='CUSTOMER')
+    has_completed_order = models.BooleanField(default=False, help_text="Set when a payment first completes (welcome offers)")
     
     # Resolving conflicts with default User model
     groups = models.ManyToManyField(
@@ -90,12 +92,23 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Active listing, filtered by category and keyset-ordered on (category, name, id).
+        # A plain btree stores category ASC NULLS LAST on PostgreSQL, which is the list
+        # order (PRODUCT_ORDERING in services/adapters/local_adapter.py); keep them in step.
+        indexes = [
+            models.Index(
+                fields=['category', 'name', 'id'], condition=models.Q(is_active=True),
+                name='product_active_listing_idx',
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
 # Delivery Zone Model
 class DeliveryZone(models.Model):
-    zip_code = models.CharField(max_length=10, unique=True)
+    zip_code = models.CharField(max_length=10, unique=True, help_text="Pincode, or a prefix rule such as 2260xx or 2260*")
     city = models.CharField(max_length=100)
     delivery_time_hrs = models.PositiveIntegerField(help_text="Expected delivery time in hours")
     is_serviceable = models.BooleanField(default=True)
@@ -124,6 +137,14 @@ class Order(models.Model):
     
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='PENDING')
     delivery_status = models.CharField(max_length=20, choices=DELIVERY_STATUS_CHOICES, default='PENDING')
+
+    # Transition timestamps, written by api/services/order_status.py
+    paid_at = models.DateTimeField(null=True, blank=True)
+    payment_failed_at = models.DateTimeField(null=True, blank=True)
+    packed_at = models.DateTimeField(null=True, blank=True)
+    out_for_delivery_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
     
     # External System Mapping (vendor-agnostic)
     external_order_id = models.CharField(max_length=100, blank=True, null=True, help_text="External system order ID")
@@ -150,6 +171,12 @@ class Order(models.Model):
     
     # Tracking & Subscription Fields
     is_subscription = models.BooleanField(default=False)
+    subscription_date = models.DateField(null=True, blank=True, help_text="Fulfilment run that generated this order")
+    delivery_address = models.ForeignKey('Address', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    subscription_address_key = models.PositiveBigIntegerField(
+        null=True, blank=True,
+        help_text="Address id the fulfilment run grouped this order by (0: none); kept when the address is deleted",
+    )
     driver_name = models.CharField(max_length=100, blank=True, null=True)
     driver_phone = models.CharField(max_length=15, blank=True, null=True)
     driver_location_lat = models.FloatField(blank=True, null=True)
@@ -158,18 +185,106 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),      # order history
+            models.Index(fields=['delivery_status', 'created_at']),  # pick waves
+        ]
+        constraints = [
+            # One subscription order per user, address and run date (see services/subscriptions.py).
+            # Keyed on subscription_address_key, not the nullable delivery_address FK: NULLs never
+            # collide, and SET_NULL on address deletion would make past orders collide.
+            models.UniqueConstraint(
+                fields=['user', 'subscription_address_key', 'subscription_date'],
+                condition=models.Q(subscription_date__isnull=False),
+                name='unique_subscription_order_per_run',
+            ),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.user.username}"
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
-    quantity = models.PositiveIntegerField(default=1)
+    quantity = models.DecimalField(max_digits=10, decimal_places=3, default=1, help_text="Pieces, or weight for items sold by weight")
     price_at_purchase = models.DecimalField(max_digits=10, decimal_places=2)
+    actual_weight = models.DecimalField(max_digits=8, decimal_places=3, null=True, blank=True, help_text="Weighed by the picker, in kg")
+    external_line_item_id = models.CharField(max_length=50, blank=True, default='', help_text="Line item ID in the external order (stored at sync)")
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name} in Order {self.order.id}"
 
+# Order Sync Outbox — written in the same transaction as the Order and
+# drained by `manage.py sync_orders_worker` (see api/services/order_sync.py)
+class OrderSyncOutbox(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSING', 'Processing'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='sync_outbox')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="Lease end while PROCESSING; expired leases are reclaimed")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"Sync Order {self.order_id} ({self.status}, {self.attempts} attempts)"
+
+# Idempotency-Key records for the DB store (see api/idempotency.py)
+class IdempotencyRecord(models.Model):
+    STATE_CHOICES = [
+        ('IN_PROGRESS', 'In Progress'),
+        ('DONE', 'Done'),
+    ]
+
+    key = models.CharField(max_length=255, unique=True, help_text="scope:owner:Idempotency-Key")
+    fingerprint = models.CharField(max_length=64)
+    state = models.CharField(max_length=20, choices=STATE_CHOICES, default='IN_PROGRESS')
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.state})"
+
+# Wallet Ledger — append-only; User.wallet_balance is the running total
+# (see api/services/wallet.py)
+class WalletEntry(models.Model):
+    KIND_CHOICES = [
+        ('OPENING', 'Opening Balance'),
+        ('DEBIT', 'Order Payment'),
+        ('REFUND', 'Refund'),
+        ('TOPUP', 'Top-up'),
+        ('CASHBACK', 'Cashback'),
+        ('ADJUSTMENT', 'Adjustment'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='wallet_entries')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Signed: credits positive, debits negative")
+    balance_after = models.DecimalField(max_digits=10, decimal_places=2)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='wallet_entries')
+    reference = models.CharField(max_length=100, blank=True, help_text="Campaign, payment or admin reference")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', '-created_at'])]
+
+    def __str__(self):
+        return f"{self.kind} {self.amount} for {self.user.username}"
+
 # Address Model
 class Address(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='addresses')
@@ -188,6 +303,10 @@ class Address(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Address book order: default first, then newest
+        indexes = [models.Index(fields=['user', '-is_default', '-created_at'])]
+
     def save(self, *args, **kwargs):
         if self.is_default:
             # Set all other addresses of this user to not default
@@ -196,15 +315,55 @@ class Address(models.Model):
 
 # Coupon Model
 class Coupon(models.Model):
+    DISCOUNT_TYPE_CHOICES = [
+        ('FLAT', 'Flat amount'),
+        ('PERCENT', 'Percentage'),
+    ]
+
     code = models.CharField(max_length=20, unique=True)
-    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Flat discount amount in Rupees")
+    discount_type = models.CharField(max_length=10, choices=DISCOUNT_TYPE_CHOICES, default='FLAT')
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text="Flat discount amount in Rupees")
+    discount_percent = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True, help_text="Percentage off (PERCENT coupons)")
+    max_discount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text="Cap in Rupees for PERCENT coupons")
     min_order_value = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     is_active = models.BooleanField(default=True)
     valid_until = models.DateTimeField(null=True, blank=True)
-    
+
+    # Scope: empty means the whole basket, otherwise only lines for these products/categories
+    products = models.ManyToManyField(Product, blank=True, related_name='coupons')
+    categories = models.ManyToManyField(Category, blank=True, related_name='coupons')
+
+    # Limits (see services/coupons.py: reserved by conditional UPDATE at checkout)
+    usage_limit = models.PositiveIntegerField(null=True, blank=True, help_text="Total redemptions allowed; empty for unlimited")
+    per_user_limit = models.PositiveIntegerField(null=True, blank=True, help_text="Redemptions allowed per customer")
+    times_used = models.PositiveIntegerField(default=0, editable=False)
+
+    stackable = models.BooleanField(default=False, help_text="Can be combined with other stackable coupons")
+    new_customers_only = models.BooleanField(default=False, help_text="Only before the first completed payment")
+
     def __str__(self):
+        if self.discount_type == 'PERCENT':
+            return f"{self.code} - {self.discount_percent}% OFF"
         return f"{self.code} - ₹{self.discount_amount} OFF"
 
+
+class CouponUsage(models.Model):
+    """Per-customer redemption counter, for coupons with a per_user_limit."""
+    coupon = models.ForeignKey(Coupon, on_delete=models.CASCADE, related_name='usages')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coupon_usages')
+    used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=['coupon', 'user'], name='unique_coupon_usage')]
+
+
+class CouponRedemption(models.Model):
+    """A coupon applied to an order (several when stacked)."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='coupon_redemptions')
+    coupon = models.ForeignKey(Coupon, on_delete=models.SET_NULL, null=True, related_name='redemptions')
+    code = models.CharField(max_length=20)
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2)
+
 # Subscription Model
 class Subscription(models.Model):
     FREQUENCY_CHOICES = [
@@ -223,6 +382,7 @@ class Subscription(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='subscriptions')
     product = models.ForeignKey(Product, on_delete=models.PROTECT)
     quantity = models.PositiveIntegerField(default=1)
+    address = models.ForeignKey('Address', on_delete=models.SET_NULL, null=True, blank=True, related_name='subscriptions', help_text="Delivery address; the user's default address if empty")
     
     frequency = models.CharField(max_length=20, choices=FREQUENCY_CHOICES, default='DAILY')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE')
@@ -233,6 +393,12 @@ class Subscription(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['status', 'next_delivery_date']),  # due subscriptions
+        ]
+
     def __str__(self):
         return f"{self.frequency} Subscription for {self.product.name} ({self.user.username})"
 
@@ -244,6 +410,7 @@ class Wishlist(models.Model):
 
     class Meta:
         unique_together = ('user', 'product')
+        indexes = [models.Index(fields=['user', '-created_at'])]
 
     def __str__(self):
         return f"{self.user.username} - {self.product.name}"
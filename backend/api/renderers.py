@@ -1,9 +1,57 @@
+from django.conf import settings
+from rest_framework.utils import encoders
 from rest_framework.renderers import JSONRenderer
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib-based JSONRenderer
+    orjson = None
+
+# Precomputed envelope bytes — the payload is encoded once and spliced in between.
+_SUCCESS_PREFIX = b'{"success":true,"data":'
+_SUCCESS_SUFFIX = b',"user_msg":"Success","debug_log":"No errors detected"}'
+_NO_RESPONSE_PREFIX = b'{"success":false,"data":'
+_NO_RESPONSE_SUFFIX = b',"user_msg":"Error","debug_log":"No errors detected"}'
+_VALIDATION_ERROR_PREFIX = (
+    b'{"success":false,"data":null,"user_msg":"Validation Error",'
+    b'"debug_log":"No errors detected","errors":'
+)
+_REQUEST_FAILED_PREFIX = (
+    b'{"success":false,"data":null,"user_msg":"Request Failed",'
+    b'"debug_log":"No errors detected","errors":'
+)
+_ERROR_SUFFIX = b'}'
+
+_drf_encoder = encoders.JSONEncoder()
+
+
+def _orjson_default(obj):
+    # orjson handles UUID and datetimes itself; Decimal, lazy strings etc.
+    # go through DRF's encoder so output matches the stdlib path.
+    return _drf_encoder.default(obj)
+
+
+def _dumps(data):
+    out = orjson.dumps(
+        data, default=_orjson_default,
+        option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+    )
+    # Same strict-javascript-subset escaping as JSONRenderer
+    if b'\xe2\x80\xa8' in out or b'\xe2\x80\xa9' in out:
+        out = out.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return out
+
+
 class StandardResponseRenderer(JSONRenderer):
     def render(self, data, accepted_media_type=None, renderer_context=None):
+        if self._can_render_fast(accepted_media_type, renderer_context):
+            try:
+                return self._render_fast(data, renderer_context)
+            except TypeError:  # orjson.JSONEncodeError
+                pass  # e.g. ints beyond 64 bits — let the stdlib path handle it
+
         response = renderer_context['response'] if renderer_context else None
-        
+
         # If the view already structured the response, return as is (e.g. error handler)
         if isinstance(data, dict) and 'success' in data and 'user_msg' in data:
             return super().render(data, accepted_media_type, renderer_context)
@@ -25,3 +73,26 @@ class StandardResponseRenderer(JSONRenderer):
             formatted_data['data'] = None
 
         return super().render(formatted_data, accepted_media_type, renderer_context)
+
+    def _can_render_fast(self, accepted_media_type, renderer_context):
+        """orjson output only matches compact, non-ASCII-escaped, unindented JSON."""
+        if orjson is None or not getattr(settings, 'FAST_JSON_RENDERER', True):
+            return False
+        if self.ensure_ascii or not self.compact:
+            return False
+        return self.get_indent(accepted_media_type, renderer_context or {}) is None
+
+    def _render_fast(self, data, renderer_context):
+        """Single pass: encode the payload once and wrap it in the envelope bytes."""
+        response = renderer_context['response'] if renderer_context else None
+
+        if isinstance(data, dict) and 'success' in data and 'user_msg' in data:
+            return _dumps(data)
+
+        if response is None:
+            return _NO_RESPONSE_PREFIX + _dumps(data) + _NO_RESPONSE_SUFFIX
+        if response.status_code < 400:
+            return _SUCCESS_PREFIX + _dumps(data) + _SUCCESS_SUFFIX
+        if response.status_code == 400:
+            return _VALIDATION_ERROR_PREFIX + _dumps(data) + _ERROR_SUFFIX
+        return _REQUEST_FAILED_PREFIX + _dumps(data) + _ERROR_SUFFIX
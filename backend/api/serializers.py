@@ -21,6 +21,13 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         model = User
         fields = ['first_name', 'email']
 
+    def update(self, instance, validated_data):
+        # Write only the profile columns, never a stale wallet_balance
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 class ProductSerializer(serializers.ModelSerializer):
     pricing_unit = UnitOfMeasureSerializer(read_only=True)
     weight_unit = UnitOfMeasureSerializer(read_only=True)
@@ -43,21 +50,15 @@ class CartAddSerializer(serializers.Serializer):
     quantity = serializers.FloatField()
 
     def validate(self, data):
+        from .services import pricing
         try:
-            product = Product.objects.get(id=data['product_id'])
-        except Product.DoesNotExist:
-            raise serializers.ValidationError("Product not found.")
-        
-        # LEMON FIX: If pricing unit is 'Piece' or 'pc', quantity must be Integer
-        # We check the symbol or name of the text. Assuming 'pc' or 'Piece'
-        unit_symbol = product.pricing_unit.symbol.lower()
-        if unit_symbol in ['pc', 'piece', 'unit']:
-            if not data['quantity'].is_integer():
-                raise serializers.ValidationError({
-                    'quantity': f"Item '{product.name}' is sold per piece. You cannot buy fractional amounts."
-                })
-        
-        data['product'] = product
+            line = pricing.price_line(data['product_id'], data['quantity'])
+        except pricing.PricingError as e:
+            if e.field == 'quantity':
+                raise serializers.ValidationError({'quantity': e.message})
+            raise serializers.ValidationError(e.message)
+
+        data['line'] = line
         return data
 
 class DeliveryZoneSerializer(serializers.ModelSerializer):
@@ -67,6 +68,7 @@ class DeliveryZoneSerializer(serializers.ModelSerializer):
 
 class OrderItemSerializer(serializers.ModelSerializer):
     product_name = serializers.ReadOnlyField(source='product.name')
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=3, coerce_to_string=False, read_only=True)
 
     class Meta:
         model = OrderItem
@@ -96,6 +98,14 @@ class OrderSerializer(serializers.ModelSerializer):
             data.pop('driver_location_lng', None)
         return data
 
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """Order header for history lists; expects an `item_count` annotation."""
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ['id', 'total_price', 'payment_status', 'delivery_status', 'is_cod', 'created_at', 'item_count']
+
 
 
 
@@ -106,12 +116,18 @@ class SubscriptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Subscription
         fields = [
-            'id', 'user', 'product', 'product_details', 'quantity',
+            'id', 'user', 'product', 'product_details', 'quantity', 'address',
             'frequency', 'status', 'start_date', 'next_delivery_date',
             'created_at'
         ]
         read_only_fields = ['id', 'created_at', 'user', 'next_delivery_date']
 
+    def validate_address(self, address):
+        request = self.context.get('request')
+        if address is not None and request is not None and address.user_id != request.user.id:
+            raise serializers.ValidationError("Address not found.")
+        return address
+
 class WishlistSerializer(serializers.ModelSerializer):
     product_details = ProductSerializer(source='product', read_only=True)
 
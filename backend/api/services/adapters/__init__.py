@@ -6,7 +6,11 @@ def get_product_adapter():
     backend = getattr(settings, 'PRODUCT_BACKEND', 'local')
     if backend == 'woocommerce':
         from .woocommerce_adapter import WooCommerceProductAdapter
-        return WooCommerceProductAdapter()
+        adapter = WooCommerceProductAdapter()
+        if getattr(settings, 'WC_CACHE_ENABLED', True):
+            from .cached_adapter import StaleWhileRevalidateProductAdapter
+            return StaleWhileRevalidateProductAdapter(adapter)
+        return adapter
     from .local_adapter import LocalProductAdapter
     return LocalProductAdapter()
 
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from ..pagination import encode_cursor, decode_cursor, InvalidCursor
 
 
 class BaseProductAdapter(ABC):
@@ -9,11 +10,37 @@ class BaseProductAdapter(ABC):
         """Return a list of product dicts in canonical format."""
         ...
 
+    def list_products_page(self, category_slug=None, search=None, cursor=None, per_page=100):
+        """
+        Cursor-mode listing. Returns (products, next_cursor).
+        Default: an opaque page-number cursor over list_products(); backends
+        that can seek by sort key should override this.
+        """
+        page = decode_cursor(cursor, length=1)[0] if cursor else 1
+        if not isinstance(page, int) or page < 1:
+            raise InvalidCursor('Malformed cursor')
+        products = self.list_products(category_slug, search, page, per_page)
+        next_cursor = encode_cursor([page + 1]) if len(products) >= per_page else None
+        return products, next_cursor
+
     @abstractmethod
     def get_product(self, identifier):
         """Return a single product dict by ID or slug."""
         ...
 
+    def get_products(self, identifiers):
+        """
+        Batch lookup. Returns {identifier: product} for the identifiers that
+        were found; misses are simply absent. Default: one get_product() per
+        identifier — backends that can resolve a set at once should override.
+        """
+        found = {}
+        for identifier in identifiers:
+            product = self.get_product(identifier)
+            if product is not None:
+                found[identifier] = product
+        return found
+
     @abstractmethod
     def list_categories(self):
         """Return a list of category dicts."""
@@ -28,11 +55,16 @@ class BaseProductAdapter(ABC):
 class BaseOrderAdapter(ABC):
     """Interface for order sync operations."""
 
+    # External adapters get their orders queued in the sync outbox
+    # (api/services/order_sync.py) instead of being called during checkout.
+    is_external = True
+
     @abstractmethod
     def sync_order(self, order):
         """
         Sync a local Order to the external system.
-        Returns external_order_id or None.
+        Returns external_order_id, or None if there is nothing to sync.
+        Raises on failure so the outbox worker can retry.
         """
         ...
 
@@ -43,3 +75,13 @@ class BaseOrderAdapter(ABC):
         Returns True on success, raises on failure.
         """
         ...
+
+    def update_item_weights(self, order, items):
+        """
+        Record picker weights for several OrderItems of one order; each
+        item carries its new `actual_weight`. Returns True on success,
+        raises on failure. Override to push them in one request.
+        """
+        for item in items:
+            self.update_item_weight(order, item.product, item.actual_weight)
+        return True
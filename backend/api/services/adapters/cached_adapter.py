@@ -0,0 +1,162 @@
+"""
+Stale-while-revalidate cache in front of a remote product adapter.
+
+Each entry is served straight from cache while younger than
+WC_CACHE_FRESH_TTL. Until WC_CACHE_STALE_TTL it is still served from
+cache, but a background thread refreshes it. Older entries are fetched
+inline. If the upstream call fails, the last good payload is served
+instead of an empty result, however old it is.
+"""
+import hashlib
+import logging
+import threading
+import time
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from .base import BaseProductAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    def __init__(self, namespace):
+        self.namespace = namespace
+        self.clock = time.time
+        self._lock = threading.Lock()
+        self._refreshing = {}   # key -> Thread
+        self._stats = {
+            'fresh_hits': 0, 'stale_hits': 0, 'misses': 0,
+            'refreshes': 0, 'errors': 0, 'served_stale_on_error': 0,
+        }
+
+    @property
+    def fresh_ttl(self):
+        return getattr(settings, 'WC_CACHE_FRESH_TTL', 60)
+
+    @property
+    def stale_ttl(self):
+        return getattr(settings, 'WC_CACHE_STALE_TTL', 600)
+
+    def _key(self, parts):
+        raw = '|'.join(repr(p) for p in parts)
+        return f"{self.namespace}:swr:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, parts, fetch, default=None):
+        """Return the cached value for `parts`, calling `fetch()` as the policy requires."""
+        key = self._key(parts)
+        entry = cache.get(key)
+        if entry is not None:
+            age = self.clock() - entry['fetched_at']
+            if age < self.fresh_ttl:
+                self._count('fresh_hits')
+                return entry['value']
+            if age < self.stale_ttl:
+                self._count('stale_hits')
+                self._refresh_in_background(key, fetch)
+                return entry['value']
+
+        self._count('misses')
+        try:
+            return self._fetch_and_store(key, fetch)
+        except requests.RequestException as e:
+            self._count('errors')
+            if entry is not None:
+                logger.warning(f"{self.namespace} upstream failed, serving last good payload: {e}")
+                self._count('served_stale_on_error')
+                return entry['value']
+            logger.error(f"{self.namespace} upstream failed with nothing cached: {e}")
+            return default
+
+    def _fetch_and_store(self, key, fetch):
+        value = fetch()
+        # Kept without expiry: the last good payload is the fallback when upstream is down
+        cache.set(key, {'value': value, 'fetched_at': self.clock()}, timeout=None)
+        return value
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            thread = threading.Thread(target=self._refresh, args=(key, fetch), daemon=True)
+            self._refreshing[key] = thread
+        thread.start()
+
+    def _refresh(self, key, fetch):
+        try:
+            self._fetch_and_store(key, fetch)
+            self._count('refreshes')
+        except requests.RequestException as e:
+            self._count('errors')
+            logger.warning(f"{self.namespace} background refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+            connections.close_all()
+
+    def wait_for_refreshes(self, timeout=5):
+        """Block until in-flight background refreshes finish (tests, shutdown)."""
+        with self._lock:
+            threads = list(self._refreshing.values())
+        for thread in threads:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {**self._stats, 'refreshing': len(self._refreshing)}
+
+    def reset_stats(self):
+        with self._lock:
+            for stat in self._stats:
+                self._stats[stat] = 0
+
+
+wc_cache = StaleWhileRevalidateCache('wc')
+
+
+class StaleWhileRevalidateProductAdapter(BaseProductAdapter):
+    """Wraps an adapter exposing fetch_products/fetch_product/fetch_product_batch/fetch_categories."""
+
+    def __init__(self, inner, swr_cache=None):
+        self.inner = inner
+        self.cache = swr_cache or wc_cache
+
+    def list_products(self, category_slug=None, search=None, page=1, per_page=100):
+        return self.cache.get(
+            ('products', category_slug, search, page, per_page),
+            lambda: self.inner.fetch_products(category_slug, search, page, per_page),
+            default=[],
+        )
+
+    def get_product(self, identifier):
+        return self.cache.get(
+            ('product', identifier),
+            lambda: self.inner.fetch_product(identifier),
+            default=None,
+        )
+
+    def get_products(self, identifiers):
+        identifiers = [str(i) for i in identifiers]
+        return self.cache.get(
+            ('product-batch', tuple(identifiers)),
+            lambda: self.inner.fetch_product_batch(identifiers),
+            default={},
+        )
+
+    def list_categories(self):
+        return self.cache.get(
+            ('categories',),
+            self.inner.fetch_categories,
+            default=[],
+        )
+
+    def sync_to_local(self):
+        return self.inner.sync_to_local()
+
+    def stats(self):
+        return self.cache.stats()
@@ -2,23 +2,112 @@
 Local Adapter — reads/writes directly from Django models.
 This is the default adapter when running without WooCommerce.
 """
+import uuid
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
 from .base import BaseProductAdapter, BaseOrderAdapter
+from .. import search_engine
+from ..pagination import encode_cursor, decode_cursor, InvalidCursor
+from api.fast_serializers import product_values
 from api.models import Product, Category, Order, OrderItem
 
+# Stable list order; keyset cursors seek on the same columns. NULLS LAST is the
+# order of a plain btree on (category, name, id) (product_active_listing_idx) on
+# PostgreSQL and SQLite alike, so pages are read straight off the index.
+PRODUCT_ORDERING = (F('category_id').asc(nulls_last=True), 'name', 'id')
+
 
 class LocalProductAdapter(BaseProductAdapter):
 
-    def list_products(self, category_slug=None, search=None, page=1, per_page=100):
-        qs = Product.objects.filter(is_active=True).select_related(
-            'category', 'pricing_unit', 'weight_unit'
-        )
+    def _product_queryset(self, category_slug=None, search=None):
+        qs = Product.objects.filter(is_active=True)
         if category_slug:
             qs = qs.filter(category__slug=category_slug)
         if search:
             qs = qs.filter(name__icontains=search)
+        return qs.order_by(*PRODUCT_ORDERING)
+
+    def _use_search_index(self):
+        return getattr(settings, 'PRODUCT_SEARCH_INDEX', True)
+
+    def list_products(self, category_slug=None, search=None, page=1, per_page=100):
+        """Return `.values()` rows for ProductRowSerializer (api/fast_serializers.py)."""
+        if search and self._use_search_index():
+            return self._search_products(category_slug, search, page, per_page)
+        qs = self._product_queryset(category_slug, search)
+        start = (page - 1) * per_page
+        return list(product_values(qs)[start:start + per_page])
+
+    def list_products_page(self, category_slug=None, search=None, cursor=None, per_page=100):
+        """
+        Keyset pagination on (category, name, id). Seeks past the last row of
+        the previous page instead of using OFFSET, so every page costs the same.
+        Ranked search results page through the in-memory id list instead.
+        """
+        if search and self._use_search_index():
+            return super().list_products_page(category_slug, search, cursor, per_page)
+
+        qs = self._product_queryset(category_slug, search)
+        segments = [qs]
+        if cursor:
+            segments = self._seek(qs, *self._decode_product_cursor(cursor))
+
+        # Each segment is one contiguous index range; later ones only run
+        # when a page crosses a category boundary.
+        products = []
+        for segment in segments:
+            products.extend(product_values(segment, '', 'category_id')[:per_page + 1 - len(products)])
+            if len(products) > per_page:
+                break
+        next_cursor = None
+        if len(products) > per_page:
+            products = products[:per_page]
+            last = products[-1]
+            next_cursor = encode_cursor([last['category_id'], last['name'], last['id'].hex])
+        return products, next_cursor
 
+    @staticmethod
+    def _decode_product_cursor(cursor):
+        category_id, name, product_id = decode_cursor(cursor, length=3)
+        if (category_id is not None and type(category_id) is not int) or not isinstance(name, str):
+            raise InvalidCursor('Malformed cursor')
+        try:
+            product_id = uuid.UUID(product_id)
+        except (TypeError, ValueError, AttributeError):
+            raise InvalidCursor('Malformed cursor')
+        return category_id, name, product_id
+
+    @staticmethod
+    def _seek(qs, category_id, name, product_id):
+        """
+        The rows after a cursor, in list order, as index ranges: the rest of
+        its category, then later categories, then uncategorised products
+        (NULLs sort last). name__gte repeats the OR below as a plain bound
+        the index can seek on.
+        """
+        after_in_category = Q(name__gte=name) & (Q(name__gt=name) | Q(id__gt=product_id))
+        if category_id is None:
+            return [qs.filter(after_in_category, category__isnull=True)]
+        return [
+            qs.filter(after_in_category, category_id=category_id),
+            qs.filter(category_id__gt=category_id),
+            qs.filter(category__isnull=True),
+        ]
+
+    def _search_products(self, category_slug, search, page, per_page):
+        """Rank via the search index, then load only the requested page."""
+        ids = search_engine.search(search, category_slug=category_slug)
         start = (page - 1) * per_page
-        return list(qs[start:start + per_page])
+        page_ids = ids[start:start + per_page]
+        if not page_ids:
+            return []
+        by_id = {
+            str(row['id']): row for row in product_values(
+                Product.objects.filter(id__in=page_ids, is_active=True)
+            )
+        }
+        return [by_id[pk] for pk in page_ids if pk in by_id]
 
     def get_product(self, identifier):
         """Get product by UUID id or slug."""
@@ -31,9 +120,49 @@ class LocalProductAdapter(BaseProductAdapter):
                 return Product.objects.select_related(
                     'category', 'pricing_unit', 'weight_unit'
                 ).get(id=identifier)
-            except (Product.DoesNotExist, ValueError):
+            except (Product.DoesNotExist, ValueError, ValidationError):
                 return None
 
+    def get_products(self, identifiers):
+        """
+        Resolve a mix of slugs, UUIDs and external ids in one query.
+        Returns {identifier: `.values()` row}; like get_product, a slug match
+        wins over an id match, which wins over an external_id match.
+        """
+        identifiers = [str(i) for i in identifiers]
+        as_uuid = {}
+        for identifier in identifiers:
+            try:
+                as_uuid[identifier] = uuid.UUID(identifier)
+            except ValueError:
+                pass
+        rows = product_values(
+            Product.objects.filter(
+                Q(slug__in=identifiers)
+                | Q(id__in=set(as_uuid.values()))
+                | Q(external_id__in=identifiers)
+            ),
+            '', 'external_id',
+        )
+
+        by_slug, by_id, by_external_id = {}, {}, {}
+        for row in rows:
+            by_slug[row['slug']] = row
+            by_id[row['id']] = row
+            if row['external_id']:
+                by_external_id[row['external_id']] = row
+
+        found = {}
+        for identifier in identifiers:
+            row = (
+                by_slug.get(identifier)
+                or by_id.get(as_uuid.get(identifier))
+                or by_external_id.get(identifier)
+            )
+            if row is not None:
+                found[identifier] = row
+        return found
+
     def list_categories(self):
         return list(Category.objects.all())
 
@@ -43,6 +172,7 @@ class LocalProductAdapter(BaseProductAdapter):
 
 
 class LocalOrderAdapter(BaseOrderAdapter):
+    is_external = False
 
     def sync_order(self, order):
         """No external sync needed — order is already in local DB."""
@@ -50,12 +180,10 @@ class LocalOrderAdapter(BaseOrderAdapter):
 
     def update_item_weight(self, order, product, actual_weight):
         """Update weight directly on the local OrderItem."""
-        try:
-            item = OrderItem.objects.get(order=order, product=product)
-            # Store actual weight as metadata (add field if needed, or use
-            # a JSON field — for now we update price_at_purchase proportionally)
-            # In the future, add an `actual_weight` field to OrderItem.
-            item.save()
-            return True
-        except OrderItem.DoesNotExist:
-            return False
+        updated = OrderItem.objects.filter(order=order, product=product).update(actual_weight=actual_weight)
+        return bool(updated)
+
+    def update_item_weights(self, order, items):
+        """Persist all weights with one bulk UPDATE."""
+        OrderItem.objects.bulk_update(items, ['actual_weight'])
+        return True
@@ -4,9 +4,12 @@ When you leave WooCommerce, this file becomes dead code (just delete it).
 """
 import requests
 import logging
+import uuid
 from django.conf import settings
+from django.db.models import Q
 from .base import BaseProductAdapter, BaseOrderAdapter
-from api.models import Product, Category
+from ..http_client import get_client
+from api.models import Product, Category, OrderItem
 
 logger = logging.getLogger(__name__)
 
@@ -22,10 +25,20 @@ def _wc_url(endpoint):
     return f"{base}/{endpoint.lstrip('/')}"
 
 
+def _wc_quantity(quantity):
+    """A line quantity as a JSON number: whole pieces as an int, weights as a float."""
+    return int(quantity) if quantity == quantity.to_integral_value() else float(quantity)
+
+
 class WooCommerceProductAdapter(BaseProductAdapter):
+    """
+    The list/get methods swallow connection errors (returning [] / None);
+    the fetch_* variants raise them so callers such as the
+    stale-while-revalidate cache can tell "empty" from "WooCommerce is down".
+    """
 
-    def list_products(self, category_slug=None, search=None, page=1, per_page=100):
-        """Fetch products from WooCommerce REST API."""
+    def fetch_products(self, category_slug=None, search=None, page=1, per_page=100):
+        """Fetch products from WooCommerce REST API. Raises RequestException."""
         params = {
             'per_page': per_page,
             'page': page,
@@ -39,59 +52,118 @@ class WooCommerceProductAdapter(BaseProductAdapter):
         if search:
             params['search'] = search
 
+        resp = get_client().get(
+            _wc_url('products'),
+            auth=_wc_auth(),
+            params=params,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def list_products(self, category_slug=None, search=None, page=1, per_page=100):
         try:
-            resp = requests.get(
-                _wc_url('products'),
-                auth=_wc_auth(),
-                params=params,
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return resp.json()
+            return self.fetch_products(category_slug, search, page, per_page)
         except requests.RequestException as e:
             logger.error(f"WooCommerce product fetch failed: {e}")
             return []
 
+    def fetch_product(self, identifier):
+        """
+        Fetch a single product by slug or numeric ID. Returns None if WC has
+        no such product; raises RequestException if WC cannot be reached.
+        """
+        # Try by slug first
+        resp = get_client().get(
+            _wc_url('products'),
+            auth=_wc_auth(),
+            params={'slug': identifier, 'per_page': 1},
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if data:
+            return data[0]
+
+        # Try by numeric ID
+        resp = get_client().get(
+            _wc_url(f'products/{identifier}'),
+            auth=_wc_auth(),
+        )
+        if resp.status_code in (400, 404):
+            return None
+        resp.raise_for_status()
+        return resp.json()
+
     def get_product(self, identifier):
         """Fetch a single product from WooCommerce by ID or slug."""
-        # Try by slug first
         try:
-            resp = requests.get(
-                _wc_url('products'),
-                auth=_wc_auth(),
-                params={'slug': identifier, 'per_page': 1},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            if data:
-                return data[0]
+            return self.fetch_product(identifier)
         except requests.RequestException as e:
             logger.error(f"WooCommerce product get failed: {e}")
+            return None
 
-        # Try by numeric ID
+    def fetch_product_batch(self, identifiers):
+        """
+        Resolve many products with a single `include=` call. Numeric
+        identifiers are WC ids; slugs and local UUIDs are mapped to WC ids
+        through the locally synced Product rows (one query). Returns
+        {identifier: product}; raises RequestException.
+        """
+        identifiers = [str(i) for i in identifiers]
+        wc_ids = {i: i for i in identifiers if i.isdigit()}
+
+        unmapped = [i for i in identifiers if i not in wc_ids]
+        if unmapped:
+            as_uuid = {}
+            for identifier in unmapped:
+                try:
+                    as_uuid[identifier] = uuid.UUID(identifier)
+                except ValueError:
+                    pass
+            local = Product.objects.filter(
+                Q(slug__in=unmapped) | Q(id__in=set(as_uuid.values())),
+                external_id__isnull=False,
+            ).values_list('id', 'slug', 'external_id')
+            by_slug, by_id = {}, {}
+            for pk, slug, external_id in local:
+                by_slug[slug] = external_id
+                by_id[pk] = external_id
+            for identifier in unmapped:
+                external_id = by_slug.get(identifier) or by_id.get(as_uuid.get(identifier))
+                if external_id and external_id.isdigit():
+                    wc_ids[identifier] = external_id
+
+        if not wc_ids:
+            return {}
+        include = sorted(set(wc_ids.values()), key=int)
+        resp = get_client().get(
+            _wc_url('products'),
+            auth=_wc_auth(),
+            params={'include': ','.join(include), 'per_page': len(include)},
+        )
+        resp.raise_for_status()
+        by_id = {str(p.get('id')): p for p in resp.json()}
+        return {i: by_id[wc_ids[i]] for i in identifiers if wc_ids.get(i) in by_id}
+
+    def get_products(self, identifiers):
         try:
-            resp = requests.get(
-                _wc_url(f'products/{identifier}'),
-                auth=_wc_auth(),
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return resp.json()
-        except requests.RequestException:
-            return None
+            return self.fetch_product_batch(identifiers)
+        except requests.RequestException as e:
+            logger.error(f"WooCommerce batch product fetch failed: {e}")
+            return {}
+
+    def fetch_categories(self):
+        """Fetch categories from WooCommerce. Raises RequestException."""
+        resp = get_client().get(
+            _wc_url('products/categories'),
+            auth=_wc_auth(),
+            params={'per_page': 50},
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     def list_categories(self):
-        """Fetch categories from WooCommerce."""
         try:
-            resp = requests.get(
-                _wc_url('products/categories'),
-                auth=_wc_auth(),
-                params={'per_page': 50},
-                timeout=15,
-            )
-            resp.raise_for_status()
-            return resp.json()
+            return self.fetch_categories()
         except requests.RequestException as e:
             logger.error(f"WooCommerce category fetch failed: {e}")
             return []
@@ -131,16 +203,21 @@ class WooCommerceProductAdapter(BaseProductAdapter):
 class WooCommerceOrderAdapter(BaseOrderAdapter):
 
     def sync_order(self, order):
-        """Create an order in WooCommerce matching the local order."""
+        """
+        Create an order in WooCommerce matching the local order.
+        Raises RuntimeError on failure (retried by the outbox worker).
+        """
         wc_line_items = []
+        synced_items = []
         for item in order.items.select_related('product').all():
             product = item.product
             ext_id = product.external_id
             if ext_id:
                 wc_line_items.append({
                     'product_id': int(ext_id),
-                    'quantity': item.quantity,
+                    'quantity': _wc_quantity(item.quantity),
                 })
+                synced_items.append(item)
 
         if not wc_line_items:
             logger.warning(f"Order {order.id}: no items with external IDs, skipping WC sync")
@@ -172,68 +249,95 @@ class WooCommerceOrderAdapter(BaseOrderAdapter):
             'line_items': wc_line_items,
         }
 
+        if order.external_order_id:
+            return order.external_order_id  # already pushed (e.g. a retried outbox row)
+
         try:
-            resp = requests.post(
+            resp = get_client().post(
                 _wc_url('orders'),
                 auth=_wc_auth(),
                 json=wc_payload,
-                timeout=30,
             )
-            if resp.status_code == 201:
-                wc_data = resp.json()
-                external_id = str(wc_data.get('id', ''))
-                order.external_order_id = external_id
-                order.save(update_fields=['external_order_id'])
-                logger.info(f"Order {order.id} synced to WC as {external_id}")
-                return external_id
-            else:
-                logger.error(f"WC order sync failed ({resp.status_code}): {resp.text}")
-                return None
         except requests.RequestException as e:
-            logger.error(f"WC order sync error: {e}")
-            return None
+            raise RuntimeError(f"WC order sync error: {e}")
+        if resp.status_code != 201:
+            raise RuntimeError(f"WC order sync failed ({resp.status_code}): {resp.text[:500]}")
+
+        wc_data = resp.json()
+        external_id = str(wc_data.get('id', ''))
+        order.external_order_id = external_id
+        order.external_source = 'woocommerce'
+        order.save(update_fields=['external_order_id', 'external_source'])
+        # Remember WC's line item ids so picker weight updates need no lookup
+        _store_line_item_ids(synced_items, wc_data.get('line_items', []))
+        logger.info(f"Order {order.id} synced to WC as {external_id}")
+        return external_id
 
     def update_item_weight(self, order, product, actual_weight):
         """Update the actual weight of an item in the WooCommerce order."""
+        item = OrderItem.objects.select_related('product').filter(order=order, product=product).first()
+        if item is None:
+            raise ValueError("Item not found in order")
+        item.actual_weight = actual_weight
+        return self.update_item_weights(order, [item])
+
+    def update_item_weights(self, order, items):
+        """
+        Push every weight in one PUT. Line item ids come from the local
+        items (stored at sync); only orders synced before that was
+        recorded cost one extra GET, after which the ids are stored too.
+        """
         if not order.external_order_id:
             raise ValueError("Order is not synced to WooCommerce")
-        if not product.external_id:
-            raise ValueError("Product is not mapped to WooCommerce")
+        for item in items:
+            if not item.product.external_id:
+                raise ValueError(f"Product {item.product.name} is not mapped to WooCommerce")
 
         wc_order_url = _wc_url(f"orders/{order.external_order_id}")
 
-        # Fetch WC order to find line item ID
-        try:
-            resp = requests.get(wc_order_url, auth=_wc_auth(), timeout=15)
-            resp.raise_for_status()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to fetch WC order: {e}")
-
-        wc_order_data = resp.json()
-        target_item_id = None
-        for item in wc_order_data.get('line_items', []):
-            if item['product_id'] == int(product.external_id):
-                target_item_id = item['id']
-                break
-
-        if not target_item_id:
-            raise ValueError("Item not found in WooCommerce order")
+        missing = [item for item in items if not item.external_line_item_id]
+        if missing:
+            try:
+                resp = get_client().get(wc_order_url, auth=_wc_auth())
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                raise RuntimeError(f"Failed to fetch WC order: {e}")
+            _store_line_item_ids(missing, resp.json().get('line_items', []))
+            unmatched = [item.product.name for item in missing if not item.external_line_item_id]
+            if unmatched:
+                raise ValueError(f"Item not found in WooCommerce order: {', '.join(unmatched)}")
 
         update_payload = {
             'line_items': [{
-                'id': target_item_id,
+                'id': int(item.external_line_item_id),
                 'meta_data': [
-                    {'key': 'Actual Weight', 'value': f"{actual_weight} kg"},
+                    {'key': 'Actual Weight', 'value': f"{item.actual_weight} kg"},
                     {'key': 'Picker Status', 'value': 'Weighed'},
                 ],
-            }],
+            } for item in items],
         }
 
         try:
-            update_resp = requests.put(
-                wc_order_url, auth=_wc_auth(), json=update_payload, timeout=15
+            update_resp = get_client().put(
+                wc_order_url, auth=_wc_auth(), json=update_payload
             )
             update_resp.raise_for_status()
             return True
         except requests.RequestException as e:
             raise RuntimeError(f"WC weight update failed: {e}")
+
+
+def _store_line_item_ids(items, wc_line_items):
+    """Match WC line items to local OrderItems by product and save their ids."""
+    ids_by_product = {}
+    for line in wc_line_items:
+        if line.get('id') is not None:
+            ids_by_product.setdefault(str(line.get('product_id')), []).append(str(line['id']))
+    matched = []
+    for item in items:
+        ids = ids_by_product.get(str(item.product.external_id))
+        if ids:
+            item.external_line_item_id = ids.pop(0)
+            matched.append(item)
+    if matched:
+        OrderItem.objects.bulk_update(matched, ['external_line_item_id'])
@@ -0,0 +1,119 @@
+"""
+Catalog cache — versioned cache of fully serialized product list pages.
+
+Every cached page is tagged with the current catalog version. Saving or
+deleting a Product, Category or UnitOfMeasure bumps the version once the
+transaction commits (see api/signals.py), so stale pages are simply never
+read again and expire on their own. A warm hit costs two cache reads and
+no DB queries.
+
+Version keys only reach other processes through a shared cache backend
+(REDIS_URL, see config/settings.py). With the per-process local-memory
+fallback, another worker keeps its own version: its pages live for
+CATALOG_CACHE_TIMEOUT, and in-process structures built on a version
+rebuild once expired() says they are older than LOCAL_CACHE_MAX_AGE.
+"""
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = '{namespace}:version'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _initial_version():
+    # A new sequence starts from the clock, not 1, so an evicted/cleared
+    # version key can never repeat a number that in-process structures
+    # (search index, price table) were built for.
+    return time.time_ns() // 1000
+
+
+def get_version(namespace='catalog'):
+    """Return the current version number for a cache namespace."""
+    key = VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        initial = _initial_version()
+        cache.add(key, initial, timeout=None)
+        version = cache.get(key, initial)
+    return version
+
+
+def bump_version(namespace='catalog'):
+    """Invalidate everything tagged with the namespace. Returns the new version."""
+    key = VERSION_KEY.format(namespace=namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key missing (first write or evicted) — start a fresh sequence
+        cache.add(key, _initial_version(), timeout=None)
+        return cache.incr(key)
+
+
+def bump_version_on_commit(namespace='catalog'):
+    """
+    bump_version() once the current transaction commits (at once outside
+    one). Bumping earlier lets a concurrent reader cache the old rows under
+    the new version, and a rollback would leave the bump behind.
+    """
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def expired(built_at):
+    """True if an in-process structure built at `built_at` (time.monotonic()) is past LOCAL_CACHE_MAX_AGE."""
+    max_age = getattr(settings, 'LOCAL_CACHE_MAX_AGE', 0)
+    return bool(max_age) and time.monotonic() - built_at > max_age
+
+
+def _page_key(version, params):
+    raw = '|'.join(repr(p) for p in params)
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f"catalog:v{version}:list:{digest}"
+
+
+def get_or_build(params, build, track=True):
+    """
+    Return the cached page for `params` or call `build()` and cache its result.
+    `params` is a tuple like (category, search, page, per_page). Pass
+    track=False for auxiliary entries that should not count in stats().
+    """
+    key = _page_key(get_version(), params)
+    data = cache.get(key)
+    if data is not None:
+        if track:
+            _record('hits')
+        return data
+
+    if track:
+        _record('misses')
+    data = build()
+    cache.set(key, data, timeout=getattr(settings, 'CATALOG_CACHE_TIMEOUT', 3600))
+    return data
+
+
+def _record(counter):
+    with _stats_lock:
+        _stats[counter] += 1
+
+
+def stats():
+    """Hit/miss counters for this process."""
+    with _stats_lock:
+        total = _stats['hits'] + _stats['misses']
+        return {
+            'hits': _stats['hits'],
+            'misses': _stats['misses'],
+            'hit_ratio': round(_stats['hits'] / total, 4) if total else 0.0,
+            'version': get_version(),
+        }
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats['hits'] = 0
+        _stats['misses'] = 0
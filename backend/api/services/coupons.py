@@ -0,0 +1,169 @@
+"""
+Coupon registry — a process-local table of active coupons.
+
+Built from three queries (coupons, product and category scopes) and kept
+until the 'coupons' version moves on: saving or deleting a Coupon, or
+changing its scope, bumps it once the transaction commits (see
+api/signals.py). Other processes only see the bump through a shared cache
+(REDIS_URL); without one they rebuild once their registry is
+LOCAL_CACHE_MAX_AGE old (see services/catalog_cache.py). A warm lookup
+costs one cache read (the version) and no DB queries, so applying a
+coupon on every keystroke is cheap.
+
+Only active coupons are held. Expiry is checked at lookup time against
+valid_until, because it needs no save to happen. Each held coupon carries
+its scope as `product_ids` / `category_ids` frozensets, which
+pricing.coupon_discount reads.
+
+Usage limits are never read from here: the registry's times_used is as
+old as the last reload. reserve() counts a use with conditional UPDATEs
+inside the checkout transaction,
+
+    UPDATE coupon SET times_used = times_used + 1
+     WHERE id = :id AND (usage_limit IS NULL OR times_used < usage_limit)
+
+so concurrent checkouts can never take a coupon past its limit. A
+cancelled order gives its uses back (release(), via services/order_status).
+"""
+import threading
+import time
+from collections import Counter
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from api.models import Coupon, CouponRedemption, CouponUsage
+from . import catalog_cache
+
+NAMESPACE = 'coupons'
+
+
+class CouponRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.built_at = 0.0
+        self._by_code = {}
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def build_from_db(self, version=None):
+        by_code, by_id = {}, {}
+        for coupon in Coupon.objects.filter(is_active=True):
+            coupon.product_ids, coupon.category_ids = set(), set()
+            by_code[coupon.code] = by_id[coupon.pk] = coupon
+        for through, field, attr in (
+            (Coupon.products.through, 'product_id', 'product_ids'),
+            (Coupon.categories.through, 'category_id', 'category_ids'),
+        ):
+            for coupon_id, target_id in through.objects.filter(coupon_id__in=list(by_id)).values_list('coupon_id', field):
+                getattr(by_id[coupon_id], attr).add(target_id)
+        for coupon in by_id.values():
+            coupon.product_ids, coupon.category_ids = frozenset(coupon.product_ids), frozenset(coupon.category_ids)
+        with self._lock:
+            self._by_code = by_code
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def get(self, code):
+        """The active coupon for `code` (expired or not), or None."""
+        return self._by_code.get(code)
+
+    def available(self, now=None):
+        """Active, unexpired coupons, ordered by code."""
+        now = now or timezone.now()
+        return sorted(
+            (c for c in self._by_code.values() if c.valid_until is None or c.valid_until >= now),
+            key=lambda c: c.code,
+        )
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """Return the process-wide registry, rebuilding it if a coupon changed."""
+    global _registry
+    version = catalog_cache.get_version(NAMESPACE)
+    with _registry_lock:
+        if _registry is None:
+            _registry = CouponRegistry()
+        if _registry.version != version or catalog_cache.expired(_registry.built_at):
+            _registry.build_from_db(version=version)
+        return _registry
+
+
+def get(code):
+    if not isinstance(code, str):
+        return None
+    return get_registry().get(code)
+
+
+def available(now=None):
+    return get_registry().available(now)
+
+
+def invalidate():
+    """Coupon signal hook: move the version on once the change commits."""
+    catalog_cache.bump_version_on_commit(NAMESPACE)
+
+
+def reset():
+    global _registry
+    with _registry_lock:
+        _registry = None
+
+
+# === Usage limits ===
+
+class CouponUnavailable(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def reserve(user, coupons):
+    """
+    Count one use of each coupon by `user`, or raise CouponUnavailable and
+    count none. Call it last in the checkout transaction: the counter rows
+    stay locked until commit.
+    """
+    with transaction.atomic():
+        for coupon in coupons:
+            if coupon.per_user_limit is not None:
+                CouponUsage.objects.bulk_create([CouponUsage(coupon_id=coupon.pk, user=user)], ignore_conflicts=True)
+                if not CouponUsage.objects.filter(
+                    coupon_id=coupon.pk, user=user, used__lt=coupon.per_user_limit,
+                ).update(used=F('used') + 1):
+                    raise CouponUnavailable(f'You have already used {coupon.code}', code=coupon.code)
+            if not Coupon.objects.filter(pk=coupon.pk, is_active=True).filter(
+                Q(usage_limit__isnull=True) | Q(times_used__lt=F('usage_limit')),
+            ).update(times_used=F('times_used') + 1):
+                raise CouponUnavailable(f'{coupon.code} has been fully redeemed', code=coupon.code)
+
+
+def record(order, discounts):
+    """Store the coupons a quote applied to `order` (release() reads them back)."""
+    CouponRedemption.objects.bulk_create([
+        CouponRedemption(order=order, coupon=coupon, code=coupon.code, discount_amount=amount)
+        for coupon, amount in discounts
+    ])
+
+
+def release(order_ids):
+    """Give back the uses of cancelled orders. Call once per order (order_status does)."""
+    per_coupon, per_user = Counter(), Counter()
+    for coupon_id, user_id in CouponRedemption.objects.filter(
+        order_id__in=order_ids, coupon__isnull=False,
+    ).values_list('coupon_id', 'order__user_id'):
+        per_coupon[coupon_id] += 1
+        per_user[(coupon_id, user_id)] += 1
+
+    for coupon_id, count in per_coupon.items():
+        Coupon.objects.filter(pk=coupon_id, times_used__gte=count).update(times_used=F('times_used') - count)
+    for (coupon_id, user_id), count in per_user.items():
+        CouponUsage.objects.filter(
+            coupon_id=coupon_id, user_id=user_id, used__gte=count,
+        ).update(used=F('used') - count)
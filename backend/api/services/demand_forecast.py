@@ -0,0 +1,148 @@
+"""
+Subscription demand forecast — committed volume per product per day.
+
+Expands every ACTIVE subscription over a horizon of `days` days from
+`start` with the same calendar as the fulfilment run
+(services/subscriptions.py), so procurement buys what the nightly runs
+will actually order.
+
+Subscriptions are never expanded one by one. Within the horizon a
+subscription's deliveries depend only on its schedule (frequency and
+calendar anchor) and on where that schedule picks up: its
+next_delivery_date if that falls inside the horizon, else `start`. So
+SQL resolves each delivery pincode to its DeliveryZone (exact row, else
+the longest prefix rule, as services/serviceability.py does) and sums
+quantity per
+
+    (product, zone, frequency, anchor, first delivery in the horizon)
+
+Group counts are bounded by products x zones x schedules x (days + 1),
+whatever the number of subscriptions. Each schedule's delivery offsets
+are computed once and added onto per-day quantity arrays once per group.
+
+A subscription whose next_delivery_date is before `start` is assumed to
+be fulfilled by the runs in between, so it picks up its schedule from
+`start`. PAUSED and CANCELLED subscriptions, and products no longer sold,
+are left out. Pincodes outside every zone are reported under zone None.
+"""
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from django.db.models import Case, DateField, F, IntegerField, OuterRef, Subquery, Sum, When
+from django.db.models.functions import ExtractDay, ExtractIsoWeekDay
+from django.utils import timezone
+from api.models import Address, DeliveryZone, Product, Subscription
+from . import serviceability, subscriptions
+
+
+def schedule_offsets(frequency, anchor_value, start, days):
+    """Day offsets from `start` (0 .. days-1) of every delivery on this schedule."""
+    offsets = []
+    day = subscriptions.next_date(frequency, start - timedelta(days=1), anchor_value)
+    while (offset := (day - start).days) < days:
+        offsets.append(offset)
+        day = subscriptions.next_date(frequency, day, anchor_value)
+    return offsets
+
+
+def _grouped_demand(start, days):
+    """Summed quantity per (product, zone, frequency, anchor, first delivery date or None)."""
+    zones = serviceability.get_map()
+    # The zone is resolved on the address row, so its CASE reads a plain column
+    default_zone = (
+        Address.objects.filter(user=OuterRef('user')).order_by('-is_default', '-created_at')
+        .annotate(zone_id=zones.zone_expression('zip_code')).values('zone_id')[:1]
+    )
+    return (
+        Subscription.objects.filter(
+            status='ACTIVE', product__is_active=True, next_delivery_date__lt=start + timedelta(days=days),
+        )
+        .annotate(
+            zone_id=Case(
+                When(address__isnull=False, then=zones.zone_expression('address__zip_code')),
+                default=Subquery(default_zone), output_field=IntegerField(),
+            ),
+            # Same buckets as subscriptions.anchor(), with ISO weekdays (1 = Monday)
+            anchor=Case(
+                When(frequency='WEEKLY', then=ExtractIsoWeekDay('start_date')),
+                When(frequency='MONTHLY', then=ExtractDay('start_date')),
+                default=None, output_field=IntegerField(),
+            ),
+            first=Case(
+                When(next_delivery_date__lt=start, then=None),
+                default=F('next_delivery_date'), output_field=DateField(),
+            ),
+        )
+        .values('product_id', 'zone_id', 'frequency', 'anchor', 'first')
+        .annotate(quantity=Sum('quantity'))
+        .order_by()
+    )
+
+
+def forecast(days=7, start=None):
+    """
+    Committed demand for `days` days from `start` (default tomorrow):
+    {'start', 'days', 'dates', 'products': [...], 'zones': [...]}, where each
+    product / (zone, product) row carries a `quantities` list aligned with `dates`.
+    """
+    start = start or timezone.localdate() + timedelta(days=1)
+    schedules = {}
+    by_product = defaultdict(lambda: [0] * days)
+    by_zone = defaultdict(lambda: [0] * days)
+
+    for group in _grouped_demand(start, days):
+        frequency, anchor = group['frequency'], group['anchor']
+        key = (frequency, anchor - 1 if frequency == 'WEEKLY' else anchor)
+        if key not in schedules:
+            schedules[key] = schedule_offsets(*key, start, days)
+        offsets = schedules[key]
+
+        if group['first'] is not None:
+            # Delivered on its next date (even one off the schedule), then on schedule
+            first = (group['first'] - start).days
+            offsets = [first, *offsets[bisect_right(offsets, first):]]
+
+        quantity = group['quantity']
+        product_row = by_product[group['product_id']]
+        zone_row = by_zone[(group['zone_id'], group['product_id'])]
+        for offset in offsets:
+            product_row[offset] += quantity
+            zone_row[offset] += quantity
+
+    products = {
+        row['id']: row for row in
+        Product.objects.filter(pk__in=list(by_product)).values('id', 'name', 'pricing_unit__symbol')
+    }
+    zones = {
+        row['id']: row for row in
+        DeliveryZone.objects.filter(pk__in={zone_id for zone_id, _ in by_zone}).values('id', 'zip_code', 'city')
+    }
+
+    def product_fields(product_id, quantities):
+        product = products[product_id]
+        return {
+            'product_id': product_id,
+            'name': product['name'],
+            'unit': product['pricing_unit__symbol'],
+            'quantities': quantities,
+            'total': sum(quantities),
+        }
+
+    def zone_fields(zone_id):
+        zone = zones.get(zone_id) or {}
+        return {'zone_id': zone_id, 'zip_code': zone.get('zip_code'), 'city': zone.get('city')}
+
+    return {
+        'start': start,
+        'days': days,
+        'dates': [start + timedelta(days=offset) for offset in range(days)],
+        'products': sorted(
+            (product_fields(product_id, quantities) for product_id, quantities in by_product.items()),
+            key=lambda row: row['name'],
+        ),
+        'zones': sorted(
+            ({**zone_fields(zone_id), **product_fields(product_id, quantities)}
+             for (zone_id, product_id), quantities in by_zone.items()),
+            key=lambda row: (row['zip_code'] is None, row['zip_code'] or '', row['name']),
+        ),
+    }
@@ -0,0 +1,230 @@
+"""
+HttpClient — the shared outbound HTTP client for third-party integrations
+(WooCommerce, Twilio, image downloads).
+
+- one pooled keep-alive requests.Session per host
+- default (connect, read) timeouts on every call
+- bounded retries with full jitter, for idempotent methods only
+- a per-host circuit breaker that fails fast while a host is unhealthy
+- per-host latency / error metrics (HttpClient.stats())
+
+Errors are requests exceptions (CircuitOpenError is a ConnectionError),
+so existing `except requests.RequestException` handlers keep working.
+"""
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without calling the host while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True  # let exactly one probe through
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        """Give back a probe that ended without a verdict (not a requests error)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+                self._trial_in_flight = False
+
+
+class HostMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'short_circuited': self.short_circuited,
+            'avg_ms': round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            'max_ms': round(self.max_ms, 2),
+        }
+
+
+class HttpClient:
+    IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+    RETRY_STATUSES = {502, 503, 504}
+
+    def __init__(self, connect_timeout=3.05, read_timeout=15, retries=2, backoff=0.2,
+                 pool_size=10, failure_threshold=5, reset_timeout=30.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._breakers = {}
+        self._metrics = {}
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+                self._metrics[host] = HostMetrics()
+            return self._sessions[host], self._breakers[host], self._metrics[host]
+
+    def breaker(self, url_or_host):
+        host = urlsplit(url_or_host).netloc or url_or_host
+        return self._host_state(host)[1]
+
+    def _sleep_before_retry(self, attempt):
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, method, url, retries=None, **kwargs):
+        method = method.upper()
+        host = urlsplit(url).netloc
+        session, breaker, metrics = self._host_state(host)
+        kwargs.setdefault('timeout', self.timeout)
+        if retries is None:
+            retries = self.retries if method in self.IDEMPOTENT_METHODS else 0
+
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                with self._lock:
+                    metrics.short_circuited += 1
+                raise CircuitOpenError(f"Circuit open for {host}")
+
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                # Every outcome must reach the breaker, or a HALF_OPEN probe
+                # stays in flight and the host is short-circuited for good.
+                # Only connection errors and timeouts are worth retrying.
+                self._record(metrics, started, error=True)
+                breaker.record_failure()
+                if attempt == retries or not isinstance(e, (requests.ConnectionError, requests.Timeout)):
+                    raise
+                logger.warning(f"{method} {host} failed ({e}), retrying")
+            except BaseException:
+                breaker.release_trial()
+                raise
+            else:
+                failed = response.status_code >= 500
+                self._record(metrics, started, error=failed)
+                if not failed:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt == retries or response.status_code not in self.RETRY_STATUSES:
+                    return response
+
+            with self._lock:
+                metrics.retries += 1
+            self._sleep_before_retry(attempt)
+
+    def _record(self, metrics, started, error):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            metrics.requests += 1
+            metrics.total_ms += elapsed_ms
+            metrics.max_ms = max(metrics.max_ms, elapsed_ms)
+            if error:
+                metrics.errors += 1
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            return {
+                host: {**metrics.as_dict(), 'circuit': self._breakers[host].state}
+                for host, metrics in self._metrics.items()
+            }
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._breakers.clear()
+            self._metrics.clear()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """The process-wide client, configured from settings.HTTP_CLIENT."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            options = getattr(settings, 'HTTP_CLIENT', {})
+            _client = HttpClient(**{k.lower(): v for k, v in options.items()})
+        return _client
+
+
+def reset_client():
+    """Drop pooled connections, breakers and metrics (settings changes, tests)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
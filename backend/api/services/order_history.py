@@ -0,0 +1,52 @@
+"""
+Order history — keyset-paginated on (created_at, id), newest first.
+
+A page costs a constant number of queries however long the history is:
+full mode loads the orders, then every item with its product name in one
+prefetch; summary mode is a single query with the item count annotated.
+"""
+import uuid
+from datetime import datetime
+from django.db.models import Count, Prefetch, Q
+from api.models import Order, OrderItem
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+SUMMARY_FIELDS = ('id', 'total_price', 'payment_status', 'delivery_status', 'is_cod', 'created_at')
+
+
+def _queryset(user, summary):
+    qs = Order.objects.filter(user=user).order_by('-created_at', '-id')
+    if summary:
+        return qs.only(*SUMMARY_FIELDS).annotate(item_count=Count('items'))
+    items = OrderItem.objects.select_related('product').only(
+        'order', 'product', 'quantity', 'price_at_purchase', 'product__name',
+    )
+    return qs.prefetch_related(Prefetch('items', queryset=items))
+
+
+def _seek(qs, cursor):
+    created_at, order_id = decode_cursor(cursor, length=2)
+    try:
+        created_at = datetime.fromisoformat(created_at)
+        order_id = uuid.UUID(order_id)
+    except (TypeError, ValueError, AttributeError):
+        raise InvalidCursor('Malformed cursor')
+    return qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=order_id))
+
+
+def history_page(user, cursor=None, per_page=20, summary=False):
+    """
+    Returns (orders, next_cursor). Pass cursor='' (or None) for the newest
+    page. Summary-mode orders carry an `item_count` attribute.
+    Raises InvalidCursor.
+    """
+    qs = _queryset(user, summary)
+    if cursor:
+        qs = _seek(qs, cursor)
+    orders = list(qs[:per_page + 1])
+    next_cursor = None
+    if len(orders) > per_page:
+        orders = orders[:per_page]
+        last = orders[-1]
+        next_cursor = encode_cursor([last.created_at.isoformat(), last.id.hex])
+    return orders, next_cursor
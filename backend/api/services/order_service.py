@@ -3,12 +3,24 @@ OrderService — business logic for orders.
 Handles local order creation + optional external sync via adapter.
 """
 import logging
-from api.models import Order, OrderItem, Product, Coupon
+import uuid
+from decimal import Decimal, InvalidOperation
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from api.models import Order, OrderItem
 from .adapters import get_order_adapter
+from . import coupons, order_sync, pricing, serviceability, wallet
 
 logger = logging.getLogger(__name__)
 
 
+def _differs(client_total, total):
+    try:
+        return abs(Decimal(str(client_total)) - total) >= pricing.CENT
+    except InvalidOperation:
+        return True
+
+
 class OrderService:
     def __init__(self, adapter=None):
         self.adapter = adapter or get_order_adapter()
@@ -17,6 +29,11 @@ class OrderService:
         """
         Create a local order and optionally sync to external system.
         Returns (order, error_response) tuple. error_response is None on success.
+
+        Totals are computed by the pricing engine from the catalog; client
+        prices are ignored. Items are written with one bulk insert; the
+        wallet debit, order, items and sync outbox row commit together or
+        not at all.
         """
         payment_method = data.get('payment_method', 'COD')
 
@@ -30,77 +47,97 @@ class OrderService:
                     'status': 403,
                 }
 
-        elif payment_method == 'WALLET':
-            total_price = data.get('total_price', 0)
+        # === Coupon Logic ===
+        # `coupon_codes` stacks several; `coupon_code` is the single-coupon form
+        try:
+            coupon_codes = pricing.coupon_codes(data.get('coupon_codes') or data.get('coupon_code'))
+        except pricing.PricingError as e:
+            return None, {'success': False, 'user_msg': e.message, 'status': 400}
+        applied = [coupons.get(code) for code in coupon_codes]
+        if None in applied:
+            return None, {'success': False, 'user_msg': 'Invalid Coupon Code', 'status': 400}
+
+        # === Price Items Server-Side (price table, no per-line queries) ===
+        items_data = data.get('items', [])
+        try:
+            quote = pricing.quote(items_data, coupon=applied, user=user)
+        except pricing.PricingError as e:
+            error = {'success': False, 'user_msg': e.message, 'status': 400}
+            if hasattr(e, 'unresolved'):
+                logger.warning(f"Order rejected, unknown products: {e.unresolved}")
+                error['unresolved_items'] = e.unresolved
+            return None, error
+
+        total_price = quote.total
+        client_total = data.get('total_price')
+        if client_total not in (None, '') and _differs(client_total, total_price):
+            logger.warning(f"Client total {client_total} != server total {total_price} for user {user.pk}")
+
+        if payment_method == 'WALLET':
             if user.wallet_balance < total_price:
                 return None, {
                     'success': False,
                     'user_msg': 'Insufficient Wallet Balance',
                     'status': 400,
                 }
-            user.wallet_balance -= total_price
-            user.save()
 
-        # === Coupon Logic ===
-        coupon_code = data.get('coupon_code')
-        coupon = None
-        discount_amount = 0.00
-
-        if coupon_code:
-            try:
-                coupon = Coupon.objects.get(code=coupon_code, is_active=True)
-                discount_amount = coupon.discount_amount
-            except Coupon.DoesNotExist:
-                pass
+        # From the in-process serviceability map, not a DeliveryZone query
+        zone = serviceability.check(data.get('delivery_zip_code'))
 
         # === Create Local Order ===
-        order = Order.objects.create(
-            user=user,
-            total_price=data.get('total_price', 0),
-            is_cod=(payment_method == 'COD'),
-            is_otp_verified=user.is_phone_verified,
-            delivery_name=data.get('delivery_name', ''),
-            delivery_street=data.get('delivery_street', ''),
-            delivery_city=data.get('delivery_city', ''),
-            delivery_zip_code=data.get('delivery_zip_code', ''),
-            coupon=coupon,
-            discount_amount=discount_amount,
-        )
-
-        # === Process Items ===
-        items_data = data.get('items', [])
-        for item in items_data:
-            product_id = item.get('product_id')
-            qty = item.get('quantity', 1)
-            price = item.get('price', 0)
-
-            try:
-                # Try by external_id first (for WC compatibility), then by local UUID
-                product = self._resolve_product(product_id)
-                if product:
-                    OrderItem.objects.create(
+        try:
+            with transaction.atomic():
+                order = Order.objects.create(
+                    user=user,
+                    total_price=total_price,
+                    is_cod=(payment_method == 'COD'),
+                    is_otp_verified=user.is_phone_verified,
+                    payment_provider='RAZORPAY' if payment_method == 'RAZORPAY' else None,
+                    delivery_name=data.get('delivery_name', ''),
+                    delivery_street=data.get('delivery_street', ''),
+                    delivery_city=data.get('delivery_city', ''),
+                    delivery_zip_code=data.get('delivery_zip_code', ''),
+                    delivery_zone_id=zone.zone_id if zone else None,
+                    coupon=quote.coupon,
+                    discount_amount=quote.discount,
+                )
+                if payment_method == 'WALLET' and total_price > 0:
+                    # Conditional UPDATE + ledger entry; a concurrent checkout
+                    # cannot take the balance below zero.
+                    wallet.debit(user, total_price, order=order)
+
+                OrderItem.objects.bulk_create([
+                    OrderItem(
                         order=order,
-                        product=product,
-                        quantity=qty,
-                        price_at_purchase=price,
+                        product_id=line.entry.product_id,
+                        quantity=line.quantity,
+                        price_at_purchase=line.unit_price,
                     )
-                else:
-                    logger.warning(f"Product not found for ID {product_id}")
-            except Exception as e:
-                logger.error(f"Error processing item {item}: {e}")
-
-        # === Sync to External System ===
-        try:
-            self.adapter.sync_order(order)
-        except Exception as e:
-            logger.error(f"External order sync failed: {e}")
-            # Order is still saved locally — sync failure is non-blocking
+                    for line in quote.lines
+                ])
+
+                # === Queue Sync to External System ===
+                # Pushed by `manage.py sync_orders_worker`, so checkout never
+                # waits on (or loses an order to) a slow external system.
+                if self.adapter.is_external:
+                    order_sync.enqueue(order)
+
+                # Last, so the coupon counter rows are locked only until commit
+                if quote.discounts:
+                    coupons.record(order, quote.discounts)
+                    coupons.reserve(user, [coupon for coupon, _ in quote.discounts])
+        except coupons.CouponUnavailable as e:
+            return None, {'success': False, 'user_msg': e.message, 'status': 400}
+        except wallet.InsufficientFunds:
+            # Another checkout spent the balance after the check above
+            return None, {
+                'success': False,
+                'user_msg': 'Insufficient Wallet Balance',
+                'status': 400,
+            }
 
         # === Handle Razorpay ===
         if payment_method == 'RAZORPAY':
-            import uuid
-            order.payment_provider = 'RAZORPAY'
-            order.save()
             return order, {
                 'success': True,
                 'order_id': str(order.id),
@@ -118,36 +155,57 @@ class OrderService:
         Picker updates item weight. Saves locally + syncs externally.
         Returns (success: bool, message: str).
         """
+        success, message = self.update_item_weights(
+            order_id, [{'product_id': product_id, 'weight': actual_weight}]
+        )
+        return success, ('Weight updated successfully' if success else message)
+
+    def update_item_weights(self, order_id, weights):
+        """
+        Picker records the weights of several items of one order at once.
+        `weights` is a list of {'product_id', 'weight'}; product_id is the
+        local UUID or external_id. Saves locally with one bulk UPDATE, then
+        pushes all of them to the external system in one call.
+        Returns (success: bool, message: str).
+        """
         try:
             order = Order.objects.get(id=order_id)
-        except Order.DoesNotExist:
+        except (Order.DoesNotExist, ValidationError):
             return False, 'Order Not Found'
-
-        product = self._resolve_product(product_id)
-        if not product:
-            return False, 'Product Not Found'
-
-        # Sync externally (adapter handles WC or no-op for local)
+        if not weights:
+            return False, 'No items to update'
+
+        items_by_key = {}
+        for item in order.items.select_related('product'):
+            items_by_key[str(item.product_id)] = item
+            if item.product.external_id:
+                items_by_key[item.product.external_id] = item
+
+        updated, unknown = {}, []
+        for entry in weights:
+            item = items_by_key.get(str(entry.get('product_id')))
+            if item is None:
+                unknown.append(entry.get('product_id'))
+                continue
+            try:
+                weight = Decimal(str(entry.get('weight')))
+            except InvalidOperation:
+                return False, f"Invalid weight for {item.product.name}"
+            if not weight.is_finite() or weight <= 0:
+                return False, f"Invalid weight for {item.product.name}"
+            item.actual_weight = weight.quantize(Decimal('0.001'))
+            updated[item.pk] = item
+        if unknown:
+            return False, f"Product Not Found in order: {', '.join(map(str, unknown))}"
+
+        items = list(updated.values())
+        if self.adapter.is_external:
+            # Keep the weights even if the external push fails; the picker can resend
+            OrderItem.objects.bulk_update(items, ['actual_weight'])
         try:
-            self.adapter.update_item_weight(order, product, actual_weight)
+            self.adapter.update_item_weights(order, items)
         except Exception as e:
             logger.error(f"External weight update failed: {e}")
             return False, str(e)
 
-        return True, 'Weight updated successfully'
-
-    def _resolve_product(self, product_id):
-        """Resolve a product by external_id OR local UUID."""
-        # Try external_id first (for WC-originated IDs from frontend)
-        try:
-            return Product.objects.get(external_id=str(product_id))
-        except Product.DoesNotExist:
-            pass
-
-        # Try local UUID
-        try:
-            return Product.objects.get(id=product_id)
-        except (Product.DoesNotExist, ValueError):
-            pass
-
-        return None
+        return True, f"{len(items)} weight(s) updated"
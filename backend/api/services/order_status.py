@@ -0,0 +1,184 @@
+"""
+Order status state machine.
+
+delivery_status and payment_status only move along the edges below. Every
+transition is one conditional UPDATE of just the status, its timestamp
+and updated_at:
+
+    UPDATE order SET delivery_status = 'OUT_FOR_DELIVERY',
+                     out_for_delivery_at = :now, updated_at = :now
+     WHERE id IN (...) AND delivery_status IN ('PACKING')
+
+so moving a whole wave costs one statement (per chunk of ids), and two
+dispatchers racing on the same orders cannot both win. Orders already in
+the target state are left alone, which keeps redelivered webhooks and
+repeated clicks harmless.
+
+Side effects run in the same transaction: cancelling refunds wallet
+payments and gives back coupon uses, and a completed payment marks the
+customer as having ordered.
+"""
+from django.db import transaction
+from django.utils import timezone
+from api.models import Order, User, WalletEntry
+from . import coupons, wallet
+
+DELIVERY = 'delivery_status'
+PAYMENT = 'payment_status'
+
+TRANSITIONS = {
+    DELIVERY: {
+        'PENDING': {'PACKING', 'CANCELLED'},
+        'PACKING': {'OUT_FOR_DELIVERY', 'CANCELLED'},
+        'OUT_FOR_DELIVERY': {'DELIVERED', 'CANCELLED'},
+        'DELIVERED': set(),
+        'CANCELLED': set(),
+    },
+    PAYMENT: {
+        'PENDING': {'COMPLETED', 'FAILED'},
+        'FAILED': {'COMPLETED'},  # the customer retried and paid
+        'COMPLETED': set(),
+    },
+}
+
+TIMESTAMPS = {
+    (DELIVERY, 'PACKING'): 'packed_at',
+    (DELIVERY, 'OUT_FOR_DELIVERY'): 'out_for_delivery_at',
+    (DELIVERY, 'DELIVERED'): 'delivered_at',
+    (DELIVERY, 'CANCELLED'): 'cancelled_at',
+    (PAYMENT, 'COMPLETED'): 'paid_at',
+    (PAYMENT, 'FAILED'): 'payment_failed_at',
+}
+
+# Extra columns a transition may write alongside the status
+EXTRA_FIELDS = {
+    (DELIVERY, 'OUT_FOR_DELIVERY'): {'driver_name', 'driver_phone'},
+    (PAYMENT, 'COMPLETED'): {'transaction_id'},
+}
+CHUNK_SIZE = 900  # stays under SQLite's bound-parameter limit
+
+
+class InvalidTransition(ValueError):
+    def __init__(self, message, current=None):
+        super().__init__(message)
+        self.message = message
+        self.current = current
+
+
+def sources(field, target):
+    """States `target` can be reached from."""
+    try:
+        states = TRANSITIONS[field]
+    except KeyError:
+        raise InvalidTransition(f"Unknown status field '{field}'")
+    if not isinstance(target, str) or target not in states:
+        raise InvalidTransition(f"Unknown {field} '{target}'")
+    return [state for state, targets in states.items() if target in targets]
+
+
+def _changes(field, target, extra):
+    extra = extra or {}
+    unexpected = set(extra) - EXTRA_FIELDS.get((field, target), set())
+    if unexpected:
+        raise InvalidTransition(f"Cannot set {', '.join(sorted(unexpected))} when moving to {target}")
+    now = timezone.now()
+    return {field: target, TIMESTAMPS[(field, target)]: now, 'updated_at': now, **extra}
+
+
+class BulkResult:
+    def __init__(self, updated, unchanged, rejected, not_found):
+        self.updated = updated        # ids moved to the target state
+        self.unchanged = unchanged    # ids already in it
+        self.rejected = rejected      # {id: current state} that cannot move there
+        self.not_found = not_found    # ids that do not exist
+
+    def as_dict(self):
+        return {
+            'updated': len(self.updated),
+            'unchanged': len(self.unchanged),
+            'rejected': [{'order_id': pk, 'status': state} for pk, state in self.rejected.items()],
+            'not_found': self.not_found,
+        }
+
+
+def transition_many(order_ids, field, target, extra=None):
+    """
+    Move many orders to `target` with one UPDATE, then read back one
+    SELECT to report what did not move (both per chunk of ids).
+    Returns a BulkResult.
+    """
+    allowed = sources(field, target)
+    changes = _changes(field, target, extra)
+    stamp_field, now = TIMESTAMPS[(field, target)], changes['updated_at']
+    order_ids = list(dict.fromkeys(order_ids))
+
+    after = {}
+    with transaction.atomic():
+        for start in range(0, len(order_ids), CHUNK_SIZE):
+            chunk = order_ids[start:start + CHUNK_SIZE]
+            Order.objects.filter(pk__in=chunk, **{f'{field}__in': allowed}).update(**changes)
+            after.update(
+                (pk, (state, stamp)) for pk, state, stamp in
+                Order.objects.filter(pk__in=chunk).values_list('pk', field, stamp_field)
+            )
+        # Rows this call moved carry exactly the timestamp it wrote
+        updated = [pk for pk, (state, stamp) in after.items() if state == target and stamp == now]
+        if field == DELIVERY and target == 'CANCELLED' and updated:
+            refund_wallet_payments(updated)
+            release_coupons(updated)
+        if field == PAYMENT and target == 'COMPLETED' and updated:
+            mark_customers_ordered(updated)
+
+    unchanged = [pk for pk, (state, stamp) in after.items() if state == target and stamp != now]
+    rejected = {pk: state for pk, (state, _) in after.items() if state != target}
+    not_found = [pk for pk in order_ids if pk not in after]
+    return BulkResult(updated, unchanged, rejected, not_found)
+
+
+def transition(order, field, target, **extra):
+    """
+    Move one order. Returns True if it moved, False if it was already in
+    `target`. Raises InvalidTransition otherwise. `order` is updated in place.
+    """
+    allowed = sources(field, target)
+    changes = _changes(field, target, extra)
+    with transaction.atomic():
+        moved = Order.objects.filter(pk=order.pk, **{f'{field}__in': allowed}).update(**changes)
+        if moved and field == DELIVERY and target == 'CANCELLED':
+            refund_wallet_payments([order.pk])
+            release_coupons([order.pk])
+        if moved and field == PAYMENT and target == 'COMPLETED':
+            mark_customers_ordered([order.pk])
+    if not moved:
+        current = Order.objects.filter(pk=order.pk).values_list(field, flat=True).first()
+        setattr(order, field, current)
+        if current == target:
+            return False
+        raise InvalidTransition(f"Cannot move {field} from {current} to {target}", current=current)
+    for name, value in changes.items():
+        setattr(order, name, value)
+    return True
+
+
+def refund_wallet_payments(order_ids):
+    """Credit back wallet-paid orders that were just cancelled (at most once each)."""
+    for start in range(0, len(order_ids), CHUNK_SIZE):
+        debits = WalletEntry.objects.filter(
+            order_id__in=order_ids[start:start + CHUNK_SIZE], kind='DEBIT',
+        ).exclude(order__wallet_entries__kind='REFUND').select_related('order__user')
+        for entry in debits:
+            wallet.refund(entry.order, amount=-entry.amount, reference='cancelled')
+
+
+def release_coupons(order_ids):
+    """Give back the coupon uses of orders that were just cancelled."""
+    for start in range(0, len(order_ids), CHUNK_SIZE):
+        coupons.release(order_ids[start:start + CHUNK_SIZE])
+
+
+def mark_customers_ordered(order_ids):
+    """Set User.has_completed_order for the owners of newly paid orders (welcome offers read it)."""
+    for start in range(0, len(order_ids), CHUNK_SIZE):
+        User.objects.filter(
+            has_completed_order=False, orders__pk__in=order_ids[start:start + CHUNK_SIZE],
+        ).update(has_completed_order=True)
@@ -0,0 +1,163 @@
+"""
+Order sync outbox — pushes locally placed orders to the external system
+(WooCommerce) outside the checkout request.
+
+place_order() writes an OrderSyncOutbox row in the same transaction as the
+Order, so a committed order always has its sync queued. The worker
+(`manage.py sync_orders_worker`) then repeats three steps:
+
+- claim a batch: SELECT ... FOR UPDATE SKIP LOCKED where the database
+  supports it, else a conditional UPDATE stamped with a claim token
+  (SQLite). Each claimed row gets a lease, so rows held by a crashed
+  worker are picked up again once it expires.
+- push the batch in parallel threads through the order adapter
+- mark rows DONE, or reschedule them with exponential backoff + jitter;
+  after MAX_ATTEMPTS they are left FAILED for a human to look at
+"""
+import logging
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from api.models import OrderSyncOutbox
+from .adapters import get_order_adapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 20,
+    'WORKERS': 4,
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF': 5.0,         # seconds before the first retry, doubled per attempt
+    'MAX_BACKOFF': 1800.0,
+    'LEASE': 120.0,         # seconds a claimed row stays invisible to other workers
+}
+
+
+def get_option(name):
+    return getattr(settings, 'ORDER_SYNC', {}).get(name, DEFAULTS[name])
+
+
+def enqueue(order):
+    """Queue `order` for sync. Call inside the transaction that creates it."""
+    return OrderSyncOutbox.objects.create(order=order)
+
+
+def _claimable(now):
+    return (
+        Q(status='PENDING', next_attempt_at__lte=now)
+        | Q(status='PROCESSING', locked_until__lt=now)
+    )
+
+
+def claim_batch(limit=None):
+    """Lease up to `limit` due rows to this worker. Returns them with orders loaded."""
+    limit = limit or get_option('BATCH_SIZE')
+    now = timezone.now()
+    token = uuid.uuid4()
+    lease = {
+        'status': 'PROCESSING',
+        'claim_token': token,
+        'locked_until': now + timedelta(seconds=get_option('LEASE')),
+    }
+
+    due = OrderSyncOutbox.objects.filter(_claimable(now)).order_by('next_attempt_at', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            OrderSyncOutbox.objects.filter(id__in=ids).update(**lease)
+    else:
+        # No row locks: re-check the claim condition in the UPDATE itself, so
+        # two workers racing for the same row cannot both win it.
+        ids = list(due.values_list('id', flat=True)[:limit])
+        OrderSyncOutbox.objects.filter(_claimable(now), id__in=ids).update(**lease)
+
+    return list(
+        OrderSyncOutbox.objects.filter(claim_token=token, status='PROCESSING')
+        .select_related('order', 'order__user')
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter, in seconds, after `attempts` failures."""
+    delay = min(get_option('BACKOFF') * (2 ** (attempts - 1)), get_option('MAX_BACKOFF'))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _push(entry, adapter):
+    try:
+        adapter.sync_order(entry.order)
+        return entry, None
+    except Exception as e:
+        return entry, e
+
+
+def _push_in_thread(entry, adapter):
+    try:
+        return _push(entry, adapter)
+    finally:
+        connections.close_all()
+
+
+def process_batch(entries, adapter=None, workers=None):
+    """Push claimed rows in parallel and record the outcome. Returns (done, failed)."""
+    if not entries:
+        return 0, 0
+    adapter = adapter or get_order_adapter()
+    workers = workers or get_option('WORKERS')
+    if workers <= 1:
+        results = [_push(entry, adapter) for entry in entries]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(entries))) as pool:
+            results = list(pool.map(lambda entry: _push_in_thread(entry, adapter), entries))
+
+    done = failed = 0
+    now = timezone.now()
+    for entry, error in results:
+        attempts = entry.attempts + 1
+        # Only the current lease holder may record the outcome
+        mine = OrderSyncOutbox.objects.filter(id=entry.id, claim_token=entry.claim_token)
+        if error is None:
+            mine.update(status='DONE', attempts=attempts, locked_until=None, last_error='', updated_at=now)
+            done += 1
+            continue
+
+        failed += 1
+        gave_up = attempts >= get_option('MAX_ATTEMPTS')
+        logger.warning(f"Order {entry.order_id} sync attempt {attempts} failed: {error}")
+        mine.update(
+            status='FAILED' if gave_up else 'PENDING',
+            attempts=attempts,
+            next_attempt_at=now + timedelta(seconds=retry_delay(attempts)),
+            locked_until=None,
+            last_error=str(error)[:2000],
+            updated_at=now,
+        )
+        if gave_up:
+            logger.error(f"Order {entry.order_id} sync gave up after {attempts} attempts")
+    return done, failed
+
+
+def run_once(limit=None, adapter=None, workers=None):
+    """Claim and push one batch. Returns (claimed, done, failed)."""
+    entries = claim_batch(limit)
+    done, failed = process_batch(entries, adapter, workers)
+    return len(entries), done, failed
+
+
+def backlog():
+    """Row counts per status and the age of the oldest unsynced order."""
+    counts = {status: 0 for status, _ in OrderSyncOutbox.STATUS_CHOICES}
+    for row in OrderSyncOutbox.objects.values('status').annotate(n=Count('id')):
+        counts[row['status']] = row['n']
+    oldest = OrderSyncOutbox.objects.filter(
+        status__in=['PENDING', 'PROCESSING']
+    ).aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        **{status.lower(): n for status, n in counts.items()},
+        'oldest_pending_age_s': round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0.0,
+    }
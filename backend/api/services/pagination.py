@@ -0,0 +1,29 @@
+"""
+Opaque cursor helpers for keyset pagination.
+A cursor is the sort key of the last row on a page, JSON-encoded and
+base64'd so clients treat it as a token rather than something to build.
+"""
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Encode a list of JSON-serializable sort-key values into a cursor token."""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, length=None):
+    """Decode a cursor token back into its list of values. Raises InvalidCursor."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('Malformed cursor')
+    if not isinstance(values, list) or (length is not None and len(values) != length):
+        raise InvalidCursor('Malformed cursor')
+    return values
@@ -0,0 +1,124 @@
+"""
+Pick waves — one pick list for every open order in a cut-off window.
+
+Instead of walking the shelves once per order, a picker walks them once
+per wave: quantities for all unclaimed PENDING/PACKING orders up to the
+cut-off are summed per product (one grouped query), grouped into aisles
+(the product category), and then sorted back into orders at a put wall,
+one slot per order (one more query). Cost is two queries whatever the
+wave size.
+
+claim=True locks the wave's orders and claims them before listing them:
+PENDING orders move to PACKING, which stamps packed_at, and orders already
+marked PACKING without a packed_at get one. Waves skip orders with a
+packed_at, so the next wave over an overlapping window does not pick them
+again, and of two concurrent claiming waves only the first gets them.
+"""
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from api.models import Order, OrderItem
+from . import order_status
+
+WAVE_STATUSES = ('PENDING', 'PACKING')
+NO_AISLE = 'Unassigned'
+
+
+def wave_orders(cutoff=None, since=None):
+    """
+    Orders in the wave: open and not yet claimed by a wave, created at or
+    before `cutoff` (default now), after `since`.
+    """
+    qs = Order.objects.filter(
+        delivery_status__in=WAVE_STATUSES, packed_at__isnull=True, created_at__lte=cutoff or timezone.now(),
+    )
+    if since is not None:
+        qs = qs.filter(created_at__gt=since)
+    return qs
+
+
+def _pick_list(items):
+    rows = items.values(
+        'product_id', 'product__name', 'product__external_id',
+        'product__category__name', 'product__pricing_unit__symbol',
+    ).annotate(
+        total_quantity=Sum('quantity'), order_count=Count('order_id', distinct=True),
+    ).order_by('product__category__name', 'product__name', 'product_id')
+
+    aisles = []
+    for row in rows:
+        aisle = row['product__category__name'] or NO_AISLE
+        if not aisles or aisles[-1]['aisle'] != aisle:
+            aisles.append({'aisle': aisle, 'total_quantity': 0, 'products': []})
+        aisles[-1]['total_quantity'] += row['total_quantity']
+        aisles[-1]['products'].append({
+            'product_id': row['product_id'],
+            'external_id': row['product__external_id'],
+            'name': row['product__name'],
+            'unit': row['product__pricing_unit__symbol'],
+            'total_quantity': row['total_quantity'],
+            'order_count': row['order_count'],
+        })
+    return aisles
+
+
+def _put_wall(items):
+    """One slot per order, oldest order first; each slot lists what goes in it."""
+    rows = items.values_list(
+        'order_id', 'order__delivery_name', 'order__delivery_zip_code', 'product_id', 'quantity',
+    ).order_by('order__created_at', 'order_id', 'product_id')
+
+    slots = []
+    for order_id, name, zip_code, product_id, quantity in rows.iterator(chunk_size=5000):
+        if not slots or slots[-1]['order_id'] != order_id:
+            slots.append({
+                'slot': len(slots) + 1, 'order_id': order_id,
+                'delivery_name': name, 'delivery_zip_code': zip_code, 'items': [],
+            })
+        slots[-1]['items'].append({'product_id': product_id, 'quantity': quantity})
+    return slots
+
+
+def claim_orders(order_ids):
+    """
+    Claim the given orders for a wave: PENDING ones move to PACKING, PACKING
+    ones without a packed_at get one. Returns how many moved to PACKING.
+    """
+    order_ids = list(order_ids)
+    result = order_status.transition_many(order_ids, order_status.DELIVERY, 'PACKING')
+    for start in range(0, len(order_ids), order_status.CHUNK_SIZE):
+        Order.objects.filter(
+            pk__in=order_ids[start:start + order_status.CHUNK_SIZE],
+            delivery_status='PACKING', packed_at__isnull=True,
+        ).update(packed_at=timezone.now())
+    return len(result.updated)
+
+
+def plan_wave(cutoff=None, since=None, claim=False):
+    """
+    Build the pick list and put wall for the window. Returns a dict:
+    {cutoff, since, order_count, line_count, total_quantity, aisles, put_wall, claimed}.
+    """
+    cutoff = cutoff or timezone.now()
+    claimed = 0
+    with transaction.atomic():
+        orders = wave_orders(cutoff, since)
+        if claim:
+            # A concurrent claiming wave waits on these locks, then finds them claimed
+            order_ids = list(orders.select_for_update().values_list('pk', flat=True))
+            claimed = claim_orders(order_ids)
+            orders = Order.objects.filter(pk__in=order_ids)
+        items = OrderItem.objects.filter(order__in=orders)
+        aisles = _pick_list(items)
+        put_wall = _put_wall(items)
+
+    return {
+        'cutoff': cutoff,
+        'since': since,
+        'order_count': len(put_wall),
+        'line_count': sum(len(slot['items']) for slot in put_wall),
+        'total_quantity': sum((aisle['total_quantity'] for aisle in aisles), 0),
+        'aisles': aisles,
+        'put_wall': put_wall,
+        'claimed': claimed,
+    }
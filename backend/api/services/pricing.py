@@ -0,0 +1,323 @@
+"""
+Pricing engine — the single owner of price logic.
+
+Checkout (OrderService.place_order), cart validation (CartAddView) and the
+coupon preview (ApplyCouponView) all price through here, from the catalog
+rather than from client-supplied figures:
+
+- unit price is discounted_price when set, else base_price
+- items sold per piece must be bought in whole numbers
+- line totals and coupon discounts are rounded half-up to the paisa
+
+Prices come from an in-memory PriceTable (one row per product, keyed by
+UUID and external_id) that follows the catalog version like the search
+index does: Product saves in this process are applied in place once they
+commit, any other catalog change triggers a rebuild on next use. Another
+process only sees the version move through a shared cache (REDIS_URL);
+without one the table is also rebuilt once it is LOCAL_CACHE_MAX_AGE old.
+Pricing a basket costs no per-line queries.
+"""
+import threading
+import time
+import uuid
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from django.conf import settings
+from django.utils import timezone
+from api.models import Product
+from . import catalog_cache
+
+CENT = Decimal('0.01')
+QUANTITY_STEP = Decimal('0.001')
+PIECE_UNITS = {'pc', 'piece', 'unit'}
+
+
+class PricingError(ValueError):
+    """A line or coupon that cannot be priced. `field` names the offending input."""
+
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.message = message
+        self.field = field
+
+
+def to_money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PriceEntry:
+    __slots__ = ('product_id', 'external_id', 'name', 'base_price', 'discounted_price',
+                 'unit_symbol', 'is_active', 'category_id')
+
+    def __init__(self, product_id, external_id, name, base_price, discounted_price,
+                 unit_symbol, is_active, category_id=None):
+        self.product_id = product_id
+        self.external_id = external_id
+        self.name = name
+        self.base_price = base_price
+        self.discounted_price = discounted_price
+        self.unit_symbol = unit_symbol
+        self.is_active = is_active
+        self.category_id = category_id
+
+    @property
+    def unit_price(self):
+        return self.discounted_price if self.discounted_price is not None else self.base_price
+
+    @property
+    def sold_per_piece(self):
+        return (self.unit_symbol or '').lower() in PIECE_UNITS
+
+
+class PriceLine:
+    __slots__ = ('entry', 'quantity', 'unit_price', 'total')
+
+    def __init__(self, entry, quantity):
+        self.entry = entry
+        self.quantity = quantity
+        self.unit_price = entry.unit_price
+        self.total = to_money(entry.unit_price * quantity)
+
+
+class Quote:
+    def __init__(self, lines, subtotal, discounts=()):
+        self.lines = lines
+        self.subtotal = subtotal
+        self.discounts = list(discounts)  # [(coupon, amount)] in the order applied
+        self.discount = sum((amount for _, amount in self.discounts), Decimal('0.00'))
+
+    @property
+    def coupon(self):
+        return self.discounts[0][0] if self.discounts else None
+
+    @property
+    def total(self):
+        return self.subtotal - self.discount
+
+
+class PriceTable:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.version = None
+        self.built_at = 0.0
+        self._by_id = {}
+        self._by_external_id = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def build_from_db(self, version=None):
+        rows = Product.objects.values_list(
+            'id', 'external_id', 'name', 'base_price', 'discounted_price',
+            'pricing_unit__symbol', 'is_active', 'category_id',
+        )
+        by_id, by_external_id = {}, {}
+        for row in rows.iterator(chunk_size=2000):
+            entry = PriceEntry(*row)
+            by_id[entry.product_id] = entry
+            if entry.external_id:
+                by_external_id[entry.external_id] = entry
+        with self._lock:
+            self._by_id, self._by_external_id = by_id, by_external_id
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def put(self, entry):
+        with self._lock:
+            self.remove(entry.product_id)
+            self._by_id[entry.product_id] = entry
+            if entry.external_id:
+                self._by_external_id[entry.external_id] = entry
+
+    def remove(self, product_id):
+        with self._lock:
+            old = self._by_id.pop(product_id, None)
+            if old is not None and old.external_id:
+                self._by_external_id.pop(old.external_id, None)
+
+    def get(self, identifier):
+        """Entry by external_id or UUID (external_id wins, as in OrderService)."""
+        if identifier is None:
+            return None
+        key = str(identifier)
+        entry = self._by_external_id.get(key)
+        if entry is None:
+            try:
+                entry = self._by_id.get(uuid.UUID(key))
+            except ValueError:
+                pass
+        return entry
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_table():
+    """Return the process-wide price table, rebuilding it if the catalog moved on."""
+    global _table
+    version = catalog_cache.get_version()
+    with _table_lock:
+        if _table is None:
+            _table = PriceTable()
+        if _table.version != version or catalog_cache.expired(_table.built_at):
+            _table.build_from_db(version=version)
+        return _table
+
+
+def apply_product_change(product, new_version, deleted=False):
+    """Product signal hook (on commit); same contract as search_engine.apply_product_change."""
+    with _table_lock:
+        if _table is None or _table.version != new_version - 1:
+            return
+        if deleted:
+            _table.remove(product.pk)
+        else:
+            _table.put(PriceEntry(
+                product.pk, product.external_id, product.name, _decimal(product.base_price),
+                _decimal(product.discounted_price), product.pricing_unit.symbol, product.is_active,
+                product.category_id,
+            ))
+        _table.version = new_version
+
+
+def _decimal(value):
+    # Unsaved-then-saved instances may still hold the float/int they were built with
+    return Decimal(str(value)) if value is not None else None
+
+
+def reset():
+    global _table
+    with _table_lock:
+        _table = None
+
+
+def parse_quantity(entry, quantity):
+    try:
+        quantity = Decimal(str(quantity))
+    except InvalidOperation:
+        raise PricingError(f"Invalid quantity for '{entry.name}'.", field='quantity')
+    if not quantity.is_finite() or quantity <= 0:
+        raise PricingError(f"Quantity for '{entry.name}' must be positive.", field='quantity')
+    # OrderItem.quantity keeps three places; anything finer would be charged but not stored
+    if quantity != quantity.quantize(QUANTITY_STEP):
+        raise PricingError(f"Quantity for '{entry.name}' can have at most 3 decimal places.", field='quantity')
+    # LEMON FIX: items sold per piece cannot be bought in fractions
+    if entry.sold_per_piece and quantity != quantity.to_integral_value():
+        raise PricingError(
+            f"Item '{entry.name}' is sold per piece. You cannot buy fractional amounts.",
+            field='quantity',
+        )
+    return quantity
+
+
+def price_line(product_id, quantity, table=None):
+    """Price one line. Raises PricingError for unknown/inactive products or bad quantities."""
+    entry = (table if table is not None else get_table()).get(product_id)
+    if entry is None or not entry.is_active:
+        raise PricingError("Product not found.", field='product_id')
+    return PriceLine(entry, parse_quantity(entry, quantity))
+
+
+def quote(items, coupon=None, user=None):
+    """
+    Price a basket of {'product_id', 'quantity'} dicts, optionally with a
+    coupon or a list of coupons to stack.
+    Raises PricingError; unknown products are collected into one error
+    whose `unresolved` attribute lists them.
+    """
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise PricingError('items must be a list of {product_id, quantity}', field='items')
+    table = get_table()
+    lines, unresolved = [], []
+    for item in items:
+        product_id = item.get('product_id')
+        entry = table.get(product_id)
+        if entry is None or not entry.is_active:
+            unresolved.append(product_id)
+            continue
+        lines.append(PriceLine(entry, parse_quantity(entry, item.get('quantity', 1))))
+    if unresolved:
+        error = PricingError('Some items in your cart are no longer available.', field='items')
+        error.unresolved = unresolved
+        raise error
+
+    subtotal = sum((line.total for line in lines), Decimal('0.00'))
+    coupons = coupon if isinstance(coupon, (list, tuple)) else [coupon] if coupon else []
+    return Quote(lines, subtotal, coupon_discounts(coupons, subtotal, user, lines))
+
+
+def coupon_codes(value):
+    """
+    A request's coupon field as a list of codes: one code, a list of codes,
+    or nothing. Blank codes are dropped, so '' and [''] both mean no coupon.
+    """
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not all(isinstance(code, str) for code in value):
+        raise PricingError('Coupon codes must be a code or a list of codes', field='coupon_code')
+    return [code.strip() for code in value if code.strip()]
+
+
+def coupon_discounts(coupons, subtotal, user=None, lines=None):
+    """
+    [(coupon, discount)] for a stack of coupons. Each discount is worked out
+    on the undiscounted basket; together they never exceed the subtotal.
+    """
+    if len(coupons) > 1:
+        if len({coupon.code for coupon in coupons}) != len(coupons):
+            raise PricingError('Each coupon can only be applied once', field='coupon_code')
+        if len(coupons) > settings.COUPON_MAX_STACK:
+            raise PricingError(f'At most {settings.COUPON_MAX_STACK} coupons per order', field='coupon_code')
+        for coupon in coupons:
+            if not coupon.stackable:
+                raise PricingError(f'{coupon.code} cannot be combined with other coupons', field='coupon_code')
+
+    remaining, discounts = subtotal, []
+    for coupon in coupons:
+        amount = min(coupon_discount(coupon, subtotal, user, lines), remaining)
+        remaining -= amount
+        discounts.append((coupon, amount))
+    return discounts
+
+
+def coupon_discount(coupon, subtotal, user=None, lines=None):
+    """
+    Discount `coupon` gives on `subtotal`, or for a scoped coupon on the
+    `lines` in its scope. Raises PricingError if it does not apply.
+    Usage limits are not checked here: they are reserved at checkout
+    (services/coupons.py).
+    """
+    if not coupon.is_active:
+        raise PricingError('Invalid Coupon Code', field='coupon_code')
+    if coupon.valid_until and coupon.valid_until < timezone.now():
+        raise PricingError('Coupon Expired', field='coupon_code')
+    if coupon.new_customers_only and user is not None and user.has_completed_order:
+        raise PricingError('This offer is for new users only.', field='coupon_code')
+    if subtotal < coupon.min_order_value:
+        raise PricingError(
+            f'Minimum order value of ₹{coupon.min_order_value} required', field='coupon_code'
+        )
+
+    base = subtotal
+    # Scope sets are attached by the coupon registry (services/coupons.py)
+    product_ids = getattr(coupon, 'product_ids', frozenset())
+    category_ids = getattr(coupon, 'category_ids', frozenset())
+    if product_ids or category_ids:
+        if lines is None:
+            raise PricingError('Add items to use this coupon', field='coupon_code')
+        base = sum((
+            line.total for line in lines
+            if line.entry.product_id in product_ids or line.entry.category_id in category_ids
+        ), Decimal('0.00'))
+        if not base:
+            raise PricingError('This coupon does not apply to the items in your cart', field='coupon_code')
+
+    if coupon.discount_type == 'PERCENT':
+        amount = to_money(base * (coupon.discount_percent or 0) / 100)
+        if coupon.max_discount is not None:
+            amount = min(amount, to_money(coupon.max_discount))
+    else:
+        amount = to_money(coupon.discount_amount)
+    return min(amount, base)
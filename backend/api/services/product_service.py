@@ -3,9 +3,14 @@ ProductService — business logic for products and categories.
 Views call this; it delegates to the active adapter.
 """
 import logging
+import uuid
+from django.db.models import Q
+from api.conditional import make_etag, product_validators
 from api.models import Product, Category
 from api.serializers import ProductSerializer
+from api.fast_serializers import ProductRowSerializer
 from .adapters import get_product_adapter
+from . import catalog_cache
 
 logger = logging.getLogger(__name__)
 
@@ -17,21 +22,50 @@ class ProductService:
     def list_products(self, category_slug=None, search=None, page=1, per_page=100):
         """
         Returns serialized product data from the active backend.
-        For 'local' backend: queries Django models and serializes.
+        For 'local' backend: reads `.values()` rows and serializes them with the
+        fast-path ProductRowSerializer. The serialized page is cached per
+        catalog version (see catalog_cache).
         For 'woocommerce' backend: returns raw WC JSON (passed through).
         """
         from django.conf import settings
         backend = getattr(settings, 'PRODUCT_BACKEND', 'local')
 
         if backend == 'local':
-            products = self.adapter.list_products(category_slug, search, page, per_page)
-            # Serialize Django model instances
-            serializer = ProductSerializer(products, many=True)
-            return serializer.data
+            def build():
+                rows = self.adapter.list_products(category_slug, search, page, per_page)
+                return ProductRowSerializer().many(rows)
+
+            return catalog_cache.get_or_build(
+                (category_slug, search, page, per_page), build
+            )
         else:
             # WooCommerce adapter returns raw JSON dicts
             return self.adapter.list_products(category_slug, search, page, per_page)
 
+    def list_products_page(self, category_slug=None, search=None, cursor=None, per_page=100):
+        """
+        Cursor-mode listing: returns {'results': [...], 'next_cursor': str|None}.
+        Pass cursor='' (or None) for the first page. Raises InvalidCursor.
+        """
+        from django.conf import settings
+        backend = getattr(settings, 'PRODUCT_BACKEND', 'local')
+
+        if backend == 'local':
+            def build():
+                rows, next_cursor = self.adapter.list_products_page(
+                    category_slug, search, cursor, per_page
+                )
+                return {'results': ProductRowSerializer().many(rows), 'next_cursor': next_cursor}
+
+            return catalog_cache.get_or_build(
+                ('cursor', category_slug, search, cursor or '', per_page), build
+            )
+        else:
+            products, next_cursor = self.adapter.list_products_page(
+                category_slug, search, cursor, per_page
+            )
+            return {'results': products, 'next_cursor': next_cursor}
+
     def get_product(self, identifier):
         """Returns serialized product data by slug or ID."""
         from django.conf import settings
@@ -46,6 +80,25 @@ class ProductService:
         else:
             return self.adapter.get_product(identifier)
 
+    def get_products(self, identifiers):
+        """
+        Batch lookup by any mix of slugs, UUIDs and external ids.
+        Returns {'results': [...], 'missing': [...]}: found products in request
+        order (duplicates collapsed) and the identifiers that matched nothing.
+        """
+        from django.conf import settings
+        backend = getattr(settings, 'PRODUCT_BACKEND', 'local')
+
+        identifiers = list(dict.fromkeys(str(i) for i in identifiers))
+        found = self.adapter.get_products(identifiers)
+        if backend == 'local':
+            serialize = ProductRowSerializer()
+            found = {identifier: serialize(row) for identifier, row in found.items()}
+        return {
+            'results': [found[i] for i in identifiers if i in found],
+            'missing': [i for i in identifiers if i not in found],
+        }
+
     def list_categories(self):
         """Returns category list from active backend."""
         from django.conf import settings
@@ -74,6 +127,62 @@ class ProductService:
                 for c in raw
             ]
 
+    # --- Conditional GET validators (local backend only; None = not available) ---
+
+    def _is_local(self):
+        from django.conf import settings
+        return getattr(settings, 'PRODUCT_BACKEND', 'local') == 'local'
+
+    def list_validators(self, category_slug=None, *params):
+        """
+        (etag, None) for a product list; search/paging go in `params`.
+        Cached per catalog version like the pages themselves, so a warm
+        revalidation costs no queries. No Last-Modified: a list's newest
+        updated_at does not move when an older product is deleted or
+        deactivated, and If-Modified-Since alone would then keep answering
+        304. The ETag carries the count as well.
+        """
+        if not self._is_local():
+            return None
+
+        def build():
+            qs = Product.objects.filter(is_active=True)
+            if category_slug:
+                qs = qs.filter(category__slug=category_slug)
+            etag, _ = product_validators(qs, category_slug, *params)
+            return etag, None
+
+        return catalog_cache.get_or_build(
+            ('validators', category_slug, *params), build, track=False
+        )
+
+    def product_validators(self, identifier):
+        if not self._is_local():
+            return None
+
+        def build():
+            match = Q(slug=identifier)
+            try:
+                match |= Q(id=uuid.UUID(str(identifier)))
+            except ValueError:
+                pass
+            etag, last_modified = product_validators(Product.objects.filter(match), identifier)
+            return (etag, last_modified) if last_modified else ()
+
+        return catalog_cache.get_or_build(
+            ('product-validators', identifier), build, track=False
+        ) or None
+
+    def category_validators(self):
+        if not self._is_local():
+            return None
+
+        def build():
+            rows = Category.objects.order_by('id').values_list('id', 'name', 'slug', 'token_id')
+            return make_etag(*rows), None
+
+        return catalog_cache.get_or_build(('category-validators',), build, track=False)
+
     def sync_from_external(self):
         """Pull products from external source into local DB."""
         return self.adapter.sync_to_local()
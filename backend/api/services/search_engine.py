@@ -0,0 +1,253 @@
+"""
+SearchEngine — in-process inverted index over active products.
+
+Indexes name, description, category name and configurable aliases
+(settings.SEARCH_ALIASES, e.g. {'palak': ['spinach']}). Each query term
+matches exact tokens, then token prefixes, then trigram-similar tokens
+(typos like "tomoto"). Documents must match every term and are ranked
+by field weight x match quality.
+
+The index is built lazily and kept in step with the catalog version
+(see catalog_cache): a committed Product save in this process is applied
+incrementally, any other catalog change triggers a full rebuild on the
+next search, as does age (LOCAL_CACHE_MAX_AGE) when the version key is
+not shared between processes.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.utils.html import strip_tags
+from . import catalog_cache
+
+FIELD_WEIGHTS = {'name': 3.0, 'category': 2.0, 'description': 1.0}
+ALIAS_FACTOR = 0.9  # an alias scores slightly below the word it stands for
+
+EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.6
+MIN_SIMILARITY = 0.35
+MIN_TOKEN_LENGTH = 2
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    if not text:
+        return []
+    text = strip_tags(text) if '<' in text else text
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, aliases=None):
+        if aliases is None:
+            aliases = getattr(settings, 'SEARCH_ALIASES', {})
+        # canonical token -> alias tokens, so docs about "spinach" also match "palak"
+        self._aliases_for = defaultdict(set)
+        for alias, targets in aliases.items():
+            for target in targets:
+                for token in tokenize(target):
+                    self._aliases_for[token].update(tokenize(alias))
+
+        self._lock = threading.RLock()
+        self.version = None
+        self.built_at = 0.0
+        self._clear()
+
+    def _clear(self):
+        self._postings = defaultdict(dict)    # token -> {doc_id: weight}
+        self._doc_tokens = {}                 # doc_id -> set(tokens)
+        self._doc_meta = {}                   # doc_id -> (category_slug, name)
+        self._trigrams = defaultdict(set)     # trigram -> set(tokens)
+        self._sorted_tokens = []
+        self._sorted_dirty = False
+
+    def __len__(self):
+        return len(self._doc_tokens)
+
+    # === Building ===
+
+    def build(self, docs, version=None):
+        """Replace the index contents. `docs` yields dicts (see add())."""
+        with self._lock:
+            self._clear()
+            for doc in docs:
+                self._add(doc)
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def build_from_db(self, version=None):
+        from api.models import Product
+        rows = Product.objects.filter(is_active=True).values_list(
+            'id', 'name', 'description', 'category__name', 'category__slug'
+        ).iterator(chunk_size=2000)
+        self.build(
+            (
+                {'id': str(pk), 'name': name, 'description': description,
+                 'category': category_name, 'category_slug': category_slug}
+                for pk, name, description, category_name, category_slug in rows
+            ),
+            version=version,
+        )
+
+    def add(self, doc):
+        """Index (or re-index) one product doc: id, name, description, category, category_slug."""
+        with self._lock:
+            self._remove(doc['id'])
+            self._add(doc)
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(str(doc_id))
+
+    def _add(self, doc):
+        doc_id = str(doc['id'])
+        weights = {}
+        for field in ('name', 'category', 'description'):
+            for token in tokenize(doc.get(field)):
+                weight = FIELD_WEIGHTS[field]
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+                for alias in self._aliases_for.get(token, ()):
+                    if weights.get(alias, 0) < weight * ALIAS_FACTOR:
+                        weights[alias] = weight * ALIAS_FACTOR
+
+        for token, weight in weights.items():
+            if token not in self._postings:
+                for gram in trigrams(token):
+                    self._trigrams[gram].add(token)
+                self._sorted_dirty = True
+            self._postings[token][doc_id] = weight
+
+        self._doc_tokens[doc_id] = set(weights)
+        self._doc_meta[doc_id] = (doc.get('category_slug'), (doc.get('name') or '').lower())
+
+    def _remove(self, doc_id):
+        tokens = self._doc_tokens.pop(doc_id, None)
+        if tokens is None:
+            return
+        self._doc_meta.pop(doc_id, None)
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[token]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+                self._sorted_dirty = True
+
+    # === Querying ===
+
+    def _candidates(self, term):
+        """Return {token: match_factor} for one query term."""
+        if term in self._postings:
+            return {term: EXACT}
+
+        if self._sorted_dirty:
+            self._sorted_tokens = sorted(self._postings)
+            self._sorted_dirty = False
+        found = {}
+        i = bisect.bisect_left(self._sorted_tokens, term)
+        while i < len(self._sorted_tokens) and self._sorted_tokens[i].startswith(term):
+            found[self._sorted_tokens[i]] = PREFIX
+            i += 1
+        if found:
+            return found
+
+        term_grams = trigrams(term)
+        shared = defaultdict(int)
+        for gram in term_grams:
+            for token in self._trigrams.get(gram, ()):
+                shared[token] += 1
+        for token, common in shared.items():
+            similarity = common / (len(term_grams) + len(trigrams(token)) - common)
+            if similarity >= MIN_SIMILARITY:
+                found[token] = FUZZY * similarity
+        return found
+
+    def search(self, query, category_slug=None, limit=None):
+        """Return product ids (str) ranked best-first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token, factor in self._candidates(term).items():
+                    for doc_id, weight in self._postings[token].items():
+                        score = weight * factor
+                        if term_scores.get(doc_id, 0) < score:
+                            term_scores[doc_id] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {d: s + term_scores[d] for d, s in scores.items() if d in term_scores}
+                if not scores:
+                    return []
+
+            meta = self._doc_meta
+            if category_slug:
+                scores = {d: s for d, s in scores.items() if meta[d][0] == category_slug}
+
+            ranked = sorted(scores, key=lambda d: (-scores[d], meta[d][1], d))
+        return ranked[:limit] if limit else ranked
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the process-wide index, rebuilding it if the catalog moved on."""
+    global _index
+    version = catalog_cache.get_version()
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        if _index.version != version or catalog_cache.expired(_index.built_at):
+            _index.build_from_db(version=version)
+        return _index
+
+
+def search(query, category_slug=None, limit=None):
+    return get_index().search(query, category_slug=category_slug, limit=limit)
+
+
+def apply_product_change(product, new_version, deleted=False):
+    """
+    Called from the Product signals after the save committed and the
+    catalog version was bumped.
+    Applies the change in place when the index was current just before it;
+    otherwise the next search rebuilds from the DB.
+    """
+    with _index_lock:
+        if _index is None or _index.version != new_version - 1:
+            return
+        if deleted or not product.is_active:
+            _index.remove(product.pk)
+        else:
+            category = product.category
+            _index.add({
+                'id': str(product.pk),
+                'name': product.name,
+                'description': product.description,
+                'category': category.name if category else None,
+                'category_slug': category.slug if category else None,
+            })
+        _index.version = new_version
+
+
+def reset():
+    global _index
+    with _index_lock:
+        _index = None
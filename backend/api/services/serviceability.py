@@ -0,0 +1,144 @@
+"""
+Serviceability map — which zip codes we deliver to, held in process.
+
+A DeliveryZone row is either an exact pincode ('226001') or a prefix rule
+written with trailing x's or a star ('2260xx', '2260*') that covers every
+pincode starting with it. A lookup takes the exact row if there is one,
+so a non-serviceable exact row can carve a pincode out of a served
+prefix. Otherwise it takes the longest matching prefix rule.
+
+The map is built from one query and kept until the 'delivery-zones'
+version moves on: saving or deleting a DeliveryZone bumps it once the
+transaction commits (see api/signals.py). Other processes only see the
+bump through a shared cache (REDIS_URL); without one they rebuild once
+their map is LOCAL_CACHE_MAX_AGE old (see services/catalog_cache.py).
+A warm lookup costs one cache read and a few dict
+probes, so checking on every keystroke or for a whole address book is
+cheap.
+"""
+import re
+import threading
+import time
+from django.db.models import Case, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from api.models import DeliveryZone
+from . import catalog_cache
+
+NAMESPACE = 'delivery-zones'
+PREFIX_RULE = re.compile(r'^(\d+)(?:[xX]+|\*)$')
+
+
+class ZoneEntry:
+    __slots__ = ('zone_id', 'rule', 'city', 'delivery_time_hrs', 'is_serviceable')
+
+    def __init__(self, zone_id, rule, city, delivery_time_hrs, is_serviceable):
+        self.zone_id = zone_id
+        self.rule = rule
+        self.city = city
+        self.delivery_time_hrs = delivery_time_hrs
+        self.is_serviceable = is_serviceable
+
+
+class ServiceabilityMap:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = None
+        self.built_at = 0.0
+        self._exact = {}
+        self._prefixes = {}
+        self._longest_prefix = 0
+
+    def build_from_db(self, version=None):
+        exact, prefixes = {}, {}
+        for row in DeliveryZone.objects.values_list('id', 'zip_code', 'city', 'delivery_time_hrs', 'is_serviceable'):
+            entry = ZoneEntry(*row)
+            rule = entry.rule.strip()
+            match = PREFIX_RULE.match(rule)
+            if match:
+                prefixes[match.group(1)] = entry
+            else:
+                exact[rule] = entry
+        with self._lock:
+            self._exact, self._prefixes = exact, prefixes
+            self._longest_prefix = max(map(len, prefixes), default=0)
+            self.version = version
+            self.built_at = time.monotonic()
+
+    def lookup(self, zip_code):
+        """The ZoneEntry that decides `zip_code` (serviceable or not), or None."""
+        entry = self._exact.get(zip_code)
+        if entry is not None:
+            return entry
+        for length in range(min(len(zip_code) - 1, self._longest_prefix), 0, -1):
+            entry = self._prefixes.get(zip_code[:length])
+            if entry is not None:
+                return entry
+        return None
+
+    def zone_expression(self, zip_field):
+        """
+        SQL expression for the id of the zone lookup() picks for the
+        `zip_field` column or annotation: the exact row, else the longest
+        prefix rule. Lets a query group by zone instead of by pincode.
+        """
+        exact = DeliveryZone.objects.filter(zip_code=OuterRef(zip_field)).values('id')[:1]
+        by_prefix = [
+            When(**{f'{zip_field}__startswith': prefix}, then=Value(entry.zone_id))
+            for prefix, entry in sorted(self._prefixes.items(), key=lambda item: -len(item[0]))
+        ]
+        if not by_prefix:
+            return Subquery(exact, output_field=IntegerField())
+        return Coalesce(Subquery(exact), Case(*by_prefix, default=None), output_field=IntegerField())
+
+
+_map = None
+_map_lock = threading.Lock()
+
+
+def get_map():
+    """Return the process-wide map, rebuilding it if a zone changed."""
+    global _map
+    version = catalog_cache.get_version(NAMESPACE)
+    with _map_lock:
+        if _map is None:
+            _map = ServiceabilityMap()
+        if _map.version != version or catalog_cache.expired(_map.built_at):
+            _map.build_from_db(version=version)
+        return _map
+
+
+def _normalise(zip_code):
+    return zip_code.strip() if isinstance(zip_code, str) else ''
+
+
+def check(zip_code):
+    """The serviceable ZoneEntry for `zip_code`, or None if we do not deliver there."""
+    zip_code = _normalise(zip_code)
+    if not zip_code:
+        return None
+    entry = get_map().lookup(zip_code)
+    return entry if entry is not None and entry.is_serviceable else None
+
+
+def check_many(zip_codes):
+    """{zip_code: serviceable ZoneEntry or None}, one map lookup per distinct code."""
+    zone_map = get_map()
+    results = {}
+    for zip_code in zip_codes:
+        if zip_code in results:
+            continue
+        normalised = _normalise(zip_code)
+        entry = zone_map.lookup(normalised) if normalised else None
+        results[zip_code] = entry if entry is not None and entry.is_serviceable else None
+    return results
+
+
+def invalidate():
+    """DeliveryZone signal hook: move the version on once the change commits."""
+    catalog_cache.bump_version_on_commit(NAMESPACE)
+
+
+def reset():
+    global _map
+    with _map_lock:
+        _map = None
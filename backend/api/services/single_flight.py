@@ -0,0 +1,103 @@
+"""
+SingleFlight — request coalescing for expensive upstream calls.
+
+Concurrent callers asking for the same key wait on one in-flight call
+instead of each making their own. The result is then kept for a short
+TTL, so a burst of identical requests costs a single upstream fetch.
+Coalescing is per process (per gunicorn worker).
+"""
+import threading
+import time
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    MAX_RESULTS = 1024
+
+    def __init__(self, ttl=5.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._inflight = {}     # key -> _Call
+        self._results = {}      # key -> (expires_at, result)
+        self._stats = {
+            'upstream_calls': 0, 'coalesced': 0, 'ttl_hits': 0,
+            'errors': 0, 'total_wait_ms': 0.0, 'max_wait_ms': 0.0,
+        }
+
+    def do(self, key, fn, cache_if=None):
+        """
+        Return fn()'s result for `key`, sharing it with concurrent callers.
+        `cache_if(result)` decides whether the result is kept for the TTL
+        (default: always). Exceptions raised by fn reach every waiter.
+        """
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._stats['ttl_hits'] += 1
+                return cached[1]
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self._stats['upstream_calls'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if not leader:
+            started = time.monotonic()
+            call.done.wait()
+            waited_ms = (time.monotonic() - started) * 1000
+            with self._lock:
+                self._stats['total_wait_ms'] += waited_ms
+                self._stats['max_wait_ms'] = max(self._stats['max_wait_ms'], waited_ms)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            if self.ttl and (cache_if is None or cache_if(call.result)):
+                self._store(key, call.result)
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    def _store(self, key, result):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._results) >= self.MAX_RESULTS:
+                self._results = {k: v for k, v in self._results.items() if v[0] > now}
+                if len(self._results) >= self.MAX_RESULTS:
+                    self._results.clear()
+            self._results[key] = (now + self.ttl, result)
+
+    def forget(self):
+        with self._lock:
+            self._results.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        served = stats['upstream_calls'] + stats['coalesced'] + stats['ttl_hits']
+        stats['requests'] = served
+        stats['avg_wait_ms'] = round(stats['total_wait_ms'] / stats['coalesced'], 2) if stats['coalesced'] else 0.0
+        return stats
+
+    def reset_stats(self):
+        with self._lock:
+            for stat in self._stats:
+                self._stats[stat] = 0
@@ -0,0 +1,222 @@
+"""
+Subscription fulfilment — turns due subscriptions into orders, in bulk.
+
+A run for `run_date` takes every ACTIVE subscription with
+next_delivery_date <= run_date and, a chunk of users at a time, in one
+transaction per chunk:
+
+- groups them per (user, delivery address) into one Order each, priced
+  from the price table, and bulk-inserts orders, items and sync outbox rows
+- advances next_delivery_date past run_date. Subscriptions sharing a
+  frequency and calendar anchor get the same next date, so the calendar
+  rules run in SQL as one CASE UPDATE, not one save per subscription.
+
+Re-running the same date is a no-op: advanced subscriptions are no longer
+due. Two workers given overlapping user ranges cannot double-deliver
+either. The advancing UPDATE only matches rows that are still due, and a
+unique constraint on (user, subscription_address_key, subscription_date)
+backs it up. The key is the address id, or 0 without an address, so it
+is never NULL. The losing worker's chunk rolls back, and a rerun picks
+up anything it left. Disjoint user id ranges (min_user_id/max_user_id)
+split a run across processes.
+
+Calendar rules, all strictly after the delivery date:
+  DAILY           next day
+  ALTERNATE_DAYS  next Monday, Wednesday or Friday
+  WEEKLY          next day with the weekday of start_date
+  MONTHLY         next month's start_date day (clamped to month end)
+"""
+import calendar
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import Case, DateField, Value, When
+from django.utils import timezone
+from api.models import Address, Order, OrderItem, OrderSyncOutbox, Subscription
+from . import pricing
+from .adapters import get_order_adapter
+
+logger = logging.getLogger(__name__)
+
+ALTERNATE_WEEKDAYS = (0, 2, 4)  # Mon, Wed, Fri
+USER_CHUNK_SIZE = 500
+CHUNK_SIZE = 900  # stays under SQLite's bound-parameter limit
+
+
+class ChunkConflict(Exception):
+    """Another run already fulfilled part of this chunk."""
+
+
+# === Calendar ===
+
+def anchor(frequency, start_date):
+    """The part of start_date that fixes the schedule (bucket key for updates)."""
+    if frequency == 'WEEKLY':
+        return start_date.weekday()
+    if frequency == 'MONTHLY':
+        return start_date.day
+    return None
+
+
+def next_date(frequency, after, anchor_value=None):
+    """First delivery date strictly after `after`."""
+    if frequency == 'DAILY':
+        return after + timedelta(days=1)
+    if frequency == 'ALTERNATE_DAYS':
+        day = after + timedelta(days=1)
+        while day.weekday() not in ALTERNATE_WEEKDAYS:
+            day += timedelta(days=1)
+        return day
+    if frequency == 'WEEKLY':
+        return after + timedelta(days=(anchor_value - after.weekday() - 1) % 7 + 1)
+    if frequency == 'MONTHLY':
+        year, month = after.year, after.month
+        if after.day >= min(anchor_value, calendar.monthrange(year, month)[1]):
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return after.replace(year=year, month=month, day=min(anchor_value, calendar.monthrange(year, month)[1]))
+    raise ValueError(f"Unknown frequency '{frequency}'")
+
+
+def first_date(frequency, on_or_after, start_date):
+    """First delivery date on or after `on_or_after` (new and resumed subscriptions)."""
+    return next_date(frequency, on_or_after - timedelta(days=1), anchor(frequency, start_date))
+
+
+# === Fulfilment ===
+
+class RunStats:
+    def __init__(self):
+        self.subscriptions = 0
+        self.orders = 0
+        self.items = 0
+        self.skipped = 0         # due, but the product is no longer sold; advanced without an order
+        self.conflicts = 0       # chunks another worker had already fulfilled
+        self.seconds = 0.0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def due_subscriptions(run_date, min_user_id=None, max_user_id=None):
+    qs = Subscription.objects.filter(status='ACTIVE', next_delivery_date__lte=run_date)
+    if min_user_id is not None:
+        qs = qs.filter(user_id__gte=min_user_id)
+    if max_user_id is not None:
+        qs = qs.filter(user_id__lt=max_user_id)
+    return qs
+
+
+def fulfil(run_date=None, min_user_id=None, max_user_id=None, chunk_size=USER_CHUNK_SIZE, adapter=None):
+    """Fulfil everything due by `run_date` (default today) for users in [min_user_id, max_user_id)."""
+    run_date = run_date or timezone.localdate()
+    queue_sync = (adapter or get_order_adapter()).is_external
+    stats = RunStats()
+    started = time.perf_counter()
+
+    user_ids = list(
+        due_subscriptions(run_date, min_user_id, max_user_id)
+        .order_by('user_id').values_list('user_id', flat=True).distinct()
+    )
+    table = pricing.get_table()
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                _fulfil_chunk(run_date, chunk, table, queue_sync, stats)
+        except (ChunkConflict, IntegrityError) as e:
+            stats.conflicts += 1
+            logger.warning(f"Subscription run {run_date}: users {chunk[0]}..{chunk[-1]} skipped ({e})")
+
+    stats.seconds = round(time.perf_counter() - started, 3)
+    return stats
+
+
+def _delivery_addresses(user_ids, subscription_address_ids):
+    """{address_id: Address} for explicit addresses, plus {('default', user_id): Address}."""
+    addresses = {}
+    for address in Address.objects.filter(user_id__in=user_ids).order_by('user_id', '-is_default', '-created_at'):
+        addresses.setdefault(('default', address.user_id), address)
+        if address.pk in subscription_address_ids:
+            addresses[address.pk] = address
+    return addresses
+
+
+def _fulfil_chunk(run_date, user_ids, table, queue_sync, stats):
+    rows = list(
+        due_subscriptions(run_date).filter(user_id__in=user_ids).values(
+            'id', 'user_id', 'address_id', 'product_id', 'quantity', 'frequency', 'start_date',
+        )
+    )
+    addresses = _delivery_addresses(user_ids, {row['address_id'] for row in rows if row['address_id']})
+
+    # Group per (user, address) into one basket each
+    baskets = defaultdict(list)
+    for row in rows:
+        address = addresses.get(row['address_id']) or addresses.get(('default', row['user_id']))
+        entry = table.get(row['product_id'])
+        if entry is None or not entry.is_active:
+            stats.skipped += 1
+            continue
+        baskets[(row['user_id'], address)].append(pricing.PriceLine(entry, row['quantity']))
+
+    orders, items = [], []
+    for (user_id, address), lines in baskets.items():
+        order = Order(
+            user_id=user_id,
+            total_price=sum((line.total for line in lines), pricing.to_money(0)),
+            is_cod=True,
+            is_subscription=True,
+            subscription_date=run_date,
+            delivery_address=address,
+            subscription_address_key=address.pk if address else 0,
+            delivery_name=address.name if address else '',
+            delivery_street=address.street if address else '',
+            delivery_city=address.city if address else '',
+            delivery_zip_code=address.zip_code if address else '',
+        )
+        orders.append(order)
+        items.extend(
+            OrderItem(order=order, product_id=line.entry.product_id,
+                      quantity=line.quantity, price_at_purchase=line.unit_price)
+            for line in lines
+        )
+    Order.objects.bulk_create(orders, batch_size=1000)
+    OrderItem.objects.bulk_create(items, batch_size=2000)
+    if queue_sync:
+        OrderSyncOutbox.objects.bulk_create([OrderSyncOutbox(order=order) for order in orders], batch_size=2000)
+
+    _advance(run_date, rows)
+    stats.subscriptions += len(rows)
+    stats.orders += len(orders)
+    stats.items += len(items)
+
+
+def _advance(run_date, rows):
+    """
+    One UPDATE for the chunk. Every (frequency, anchor) bucket shares its next
+    date, so the calendar rules become a CASE over frequency and start_date:
+
+        SET next_delivery_date = CASE
+            WHEN frequency = 'WEEKLY' AND iso_week_day(start_date) = 2 THEN '2026-03-10'
+            WHEN frequency = 'MONTHLY' AND day(start_date) = 31 THEN '2026-03-31' ...
+    """
+    buckets = {(row['frequency'], anchor(row['frequency'], row['start_date'])) for row in rows}
+    whens = []
+    for frequency, anchor_value in sorted(buckets, key=lambda b: (b[0], b[1] or 0)):
+        condition = {'frequency': frequency}
+        if frequency == 'WEEKLY':
+            condition['start_date__iso_week_day'] = anchor_value + 1
+        elif frequency == 'MONTHLY':
+            condition['start_date__day'] = anchor_value
+        whens.append(When(**condition, then=Value(next_date(frequency, run_date, anchor_value))))
+
+    ids = [row['id'] for row in rows]
+    moved = 0
+    for start in range(0, len(ids), CHUNK_SIZE):
+        moved += Subscription.objects.filter(
+            pk__in=ids[start:start + CHUNK_SIZE], status='ACTIVE', next_delivery_date__lte=run_date,
+        ).update(next_delivery_date=Case(*whens, output_field=DateField()), updated_at=timezone.now())
+    if moved != len(ids):
+        raise ChunkConflict(f"{len(ids) - moved} subscriptions were fulfilled concurrently")
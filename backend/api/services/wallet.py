@@ -0,0 +1,121 @@
+"""
+Wallet — append-only ledger behind User.wallet_balance.
+
+Every balance change is one conditional UPDATE on the user row plus one
+WalletEntry, in the same transaction:
+
+    UPDATE user SET wallet_balance = wallet_balance - :amount
+     WHERE id = :id AND wallet_balance >= :amount
+
+so concurrent debits can neither overdraw a wallet nor lose each other's
+updates, and nothing else on the user row is rewritten. The UPDATE holds
+the row lock until commit, which makes the balance read back for the
+entry exact. bulk_credit() applies a whole cashback campaign with one
+UPDATE ... CASE per chunk.
+"""
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Sum, Value, When
+from api.models import User, WalletEntry
+from .pricing import to_money
+
+BULK_CHUNK_SIZE = 500
+CREDIT_KINDS = {'REFUND', 'TOPUP', 'CASHBACK', 'ADJUSTMENT'}
+
+
+class InsufficientFunds(Exception):
+    pass
+
+
+def _amount(amount):
+    amount = to_money(str(amount))
+    if amount <= 0:
+        raise ValueError('Wallet amounts must be positive')
+    return amount
+
+
+def _check_kind(kind):
+    if kind not in CREDIT_KINDS:
+        raise ValueError(f"Unknown credit kind '{kind}'")
+
+
+def _balance(user_id):
+    return User.objects.filter(pk=user_id).values_list('wallet_balance', flat=True).get()
+
+
+def _apply(user, delta, kind, order=None, reference='', guard=None):
+    with transaction.atomic():
+        qs = User.objects.filter(pk=user.pk)
+        if guard is not None:
+            qs = qs.filter(wallet_balance__gte=guard)
+        if not qs.update(wallet_balance=F('wallet_balance') + delta):
+            raise InsufficientFunds(f"Wallet balance below {guard}")
+        balance = _balance(user.pk)
+        entry = WalletEntry.objects.create(
+            user_id=user.pk, kind=kind, amount=delta, balance_after=balance,
+            order=order, reference=reference,
+        )
+    user.wallet_balance = balance  # keep the caller's instance in step
+    return entry
+
+
+def debit(user, amount, order=None, reference=''):
+    """Take `amount` from the wallet. Raises InsufficientFunds, changing nothing."""
+    amount = _amount(amount)
+    return _apply(user, -amount, 'DEBIT', order, reference, guard=amount)
+
+
+def credit(user, amount, kind='TOPUP', order=None, reference=''):
+    _check_kind(kind)
+    return _apply(user, _amount(amount), kind, order, reference)
+
+
+def top_up(user, amount, reference=''):
+    return credit(user, amount, 'TOPUP', reference=reference)
+
+
+def refund(order, amount=None, reference=''):
+    """Credit back a wallet-paid order (in full unless `amount` is given)."""
+    return credit(order.user, amount if amount is not None else order.total_price,
+                  'REFUND', order=order, reference=reference)
+
+
+def bulk_credit(amounts, kind='CASHBACK', reference=''):
+    """
+    Credit many wallets at once, e.g. campaign cashback.
+    `amounts` maps user id -> amount. One UPDATE with a CASE per chunk,
+    one read-back and one bulk INSERT of entries. Returns entries created.
+    """
+    _check_kind(kind)
+    amounts = {user_id: _amount(amount) for user_id, amount in amounts.items()}
+    user_ids = list(amounts)
+    created = 0
+    with transaction.atomic():
+        for start in range(0, len(user_ids), BULK_CHUNK_SIZE):
+            chunk = user_ids[start:start + BULK_CHUNK_SIZE]
+            delta = Case(
+                *[When(pk=user_id, then=Value(amounts[user_id])) for user_id in chunk],
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+            User.objects.filter(pk__in=chunk).update(wallet_balance=F('wallet_balance') + delta)
+            balances = dict(User.objects.filter(pk__in=chunk).values_list('pk', 'wallet_balance'))
+            entries = WalletEntry.objects.bulk_create([
+                WalletEntry(
+                    user_id=user_id, kind=kind, amount=amounts[user_id],
+                    balance_after=balances[user_id], reference=reference,
+                )
+                for user_id in chunk if user_id in balances
+            ])
+            created += len(entries)
+    return created
+
+
+def current_balance(user):
+    """Balance as committed, not as cached on a possibly stale instance."""
+    return _balance(user.pk)
+
+
+def ledger_total(user):
+    """Sum of the user's entries; equals wallet_balance while the ledger is intact."""
+    return WalletEntry.objects.filter(user_id=user.pk).aggregate(
+        total=Sum('amount'))['total'] or Decimal('0.00')
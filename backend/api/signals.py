@@ -0,0 +1,73 @@
+"""
+Model signal handlers that keep in-process caches coherent with the DB.
+Connected in ApiConfig.ready().
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Product, Category, UnitOfMeasure, Coupon, DeliveryZone
+from .services import catalog_cache, coupons, pricing, search_engine, serviceability
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def product_changed(sender, instance, **kwargs):
+    """
+    Once the transaction commits, invalidate cached pages and update the
+    search index and price table in place. A rolled-back save leaves them
+    untouched, and no reader sees the new version before the new row.
+    """
+    deleted = kwargs.get('signal') is post_delete
+
+    def apply():
+        version = catalog_cache.bump_version()
+        search_engine.apply_product_change(instance, version, deleted=deleted)
+        pricing.apply_product_change(instance, version, deleted=deleted)
+
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=UnitOfMeasure)
+@receiver(post_delete, sender=UnitOfMeasure)
+def invalidate_catalog(sender, **kwargs):
+    """Any other catalog change invalidates all cached product list pages (on commit)."""
+    catalog_cache.bump_version_on_commit()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_products(sender, instance, **kwargs):
+    """
+    Product JSON and list order depend on the category, so bump the
+    products' updated_at: the conditional-GET validators (api/conditional.py)
+    are derived from it. update() sends no signals.
+    """
+    Product.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=UnitOfMeasure)
+def touch_unit_products(sender, instance, **kwargs):
+    """Unit names/symbols are embedded in product JSON (see touch_category_products)."""
+    Product.objects.filter(
+        Q(pricing_unit=instance) | Q(weight_unit=instance)
+    ).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+@receiver(m2m_changed, sender=Coupon.products.through)
+@receiver(m2m_changed, sender=Coupon.categories.through)
+def coupon_changed(sender, **kwargs):
+    """Reload the coupon registry (services/coupons.py) once the change commits."""
+    coupons.invalidate()
+
+
+@receiver(post_save, sender=DeliveryZone)
+@receiver(post_delete, sender=DeliveryZone)
+def delivery_zone_changed(sender, **kwargs):
+    """Reload the serviceability map (services/serviceability.py) once the change commits."""
+    serviceability.invalidate()
@@ -0,0 +1,78 @@
+"""
+A tiny local stand-in for the WooCommerce REST API, for adapter/client tests.
+
+    server = FakeWooCommerce()
+    server.routes[('GET', '/products')] = [{'id': 1, 'name': 'Tomato'}]
+    with override_settings(WC_API_URL=server.url): ...
+    server.stop()
+
+Routes map (method, path) to a JSON body, or to a callable taking
+(query, body) and returning (status, json). `calls` records every request.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class FakeWooCommerce:
+    def __init__(self):
+        self.routes = {}
+        self.calls = []
+        self.down = False      # answer every request with 503
+        self.delay = 0         # seconds to sleep before answering
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                parts = urlsplit(self.path)
+                query = {k: v[0] if len(v) == 1 else v for k, v in parse_qs(parts.query).items()}
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                with fake._lock:
+                    fake.calls.append((self.command, parts.path, query, body))
+                if fake.delay:
+                    time.sleep(fake.delay)
+
+                route = fake.routes.get((self.command, parts.path))
+                if fake.down:
+                    status, payload = 503, {'message': 'Service Unavailable'}
+                elif route is None:
+                    status, payload = 404, {'code': 'rest_no_route'}
+                elif callable(route):
+                    status, payload = route(query, body)
+                else:
+                    status, payload = 200, route
+
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/"
+
+    def count(self, method, path):
+        with self._lock:
+            return sum(1 for m, p, _, _ in self.calls if m == method and p == path)
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
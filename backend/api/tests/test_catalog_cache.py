@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from api.models import Product, UnitOfMeasure, Category
+from api.services import catalog_cache
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        catalog_cache.reset_stats()
+        self.uom_kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.category = Category.objects.create(name='Leafy Greens', slug='leafy-greens')
+        self.spinach = Product.objects.create(
+            slug='spinach', name='Spinach', base_price=30,
+            category=self.category, pricing_unit=self.uom_kg,
+            weight_value=1, weight_unit=self.uom_kg,
+        )
+
+    def test_warm_hit_costs_no_queries(self):
+        url = reverse('product-list-v2')
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(first.json(), second.json())
+
+        stats = catalog_cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_product_save_invalidates_cached_pages(self):
+        url = reverse('product-list-v2')
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.spinach.name = 'Palak'
+            self.spinach.save()
+
+        data = self.client.get(url).json()
+        self.assertEqual(data['data'][0]['name'], 'Palak')
+        self.assertEqual(catalog_cache.stats()['misses'], 2)
+
+    def test_category_and_unit_changes_bump_version_on_commit(self):
+        version = catalog_cache.get_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.name = 'Greens'
+            self.category.save()
+            self.assertEqual(catalog_cache.get_version(), version)
+        self.assertEqual(catalog_cache.get_version(), version + 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UnitOfMeasure.objects.create(name='Piece', symbol='pc')
+        self.assertEqual(catalog_cache.get_version(), version + 2)
+
+    def test_rolled_back_change_does_not_bump_version(self):
+        version = catalog_cache.get_version()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                UnitOfMeasure.objects.create(name='Piece', symbol='pc')
+                raise RuntimeError
+        self.assertEqual(catalog_cache.get_version(), version)
+
+    def test_pages_are_keyed_by_filters(self):
+        url = reverse('product-list-v2')
+        self.client.get(url, {'category': 'leafy-greens'})
+        data = self.client.get(url, {'category': 'fruits'}).json()
+        self.assertEqual(data['data'], [])
+        self.assertEqual(catalog_cache.stats()['misses'], 2)
@@ -0,0 +1,101 @@
+import time
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Product, UnitOfMeasure, Category
+
+
+class ConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.greens = Category.objects.create(name='Greens', slug='greens')
+        self.spinach, self.tomato = [
+            Product.objects.create(
+                slug=slug, name=slug.title(), base_price=10, category=category,
+                pricing_unit=self.uom, weight_value=1, weight_unit=self.uom,
+            )
+            for slug, category in (('spinach', self.greens), ('tomato', None))
+        ]
+        self.list_url = reverse('product-list-v2')
+
+    def _revalidate(self, url, params=None):
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertIn('no-cache', first['Cache-Control'])
+        return first, self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    def test_warm_revalidation_answers_304_without_queries(self):
+        first = self.client.get(self.list_url)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp.content, b'')
+        self.assertEqual(resp['ETag'], first['ETag'])
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_list_validator_tracks_changes_and_params(self):
+        first, _ = self._revalidate(self.list_url)
+        self.assertNotEqual(self.client.get(self.list_url, {'page': 2})['ETag'], first['ETag'])
+        self.assertNotEqual(
+            self.client.get(self.list_url, {'category': 'greens'})['ETag'], first['ETag']
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tomato.is_active = False
+            self.tomato.save()
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['slug'] for p in resp.json()['data']], ['spinach'])
+
+    def test_lists_do_not_rely_on_last_modified(self):
+        first = self.client.get(self.list_url)
+        self.assertNotIn('Last-Modified', first)
+        with self.captureOnCommitCallbacks(execute=True):
+            # Older than tomato, and its own timestamp left alone: max(updated_at) does not move
+            self.spinach.is_active = False
+            self.spinach.save(update_fields=['is_active'])
+        resp = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['slug'] for p in resp.json()['data']], ['tomato'])
+
+    def test_unit_rename_invalidates(self):
+        first, _ = self._revalidate(self.list_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.uom.symbol = 'KG'
+            self.uom.save()
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_detail_if_modified_since(self):
+        url = reverse('product-detail-v2', args=['spinach'])
+        first, second = self._revalidate(url)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        resp = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.spinach.name = 'Baby Spinach'
+            self.spinach.save()
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(resp.json()['data']['name'], 'Baby Spinach')
+
+    def test_missing_product_is_still_404(self):
+        resp = self.client.get(reverse('product-detail-v2', args=['nope']), HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_categories(self):
+        url = reverse('category-list-v2')
+        first, second = self._revalidate(url)
+        self.assertEqual(second.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.greens.name = 'Leafy Greens'
+            self.greens.save()
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code,
+            status.HTTP_200_OK,
+        )
@@ -0,0 +1,228 @@
+import threading
+import time
+from decimal import Decimal
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APITestCase
+from api.models import Category, Coupon, CouponUsage, Order, Product, UnitOfMeasure, User
+from api.services import coupons, order_status, pricing
+from api.services.order_service import OrderService
+
+
+def make_catalog():
+    kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+    fruit = Category.objects.create(name='Fruits', slug='fruits')
+    mango, apple, okra = [
+        Product.objects.create(slug=slug, name=slug.title(), base_price=price, pricing_unit=kg,
+                               weight_value=1, weight_unit=kg, category=category)
+        for slug, price, category in (('mango', 100, fruit), ('apple', 50, fruit), ('okra', 40, None))
+    ]
+    return fruit, mango, apple, okra
+
+
+def make_user(phone):
+    return User.objects.create_user(phone_number=phone, username=phone, password='pw', is_phone_verified=True)
+
+
+class CouponRuleTests(TestCase):
+    def setUp(self):
+        pricing.reset()
+        coupons.reset()
+        self.fruit, self.mango, self.apple, self.okra = make_catalog()
+        self.basket = [
+            {'product_id': str(self.mango.pk), 'quantity': 2},  # 200
+            {'product_id': str(self.apple.pk), 'quantity': 1},  # 50
+            {'product_id': str(self.okra.pk), 'quantity': 1},   # 40
+        ]
+
+    def _quote(self, *codes):
+        return pricing.quote(self.basket, coupon=[coupons.get(code) for code in codes])
+
+    def test_percentage_discounts_are_capped(self):
+        Coupon.objects.create(code='TEN', discount_type='PERCENT', discount_percent=10)
+        Coupon.objects.create(code='HALF', discount_type='PERCENT', discount_percent=50, max_discount=100)
+        self.assertEqual(self._quote('TEN').discount, Decimal('29.00'))
+        self.assertEqual(self._quote('HALF').discount, Decimal('100.00'))
+
+    def test_scoped_coupons_only_discount_their_lines(self):
+        by_category = Coupon.objects.create(code='FRUIT20', discount_type='PERCENT', discount_percent=20)
+        by_category.categories.add(self.fruit)
+        by_product = Coupon.objects.create(code='OKRA99', discount_amount=99)
+        by_product.products.add(self.okra)
+
+        self.assertEqual(self._quote('FRUIT20').discount, Decimal('50.00'))   # 20% of 250
+        self.assertEqual(self._quote('OKRA99').discount, Decimal('40.00'))    # capped at the okra line
+        self.basket = self.basket[:2]
+        with self.assertRaisesMessage(pricing.PricingError, 'does not apply'):
+            self._quote('OKRA99')
+        with self.assertRaisesMessage(pricing.PricingError, 'Add items'):
+            pricing.coupon_discount(coupons.get('OKRA99'), Decimal('500'))
+
+    def test_stacking_rules(self):
+        Coupon.objects.create(code='A', discount_amount=30, stackable=True)
+        Coupon.objects.create(code='B', discount_type='PERCENT', discount_percent=10, stackable=True)
+        Coupon.objects.create(code='SOLO', discount_amount=5)
+        Coupon.objects.create(code='BIG', discount_amount=280, stackable=True)
+
+        quote = self._quote('A', 'B')
+        self.assertEqual([(c.code, amount) for c, amount in quote.discounts],
+                         [('A', Decimal('30.00')), ('B', Decimal('29.00'))])
+        self.assertEqual((quote.discount, quote.total, quote.coupon.code), (Decimal('59.00'), Decimal('231.00'), 'A'))
+        # Together they never exceed the basket
+        self.assertEqual(self._quote('BIG', 'A').discounts[1][1], Decimal('10.00'))
+
+        for codes, message in ((('A', 'SOLO'), 'cannot be combined'), (('A', 'A'), 'only be applied once'),
+                               (('A', 'B', 'BIG'), 'At most 2')):
+            with self.assertRaisesMessage(pricing.PricingError, message):
+                self._quote(*codes)
+
+
+class CouponLimitTests(TestCase):
+    def setUp(self):
+        pricing.reset()
+        coupons.reset()
+        _, self.mango, _, _ = make_catalog()
+        self.users = [make_user(f'900000012{i}') for i in range(3)]
+        self.service = OrderService()
+
+    def _order(self, user, *codes):
+        return self.service.place_order(user, {
+            'payment_method': 'COD', 'coupon_codes': list(codes),
+            'items': [{'product_id': str(self.mango.pk), 'quantity': 1}],
+        })
+
+    def test_global_limit(self):
+        Coupon.objects.create(code='FIRST2', discount_amount=10, usage_limit=2)
+        self.assertIsNone(self._order(self.users[0], 'FIRST2')[1])
+        self.assertIsNone(self._order(self.users[1], 'FIRST2')[1])
+        order, error = self._order(self.users[2], 'FIRST2')
+        self.assertIsNone(order)
+        self.assertEqual((error['status'], error['user_msg']), (400, 'FIRST2 has been fully redeemed'))
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(Coupon.objects.get(code='FIRST2').times_used, 2)
+
+    def test_malformed_codes_are_rejected(self):
+        Coupon.objects.create(code='FIRST2', discount_amount=10)
+        for codes in ({'FIRST2': 1}, 7, ['FIRST2', 7], [['FIRST2']]):
+            order, error = self.service.place_order(self.users[0], {
+                'payment_method': 'COD', 'coupon_codes': codes,
+                'items': [{'product_id': str(self.mango.pk), 'quantity': 1}],
+            })
+            self.assertIsNone(order)
+            self.assertEqual((error['status'], error['user_msg']),
+                             (400, 'Coupon codes must be a code or a list of codes'))
+        self.assertFalse(Order.objects.exists())
+        self.assertIsNone(self._order(self.users[0], 'FIRST2')[1])
+
+    def test_blank_codes_mean_no_coupon(self):
+        Coupon.objects.create(code='FIRST2', discount_amount=10)
+        for codes in ([], [''], ['  ']):
+            order, error = self._order(self.users[0], *codes)
+            self.assertIsNone(error)
+            self.assertEqual(order.discount_amount, 0)
+        order, _ = self._order(self.users[0], '', 'FIRST2')
+        self.assertEqual(order.discount_amount, 10)
+
+    def test_per_user_limit_and_release_on_cancel(self):
+        Coupon.objects.create(code='ONCE', discount_amount=10, per_user_limit=1, stackable=True)
+        Coupon.objects.create(code='EXTRA', discount_amount=5, stackable=True)
+        order, _ = self._order(self.users[0], 'ONCE', 'EXTRA')
+        self.assertEqual(list(order.coupon_redemptions.values_list('code', 'discount_amount')),
+                         [('ONCE', Decimal('10.00')), ('EXTRA', Decimal('5.00'))])
+        self.assertEqual(self._order(self.users[0], 'ONCE')[1]['user_msg'], 'You have already used ONCE')
+        self.assertIsNone(self._order(self.users[1], 'ONCE')[1])
+
+        order_status.transition(order, order_status.DELIVERY, 'CANCELLED')
+        self.assertEqual(CouponUsage.objects.get(user=self.users[0]).used, 0)
+        self.assertEqual(dict(Coupon.objects.values_list('code', 'times_used')), {'ONCE': 1, 'EXTRA': 0})
+        self.assertIsNone(self._order(self.users[0], 'ONCE')[1])
+
+
+class FlashSaleTests(TransactionTestCase):
+    THREADS = 8
+    ATTEMPTS_PER_THREAD = 4
+    LIMIT = 10
+
+    def _retrying(self, fn):
+        # SQLite serialises writers; a busy database is retried, not counted
+        for _ in range(200):
+            try:
+                return fn()
+            except OperationalError:
+                time.sleep(0.01)
+        raise AssertionError('database stayed locked')
+
+    def test_limit_is_never_oversubscribed(self):
+        pricing.reset()
+        coupons.reset()
+        _, mango, _, _ = make_catalog()
+        Coupon.objects.create(code='FLASH', discount_type='PERCENT', discount_percent=50, usage_limit=self.LIMIT)
+        users = [make_user(f'90000001{30 + i}') for i in range(self.THREADS)]
+        outcomes = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+
+        def shop(user):
+            barrier.wait()
+            try:
+                for _ in range(self.ATTEMPTS_PER_THREAD):
+                    order, error = self._retrying(lambda: OrderService().place_order(user, {
+                        'payment_method': 'COD', 'coupon_code': 'FLASH',
+                        'items': [{'product_id': str(mango.pk), 'quantity': 1}],
+                    }))
+                    with lock:
+                        outcomes.append('ok' if order else error['user_msg'])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=shop, args=(user,)) for user in users]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(outcomes), self.THREADS * self.ATTEMPTS_PER_THREAD)
+        self.assertEqual(outcomes.count('ok'), self.LIMIT)
+        self.assertEqual(set(outcomes) - {'ok'}, {'FLASH has been fully redeemed'})
+        self.assertEqual(Order.objects.count(), self.LIMIT)
+        self.assertEqual(Coupon.objects.get(code='FLASH').times_used, self.LIMIT)
+
+
+class CouponRuleApiTests(APITestCase):
+    def setUp(self):
+        pricing.reset()
+        coupons.reset()
+        self.fruit, self.mango, _, self.okra = make_catalog()
+        self.client.force_authenticate(make_user('9000000140'))
+
+    def test_preview_and_listing(self):
+        fruit = Coupon.objects.create(code='FRUIT20', discount_type='PERCENT', discount_percent=20,
+                                      max_discount=30, stackable=True)
+        fruit.categories.add(self.fruit)
+        Coupon.objects.create(code='FLAT10', discount_amount=10, stackable=True)
+
+        response = self.client.post('/api/coupons/apply/', {
+            'codes': ['FRUIT20', 'FLAT10'],
+            'items': [{'product_id': str(self.mango.pk), 'quantity': 1}, {'product_id': str(self.okra.pk), 'quantity': 1}],
+        }, format='json')
+        body = response.json()['data']
+        self.assertEqual((body['discount_amount'], body['order_total']), (30.0, 140.0))
+        self.assertEqual([d['discount_amount'] for d in body['discounts']], [20.0, 10.0])
+
+        response = self.client.post('/api/coupons/apply/', {'code': 'FRUIT20', 'order_total': 500}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        listed = {c['code']: c for c in self.client.get('/api/coupons/').json()['data']}
+        self.assertEqual(listed['FRUIT20']['desc'], 'Get 20.00% OFF (up to ₹30.00) above ₹0.00')
+
+    def test_preview_needs_a_code_that_is_not_blank(self):
+        Coupon.objects.create(code='FLAT10', discount_amount=10)
+        items = [{'product_id': str(self.mango.pk), 'quantity': 1}]
+        for body in ({'codes': []}, {'codes': ['']}, {'code': ' '}):
+            response = self.client.post('/api/coupons/apply/', {**body, 'items': items}, format='json')
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn('Code and Order Total required', str(response.json()))
+        response = self.client.post('/api/coupons/apply/', {'codes': {'FLAT10': 1}, 'items': items}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/coupons/apply/', {'codes': ['', 'FLAT10'], 'items': items}, format='json')
+        self.assertEqual(response.json()['data']['discount_amount'], 10.0)
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from api.models import Coupon, Order, User
+from api.services import coupons, order_status
+
+
+class CouponRegistryTests(TestCase):
+    def setUp(self):
+        coupons.reset()
+        self.flat = Coupon.objects.create(code='FLAT20', discount_amount=20, min_order_value=100)
+
+    def test_warm_lookups_need_no_queries(self):
+        coupons.get('FLAT20')
+        with self.assertNumQueries(0):
+            self.assertEqual(coupons.get('FLAT20').pk, self.flat.pk)
+            self.assertIsNone(coupons.get('NOPE'))
+            self.assertIsNone(coupons.get(None))
+            self.assertEqual([c.code for c in coupons.available()], ['FLAT20'])
+
+    def test_saves_and_deletes_reload_it(self):
+        coupons.get('FLAT20')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.flat.is_active = False
+            self.flat.save()
+        self.assertIsNone(coupons.get('FLAT20'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            welcome = Coupon.objects.create(code='WELCOME50', discount_amount=50)
+        self.assertEqual(coupons.get('WELCOME50').pk, welcome.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            welcome.delete()
+        self.assertIsNone(coupons.get('WELCOME50'))
+
+    def test_rolled_back_save_leaves_it_alone(self):
+        version, pk = coupons.get_registry().version, self.flat.pk
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.flat.delete()
+                raise RuntimeError
+        self.assertEqual(coupons.get_registry().version, version)
+        self.assertEqual(coupons.get('FLAT20').pk, pk)
+
+    @override_settings(LOCAL_CACHE_MAX_AGE=60)
+    def test_registry_is_rebuilt_once_too_old(self):
+        # Another process deactivated it; its version bump never reached this one
+        registry = coupons.get_registry()
+        Coupon.objects.filter(pk=self.flat.pk).update(is_active=False)
+        self.assertIsNotNone(coupons.get('FLAT20'))
+        registry.built_at -= 61
+        self.assertIsNone(coupons.get('FLAT20'))
+
+    def test_expired_coupons_are_not_offered(self):
+        Coupon.objects.create(code='OLD', discount_amount=5, valid_until=timezone.now() - timedelta(days=1))
+        Coupon.objects.create(code='SOON', discount_amount=5, valid_until=timezone.now() + timedelta(days=1))
+        self.assertEqual([c.code for c in coupons.available()], ['FLAT20', 'SOON'])
+        self.assertIsNotNone(coupons.get('OLD'))  # so applying it can say "expired"
+
+
+class FirstOrderFlagTests(TestCase):
+    def test_completing_a_payment_sets_it_once(self):
+        user = User.objects.create_user(phone_number='9000000110', username='9000000110', password='pw')
+        orders = Order.objects.bulk_create([Order(user=user, total_price=10) for _ in range(2)])
+
+        order_status.transition_many([orders[0].pk], order_status.PAYMENT, 'FAILED')
+        user.refresh_from_db()
+        self.assertFalse(user.has_completed_order)
+
+        order_status.transition(orders[1], order_status.PAYMENT, 'COMPLETED', transaction_id='pay_1')
+        user.refresh_from_db()
+        self.assertTrue(user.has_completed_order)
+
+
+class CouponApiTests(APITestCase):
+    def setUp(self):
+        coupons.reset()
+        Coupon.objects.create(code='WELCOME50', discount_amount=50, min_order_value=100, new_customers_only=True)
+        Coupon.objects.create(code='OLD', discount_amount=5, valid_until=timezone.now() - timedelta(days=1))
+        self.user = User.objects.create_user(phone_number='9000000111', username='9000000111', password='pw')
+        self.client.force_authenticate(self.user)
+
+    def _apply(self, code='WELCOME50'):
+        return self.client.post('/api/coupons/apply/', {'code': code, 'order_total': 200}, format='json')
+
+    def test_welcome_offer_is_for_new_customers_without_querying_orders(self):
+        self._apply()  # warm the registry
+        with self.assertNumQueries(0):
+            response = self._apply()
+        self.assertEqual(response.json()['data']['discount_amount'], 50.0)
+
+        order = Order.objects.create(user=self.user, total_price=10)
+        self.client.post('/api/payment/webhook/', {'order_id': str(order.pk), 'payment_id': 'pay_1'}, format='json')
+        self.user.refresh_from_db()
+        self.client.force_authenticate(self.user)
+        self.assertIn('new users only', str(self._apply().json()))
+
+    def test_expired_and_unknown_codes(self):
+        self.assertIn('Coupon Expired', str(self._apply('OLD').json()))
+        self.assertIn('Invalid Coupon Code', str(self._apply('NOPE').json()))
+        codes = [c['code'] for c in self.client.get('/api/coupons/').json()['data']]
+        self.assertEqual(codes, ['WELCOME50'])
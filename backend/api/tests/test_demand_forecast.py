@@ -0,0 +1,116 @@
+import csv
+from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from api.models import Address, DeliveryZone, Product, Subscription, UnitOfMeasure, User
+from api.services import demand_forecast, serviceability
+
+START = date(2026, 3, 2)  # a Monday
+
+
+class DemandForecastTests(TestCase):
+    def setUp(self):
+        kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.milk, self.eggs = [
+            Product.objects.create(slug=slug, name=slug.title(), base_price=10, pricing_unit=kg,
+                                   weight_value=1, weight_unit=kg)
+            for slug in ('milk', 'eggs')
+        ]
+        self.user = User.objects.create_user(phone_number='9000000100', username='9000000100', password='pw')
+        self.home = Address.objects.create(user=self.user, name='Home', street='1 Main St', city='Kanpur',
+                                           zip_code='208001', is_default=True)
+        self.office = Address.objects.create(user=self.user, name='Office', street='2 Mall Rd', city='Kanpur',
+                                             zip_code='208002')
+        self.zone = DeliveryZone.objects.create(zip_code='208001', city='Kanpur', delivery_time_hrs=4)
+        serviceability.reset()
+
+    def _sub(self, product, frequency, quantity=1, start_date=START, due=START, **fields):
+        return Subscription.objects.create(user=self.user, product=product, frequency=frequency, quantity=quantity,
+                                           start_date=start_date, next_delivery_date=due, **fields)
+
+    def _quantities(self, result, product):
+        return next(row['quantities'] for row in result['products'] if row['product_id'] == product.pk)
+
+    def test_frequencies_expand_over_the_horizon(self):
+        self._sub(self.milk, 'DAILY', quantity=2)
+        self._sub(self.milk, 'ALTERNATE_DAYS')
+        self._sub(self.eggs, 'WEEKLY', start_date=START + timedelta(days=2), due=START + timedelta(days=2))
+        self._sub(self.eggs, 'DAILY', status='PAUSED')
+
+        result = demand_forecast.forecast(days=8, start=START)
+        self.assertEqual(result['dates'][0], START)
+        #                                           Mo Tu We Th Fr Sa Su Mo
+        self.assertEqual(self._quantities(result, self.milk), [3, 2, 3, 2, 3, 2, 2, 3])
+        self.assertEqual(self._quantities(result, self.eggs), [0, 0, 1, 0, 0, 0, 0, 0])
+
+    def test_next_delivery_date_starts_the_schedule(self):
+        # Off-schedule next date (a Tuesday), then back on Mon/Wed/Fri
+        self._sub(self.milk, 'ALTERNATE_DAYS', due=START + timedelta(days=1))
+        # Overdue: the runs before the horizon deliver it, so it resumes on schedule
+        self._sub(self.eggs, 'MONTHLY', start_date=date(2026, 1, 3), due=date(2026, 2, 3))
+        result = demand_forecast.forecast(days=7, start=START)
+        self.assertEqual(self._quantities(result, self.milk), [0, 1, 1, 0, 1, 0, 0])
+        self.assertEqual(self._quantities(result, self.eggs), [0, 1, 0, 0, 0, 0, 0])  # the 3rd
+
+    def test_zones_follow_the_delivery_address(self):
+        self._sub(self.milk, 'DAILY', quantity=2)
+        self._sub(self.milk, 'DAILY', address=self.office)
+        Product.objects.filter(pk=self.eggs.pk).update(is_active=False)
+        self._sub(self.eggs, 'DAILY')
+
+        result = demand_forecast.forecast(days=2, start=START)
+        self.assertEqual([row['name'] for row in result['products']], ['Milk'])
+        self.assertEqual(
+            [(row['zone_id'], row['city'], row['quantities'], row['total']) for row in result['zones']],
+            [(self.zone.pk, 'Kanpur', [2, 2], 4), (None, None, [1, 1], 2)],  # 208002 is outside every zone
+        )
+
+    def test_pincodes_are_grouped_by_zone(self):
+        kanpur = DeliveryZone.objects.create(zip_code='2080xx', city='Kanpur', delivery_time_hrs=8)
+        serviceability.reset()
+        other = User.objects.create_user(phone_number='9000000103', username='9000000103', password='pw')
+        Address.objects.create(user=other, name='Home', street='3 Canal Rd', city='Kanpur', zip_code='208003')
+        Subscription.objects.create(user=other, product=self.milk, frequency='DAILY', quantity=5,
+                                    start_date=START, next_delivery_date=START)
+        self._sub(self.milk, 'DAILY', quantity=2)                   # exact 208001 row wins
+        self._sub(self.milk, 'DAILY', address=self.office)         # 208002 -> 2080xx
+        self._sub(self.milk, 'DAILY', start_date=START - timedelta(days=9), due=START - timedelta(days=1))
+
+        with self.assertNumQueries(4):  # zones map, grouped demand, products, zones
+            result = demand_forecast.forecast(days=2, start=START)
+        self.assertEqual(
+            [(row['zip_code'], row['quantities']) for row in result['zones']],
+            [('208001', [3, 3]), ('2080xx', [6, 6])],
+        )
+        self.assertEqual(result['zones'][1]['zone_id'], kanpur.pk)
+
+    def test_groups_are_bounded_by_schedules(self):
+        for i in range(30):
+            self._sub(self.milk, 'WEEKLY', start_date=START - timedelta(days=7 * i), due=START - timedelta(days=1))
+        self.assertEqual(len(demand_forecast._grouped_demand(START, 7)), 1)
+
+    def test_command_writes_csv(self):
+        self._sub(self.milk, 'ALTERNATE_DAYS', quantity=3)
+        out = StringIO()
+        call_command('export_demand_forecast', '--start', START.isoformat(), '--days', '3', '--by-zone', stdout=out)
+        rows = list(csv.reader(StringIO(out.getvalue())))
+        self.assertEqual(rows[0], ['date', 'zone_id', 'zip_code', 'city', 'product_id', 'product', 'unit', 'quantity'])
+        self.assertEqual([(r[0], r[2], r[7]) for r in rows[1:]], [('2026-03-02', '208001', '3'), ('2026-03-04', '208001', '3')])
+
+
+class DemandForecastApiTests(APITestCase):
+    def test_staff_only_and_validated(self):
+        customer = User.objects.create_user(phone_number='9000000101', username='9000000101', password='pw')
+        self.client.force_authenticate(customer)
+        self.assertEqual(self.client.get('/api/procurement/forecast/').status_code, 403)
+
+        staff = User.objects.create_user(phone_number='9000000102', username='9000000102', password='pw', is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.get('/api/procurement/forecast/', {'days': 3, 'start': '2026-03-02'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['dates'], ['2026-03-02', '2026-03-03', '2026-03-04'])
+        self.assertEqual(self.client.get('/api/procurement/forecast/', {'days': 0}).status_code, 400)
+        self.assertEqual(self.client.get('/api/procurement/forecast/', {'days': 1000}).status_code, 400)
+        self.assertEqual(self.client.get('/api/procurement/forecast/', {'start': 'tomorrow'}).status_code, 400)
@@ -0,0 +1,31 @@
+from io import StringIO
+from unittest import skipUnless
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from api.management.commands.explain_hot_queries import SORT, SQLITE_SCAN, SQLITE_SORT
+
+
+class ExplainHotQueriesTests(TestCase):
+    def test_only_full_table_scans_count(self):
+        plan = (
+            '3 0 0 SCAN api_order\n'
+            '5 0 0 SCAN api_product USING INDEX product_active_listing_idx\n'
+            '7 0 0 SCAN TABLE api_wishlist\n'
+            '8 0 0 SCAN TABLE api_address USING COVERING INDEX x\n'
+            '9 0 0 SEARCH api_subscription USING INDEX y (user_id=?)'
+        )
+        self.assertEqual(set(SQLITE_SCAN.findall(plan)), {'api_order', 'api_wishlist'})
+
+    def test_sorts_are_detected(self):
+        self.assertTrue(SQLITE_SORT.search('5 0 0 SCAN api_product\n9 0 0 USE TEMP B-TREE FOR ORDER BY'))
+        self.assertFalse(SQLITE_SORT.search('9 0 0 USE TEMP B-TREE FOR GROUP BY'))
+        self.assertTrue(SORT.search('Limit  (cost=1.1..2.2)\n  ->  Sort  (cost=1.1..1.2 rows=10)'))
+        self.assertTrue(SORT.search('  ->  Incremental Sort  (cost=1.1..1.2 rows=10)'))
+        self.assertFalse(SORT.search('Index Scan using product_active_listing_idx on api_product'))
+
+    @skipUnless(connection.vendor == 'sqlite', 'plan expectations are for SQLite')
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', users=40, products=200, stdout=out)
+        self.assertIn('All hot queries use an index', out.getvalue())
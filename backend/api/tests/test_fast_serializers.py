@@ -0,0 +1,74 @@
+import datetime
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase, APIRequestFactory
+from api.fast_serializers import serialize_products, serialize_wishlist, serialize_subscriptions
+from api.models import Product, UnitOfMeasure, Category, User, Wishlist, Subscription
+from api.serializers import ProductSerializer, WishlistSerializer, SubscriptionSerializer
+
+
+class FastSerializerGoldenTests(APITestCase):
+    """The fast path must render byte-for-byte what the DRF serializers render."""
+
+    def setUp(self):
+        kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        pc = UnitOfMeasure.objects.create(name='Piece', symbol='pc')
+        greens = Category.objects.create(name='Greens', slug='greens')
+        Product.objects.create(
+            slug='spinach', name='Spinach', description='Fresh “palak” — ünïcode',
+            image='products/product_1515.jpg', category=greens,
+            base_price=Decimal('30'), discounted_price=Decimal('25.5'),
+            pricing_unit=kg, weight_value=Decimal('1'), weight_unit=kg, is_organic=True,
+        )
+        Product.objects.create(
+            slug='lemon', name='Lemon', base_price=Decimal('5.00'),
+            pricing_unit=pc, weight_value=Decimal('50'), weight_unit=kg, is_active=False,
+        )
+        self.user = User.objects.create_user(username='9999999999', phone_number='9999999999', password='pw')
+        for product in Product.objects.all():
+            Wishlist.objects.create(user=self.user, product=product)
+            Subscription.objects.create(
+                user=self.user, product=product, quantity=2, frequency='WEEKLY',
+                start_date=datetime.date(2026, 1, 5), next_delivery_date=datetime.date(2026, 1, 12),
+            )
+        self.request = APIRequestFactory().get('/')
+
+    def assertSameBytes(self, expected, actual):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(expected), renderer.render(actual))
+
+    def test_products(self):
+        qs = Product.objects.order_by('name')
+        self.assertSameBytes(ProductSerializer(qs, many=True).data, serialize_products(qs))
+
+    def test_products_with_request_builds_absolute_image_urls(self):
+        qs = Product.objects.order_by('name')
+        context = {'request': self.request}
+        self.assertSameBytes(
+            ProductSerializer(qs, many=True, context=context).data,
+            serialize_products(qs, request=self.request),
+        )
+
+    def test_wishlist(self):
+        qs = Wishlist.objects.filter(user=self.user).order_by('-created_at')
+        context = {'request': self.request}
+        self.assertSameBytes(
+            WishlistSerializer(qs, many=True, context=context).data,
+            serialize_wishlist(qs, request=self.request),
+        )
+
+    def test_subscriptions(self):
+        qs = Subscription.objects.filter(user=self.user).order_by('-created_at')
+        context = {'request': self.request}
+        self.assertSameBytes(
+            SubscriptionSerializer(qs, many=True, context=context).data,
+            serialize_subscriptions(qs, request=self.request),
+        )
+
+    def test_list_endpoints_use_single_query(self):
+        self.client.force_authenticate(user=self.user)
+        with self.assertNumQueries(1):
+            self.client.get(reverse('wishlist-list'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('subscription-list'))
@@ -0,0 +1,111 @@
+from unittest import mock
+import requests
+from django.test import SimpleTestCase
+from api.services.http_client import HttpClient, CircuitBreaker, CircuitOpenError
+from .fake_woocommerce import FakeWooCommerce
+
+
+class HttpClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeWooCommerce()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.calls.clear()
+        self.server.down = False
+        self.server.delay = 0
+        self.server.routes[('GET', '/ping')] = {'ok': True}
+        self.server.routes[('POST', '/orders')] = lambda query, body: (201, {'id': 7})
+        self.client = HttpClient(retries=2, backoff=0, failure_threshold=3, reset_timeout=60)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_connections_are_reused_per_host(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(self.server.url + 'ping').json(), {'ok': True})
+        self.assertEqual(len(self.client._sessions), 1)
+        stats = self.client.stats()
+        host = self.server.url.split('/')[2]
+        self.assertEqual(stats[host]['requests'], 3)
+        self.assertEqual(stats[host]['circuit'], 'closed')
+
+    def test_idempotent_calls_are_retried(self):
+        self.server.down = True
+        resp = self.client.get(self.server.url + 'ping')
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(self.server.count('GET', '/ping'), 3)
+
+    def test_posts_are_not_retried(self):
+        self.server.down = True
+        self.client.post(self.server.url + 'orders', json={})
+        self.assertEqual(self.server.count('POST', '/orders'), 1)
+
+    def test_default_timeout_applies(self):
+        self.client = HttpClient(read_timeout=0.1, retries=0)
+        self.server.delay = 0.5
+        with self.assertRaises(requests.Timeout):
+            self.client.get(self.server.url + 'ping')
+
+    def test_breaker_opens_and_fails_fast(self):
+        self.server.down = True
+        self.client.get(self.server.url + 'ping')   # 3 attempts -> threshold reached
+        with self.assertRaises(CircuitOpenError):
+            self.client.get(self.server.url + 'ping')
+        self.assertEqual(self.server.count('GET', '/ping'), 3)
+        self.assertIsInstance(CircuitOpenError(), requests.RequestException)
+
+    def test_probe_failing_with_other_request_errors_reopens(self):
+        url = self.server.url + 'ping'
+        breaker = self.client.breaker(url)
+        breaker.state, breaker.opened_at = CircuitBreaker.OPEN, breaker.clock() - 61
+        with mock.patch.object(requests.Session, 'request', side_effect=requests.TooManyRedirects('loop')) as request:
+            with self.assertRaises(requests.TooManyRedirects):
+                self.client.get(url)
+        self.assertEqual(request.call_count, 1)                 # not retried
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)    # the probe failed
+
+        breaker.opened_at = breaker.clock() - 61
+        self.assertEqual(self.client.get(url).json(), {'ok': True})
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_probe_interrupted_by_other_errors_is_released(self):
+        url = self.server.url + 'ping'
+        breaker = self.client.breaker(url)
+        breaker.state, breaker.opened_at = CircuitBreaker.OPEN, breaker.clock() - 61
+        with mock.patch.object(requests.Session, 'request', side_effect=KeyError('boom')):
+            with self.assertRaises(KeyError):
+                self.client.get(url)
+        self.assertEqual(self.client.get(url).json(), {'ok': True})
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_half_open_probe_closes_on_success(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        now[0] = 11
+        self.assertTrue(breaker.allow())     # one probe
+        self.assertFalse(breaker.allow())    # others still blocked
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_probe_reopens(self):
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+        breaker.record_failure()
+        now[0] = 11
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
@@ -0,0 +1,120 @@
+import threading
+import time
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework.views import APIView
+from api import idempotency
+from api.idempotency import idempotent
+from api.models import Product, UnitOfMeasure, User, Order, IdempotencyRecord
+
+
+class SlowView(APIView):
+    authentication_classes = []
+    calls = []
+
+    @idempotent('slow')
+    def post(self, request):
+        SlowView.calls.append(request.data)
+        time.sleep(0.2)
+        if request.data.get('fail'):
+            return Response({'error': 'boom'}, status=503)
+        return Response({'n': len(SlowView.calls)}, status=201)
+
+
+@override_settings(IDEMPOTENCY={'STORE': 'cache'})
+class IdempotentDecoratorTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        SlowView.calls = []
+
+    def _post(self, data, key='k1'):
+        request = APIRequestFactory().post('/slow/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+        return SlowView.as_view()(request)
+
+    def test_concurrent_duplicates_wait_and_replay(self):
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(self._post({'a': 1}))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(SlowView.calls), 1)
+        self.assertEqual([r.status_code for r in responses], [201] * 5)
+        self.assertEqual({r.data['n'] for r in responses}, {1})
+        self.assertEqual(sum(r.get('Idempotent-Replayed') == 'true' for r in responses), 4)
+
+    def test_different_body_with_same_key_is_rejected(self):
+        self._post({'a': 1})
+        self.assertEqual(self._post({'a': 2}).status_code, 422)
+        self.assertEqual(self._post({'a': 2}, key='k2').status_code, 201)
+
+    def test_server_errors_are_not_remembered(self):
+        self.assertEqual(self._post({'fail': True}).status_code, 503)
+        self.assertEqual(self._post({'fail': True}).status_code, 503)
+        self.assertEqual(len(SlowView.calls), 2)
+
+    @override_settings(IDEMPOTENCY={'STORE': 'cache', 'TTL': 0.5})
+    def test_keys_expire(self):
+        self._post({'a': 1})
+        time.sleep(0.6)
+        self._post({'a': 1})
+        self.assertEqual(len(SlowView.calls), 2)
+
+
+class IdempotentEndpointTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.product = Product.objects.create(
+            slug='tomato', name='Tomato', base_price=10, pricing_unit=uom,
+            weight_value=1, weight_unit=uom,
+        )
+        self.user = User.objects.create_user(
+            phone_number='9000000010', username='9000000010', password='pw',
+            is_phone_verified=True, wallet_balance=100,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _place(self, key):
+        return self.client.post(reverse('place-order'), {
+            'payment_method': 'WALLET',
+            'items': [{'product_id': str(self.product.id), 'quantity': 2}],
+        }, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def _check_retries_place_one_order(self):
+        first, retry = self._place('checkout-1'), self._place('checkout-1')
+        self.assertEqual(first.json(), retry.json())
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Order.objects.count(), 1)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, 80)
+
+        self._place('checkout-2')
+        self.assertEqual(Order.objects.count(), 2)
+
+    @override_settings(IDEMPOTENCY={'STORE': 'cache'})
+    def test_retried_checkout_with_cache_store(self):
+        self._check_retries_place_one_order()
+
+    def test_retried_checkout_with_db_store(self):
+        self._check_retries_place_one_order()
+        self.assertEqual(IdempotencyRecord.objects.filter(state='DONE').count(), 2)
+
+    def test_db_store_is_the_default_without_a_shared_cache(self):
+        self.assertIsInstance(idempotency.get_store(), idempotency.DatabaseStore)
+
+    def test_webhook_redelivery_is_keyed_by_payment_id(self):
+        order = Order.objects.create(user=self.user, total_price=10)
+        url = reverse('payment-webhook')
+        data = {'order_id': str(order.id), 'payment_id': 'pay_1'}
+        self.client.post(url, data, format='json')
+        Order.objects.filter(pk=order.pk).update(payment_status='PENDING')
+
+        resp = self.client.post(url, data, format='json')
+        self.assertEqual(resp['Idempotent-Replayed'], 'true')
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, 'PENDING')  # handler did not run again
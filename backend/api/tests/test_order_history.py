@@ -0,0 +1,79 @@
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from api.models import Product, UnitOfMeasure, User, Order, OrderItem
+
+
+class OrderHistoryTests(APITestCase):
+    def setUp(self):
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.products = [
+            Product.objects.create(slug=f'veg-{i}', name=f'Veg {i}', base_price=10,
+                                   pricing_unit=uom, weight_value=1, weight_unit=uom)
+            for i in range(3)
+        ]
+        self.user = User.objects.create_user(phone_number='9000000040', username='9000000040', password='pw')
+        self.client.force_authenticate(self.user)
+
+    def _make_orders(self, count, items_per_order=3):
+        start = timezone.now() - timedelta(days=count)
+        for i in range(count):
+            order = Order.objects.create(user=self.user, total_price=30)
+            # Pairs share a timestamp so the id tie-breaker is exercised
+            Order.objects.filter(pk=order.pk).update(created_at=start + timedelta(hours=i // 2))
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=1, price_at_purchase=10)
+                for product in self.products[:items_per_order]
+            ])
+
+    def _get(self, **params):
+        response = self.client.get('/api/orders/history/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def _query_count(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            self._get(**params)
+        return len(ctx.captured_queries)
+
+    def test_cursor_pages_cover_every_order_once_newest_first(self):
+        self._make_orders(7)
+        seen, cursor = [], ''
+        while cursor is not None:
+            page = self._get(cursor=cursor, per_page=3)
+            seen.extend(page['results'])
+            cursor = page['next_cursor']
+        self.assertEqual(len({o['id'] for o in seen}), 7)
+        stamps = [o['created_at'] for o in seen]
+        self.assertEqual(stamps, sorted(stamps, reverse=True))
+        self.assertEqual(seen[0]['items'][0]['product_name'][:4], 'Veg ')
+
+    def test_query_count_does_not_grow_with_history(self):
+        self._make_orders(2)
+        small = (self._query_count(cursor=''), self._query_count(cursor='', view='summary'))
+        self._make_orders(40)
+        large = (self._query_count(cursor='', per_page=50), self._query_count(cursor='', view='summary', per_page=50))
+        self.assertEqual(small, large)
+        self.assertEqual(large[1] - large[0], -1)  # summary skips the items prefetch
+
+    def test_summary_has_headers_and_item_counts_only(self):
+        self._make_orders(2, items_per_order=2)
+        page = self._get(cursor='', view='summary')
+        self.assertEqual(page['next_cursor'], None)
+        self.assertEqual([o['item_count'] for o in page['results']], [2, 2])
+        self.assertNotIn('items', page['results'][0])
+
+    def test_legacy_request_returns_a_plain_list(self):
+        self._make_orders(3)
+        self.assertEqual(len(self._get()), 3)
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get('/api/orders/history/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_other_users_orders_are_not_listed(self):
+        other = User.objects.create_user(phone_number='9000000041', username='9000000041', password='pw')
+        Order.objects.create(user=other, total_price=5)
+        self.assertEqual(self._get(cursor='')['results'], [])
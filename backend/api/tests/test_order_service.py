@@ -0,0 +1,115 @@
+from decimal import Decimal
+from unittest import mock
+from django.db import IntegrityError
+from django.test import TestCase
+from api.models import Product, UnitOfMeasure, User, Order, OrderItem, Coupon
+from api.services import coupons, pricing
+from api.services.order_service import OrderService
+
+
+class PlaceOrderTests(TestCase):
+    def setUp(self):
+        pricing.reset()
+        coupons.reset()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.products = [
+            Product.objects.create(
+                slug=f'veg-{i}', name=f'Veg {i}', base_price=10, pricing_unit=uom,
+                weight_value=1, weight_unit=uom, external_id=str(500 + i),
+            )
+            for i in range(30)
+        ]
+        self.user = User.objects.create_user(
+            phone_number='9000000001', username='9000000001', password='pw',
+            is_phone_verified=True, wallet_balance=Decimal('100.00'),
+        )
+        self.service = OrderService()
+
+    def _items(self, ids):
+        return [{'product_id': pid, 'quantity': 2, 'price': '10.00'} for pid in ids]
+
+    def test_query_count_does_not_grow_with_basket_size(self):
+        # Mix of WC external ids and local UUIDs
+        ids = [p.external_id if i % 2 else str(p.id) for i, p in enumerate(self.products)]
+        pricing.get_table()
+        with self.assertNumQueries(4):  # savepoint, order, items, release
+            order, error = self.service.place_order(self.user, {
+                'payment_method': 'COD', 'total_price': 600, 'items': self._items(ids),
+            })
+        self.assertIsNone(error)
+        self.assertEqual(
+            set(order.items.values_list('product_id', flat=True)),
+            {p.id for p in self.products},
+        )
+
+    def test_unresolved_items_reject_the_whole_order(self):
+        ids = [self.products[0].external_id, 'no-such-id', 'ffffffff-ffff-ffff-ffff-ffffffffffff']
+        order, error = self.service.place_order(self.user, {
+            'payment_method': 'WALLET', 'total_price': 30, 'items': self._items(ids),
+        })
+        self.assertIsNone(order)
+        self.assertEqual(error['status'], 400)
+        self.assertEqual(error['unresolved_items'], ids[1:])
+        self.assertFalse(Order.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, Decimal('100.00'))
+
+    def test_failed_write_rolls_back_wallet_debit(self):
+        items = self._items([self.products[0].external_id])
+        with mock.patch.object(OrderItem.objects, 'bulk_create', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                self.service.place_order(self.user, {
+                    'payment_method': 'WALLET', 'total_price': 20, 'items': items,
+                })
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, Decimal('100.00'))
+
+    def test_wallet_is_debited_the_server_side_total(self):
+        self.products[0].discounted_price = Decimal('7.25')
+        self.products[0].save()
+        Coupon.objects.create(code='FLAT5', discount_amount=5, min_order_value=10)
+        order, error = self.service.place_order(self.user, {
+            'payment_method': 'WALLET', 'total_price': 1, 'coupon_code': 'FLAT5',
+            'items': [
+                {'product_id': self.products[0].external_id, 'quantity': 2, 'price': '0.01'},
+                {'product_id': str(self.products[1].id), 'quantity': 1, 'price': '0.01'},
+            ],
+        })
+        self.assertIsNone(error)
+        self.assertEqual((order.total_price, order.discount_amount), (Decimal('19.50'), Decimal('5.00')))
+        self.assertEqual(
+            sorted(order.items.values_list('price_at_purchase', flat=True)),
+            [Decimal('7.25'), Decimal('10.00')],
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, Decimal('80.50'))
+
+    def test_weights_are_stored_as_charged(self):
+        order, error = self.service.place_order(self.user, {
+            'payment_method': 'COD', 'items': [
+                {'product_id': str(self.products[0].id), 'quantity': 0.5},
+                {'product_id': str(self.products[1].id), 'quantity': '1.5'},
+            ],
+        })
+        self.assertIsNone(error)
+        items = list(order.items.order_by('price_at_purchase', 'quantity'))
+        self.assertEqual([item.quantity for item in items], [Decimal('0.5'), Decimal('1.5')])
+        self.assertEqual(order.total_price, sum(item.quantity * item.price_at_purchase for item in items))
+        self.assertEqual(order.total_price, Decimal('20.00'))
+
+        order, error = self.service.place_order(self.user, {
+            'payment_method': 'COD', 'items': [{'product_id': str(self.products[0].id), 'quantity': '0.0005'}],
+        })
+        self.assertIsNone(order)
+        self.assertIn('at most 3 decimal places', error['user_msg'])
+
+    def test_invalid_coupon_rejects_the_order(self):
+        Coupon.objects.create(code='BIG', discount_amount=50, min_order_value=500)
+        order, error = self.service.place_order(self.user, {
+            'payment_method': 'COD', 'coupon_code': 'BIG',
+            'items': self._items([self.products[0].external_id]),
+        })
+        self.assertIsNone(order)
+        self.assertIn('Minimum order value', error['user_msg'])
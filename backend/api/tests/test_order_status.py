@@ -0,0 +1,107 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APITestCase
+from api.models import User, Order
+from api.services import order_status, wallet
+
+
+class OrderStateMachineTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(phone_number='9000000070', username='9000000070', password='pw')
+
+    def _orders(self, count, **fields):
+        return Order.objects.bulk_create([Order(user=self.user, total_price=10, **fields) for _ in range(count)])
+
+    def test_single_transition_writes_status_and_timestamp_only(self):
+        order = self._orders(1)[0]
+        Order.objects.filter(pk=order.pk).update(delivery_name='Asha')  # the instance is now stale
+
+        self.assertTrue(order_status.transition(order, order_status.DELIVERY, 'PACKING'))
+        order.refresh_from_db()
+        self.assertEqual((order.delivery_status, order.delivery_name), ('PACKING', 'Asha'))
+        self.assertIsNotNone(order.packed_at)
+
+        # Already there: a no-op, not an error
+        self.assertFalse(order_status.transition(order, order_status.DELIVERY, 'PACKING'))
+        with self.assertRaises(order_status.InvalidTransition) as ctx:
+            order_status.transition(order, order_status.DELIVERY, 'DELIVERED')
+        self.assertEqual(ctx.exception.current, 'PACKING')
+
+    def test_unknown_states_and_extras_are_refused(self):
+        order = self._orders(1)[0]
+        with self.assertRaises(order_status.InvalidTransition):
+            order_status.transition(order, order_status.DELIVERY, 'LOST')
+        with self.assertRaises(order_status.InvalidTransition):
+            order_status.transition(order, order_status.DELIVERY, 'PACKING', driver_name='Ravi')
+
+    def test_bulk_transition_is_one_update_and_one_read(self):
+        packing = self._orders(50, delivery_status='PACKING')
+        already = self._orders(2, delivery_status='OUT_FOR_DELIVERY')
+        pending = self._orders(3)
+        ids = [o.pk for o in packing + already + pending]
+
+        with self.assertNumQueries(4):  # savepoint, UPDATE, SELECT, release
+            result = order_status.transition_many(
+                ids, order_status.DELIVERY, 'OUT_FOR_DELIVERY', {'driver_name': 'Ravi'},
+            )
+        self.assertEqual((len(result.updated), len(result.unchanged), len(result.rejected)), (50, 2, 3))
+        self.assertEqual(set(result.rejected.values()), {'PENDING'})
+        moved = Order.objects.filter(pk__in=[o.pk for o in packing])
+        self.assertEqual(moved.filter(delivery_status='OUT_FOR_DELIVERY', driver_name='Ravi',
+                                      out_for_delivery_at__isnull=False).count(), 50)
+
+    def test_cancelling_refunds_wallet_payments_once(self):
+        wallet.top_up(self.user, 100)
+        order = self._orders(1)[0]
+        wallet.debit(self.user, 40, order=order)
+
+        order_status.transition_many([order.pk], order_status.DELIVERY, 'CANCELLED')
+        order_status.transition_many([order.pk], order_status.DELIVERY, 'CANCELLED')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, Decimal('100.00'))
+        self.assertEqual(order.wallet_entries.filter(kind='REFUND').count(), 1)
+
+
+class OrderStatusApiTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(phone_number='9000000071', username='9000000071', password='pw')
+        self.orders = Order.objects.bulk_create([
+            Order(user=self.user, total_price=10, delivery_status='PACKING') for _ in range(3)
+        ])
+
+    def test_dispatcher_moves_a_wave_out_for_delivery(self):
+        staff = User.objects.create_user(phone_number='9000000072', username='9000000072', password='pw', is_staff=True)
+        self.client.force_authenticate(staff)
+        missing = '00000000-0000-0000-0000-000000000000'
+        response = self.client.post('/api/orders/status/', {
+            'order_ids': [str(o.pk) for o in self.orders] + [missing],
+            'delivery_status': 'OUT_FOR_DELIVERY', 'driver_phone': '9999999999',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()['data']
+        self.assertEqual((body['updated'], body['not_found']), (3, [missing]))
+
+        bad = self.client.post('/api/orders/status/', {
+            'order_ids': [str(self.orders[0].pk)], 'delivery_status': 'PACKING',
+        }, format='json')
+        self.assertEqual(bad.json()['data']['rejected'][0]['status'], 'OUT_FOR_DELIVERY')
+        self.assertEqual(self.client.post('/api/orders/status/', {
+            'order_ids': ['nope'], 'delivery_status': 'DELIVERED',
+        }, format='json').status_code, 400)
+
+    def test_customers_cannot_use_it(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/orders/status/', {
+            'order_ids': [str(self.orders[0].pk)], 'delivery_status': 'DELIVERED',
+        }, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_payment_webhook_goes_through_the_state_machine(self):
+        order = self.orders[0]
+        response = self.client.post('/api/payment/webhook/', {'order_id': str(order.pk), 'payment_id': 'pay_1'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        order.refresh_from_db()
+        self.assertEqual((order.payment_status, order.transaction_id), ('COMPLETED', 'pay_1'))
+        self.assertIsNotNone(order.paid_at)
+        self.assertEqual(self.client.post('/api/payment/webhook/', {'order_id': 'bad', 'payment_id': 'pay_2'},
+                                          format='json').status_code, 404)
@@ -0,0 +1,137 @@
+import threading
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from api.models import Product, UnitOfMeasure, User, Order, OrderItem, OrderSyncOutbox
+from api.services import http_client, order_sync, pricing
+from api.services.adapters.base import BaseOrderAdapter
+from api.services.adapters.woocommerce_adapter import WooCommerceOrderAdapter
+from api.services.order_service import OrderService
+from .fake_woocommerce import FakeWooCommerce
+
+
+class RecordingAdapter(BaseOrderAdapter):
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.synced = []
+        self.threads = set()
+
+    def sync_order(self, order):
+        self.threads.add(threading.get_ident())
+        if self.fail:
+            raise RuntimeError('WooCommerce is down')
+        self.synced.append(order.id)
+        return 'wc-1'
+
+    def update_item_weight(self, order, product, actual_weight):
+        return True
+
+
+class OrderOutboxTests(TestCase):
+    def setUp(self):
+        pricing.reset()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.product = Product.objects.create(
+            slug='tomato', name='Tomato', base_price=10, pricing_unit=uom,
+            weight_value=1, weight_unit=uom, external_id='101',
+        )
+        self.user = User.objects.create_user(
+            phone_number='9000000002', username='9000000002', password='pw', is_phone_verified=True,
+        )
+
+    def _place(self, adapter):
+        order, error = OrderService(adapter=adapter).place_order(self.user, {
+            'payment_method': 'COD', 'total_price': 10,
+            'items': [{'product_id': '101', 'quantity': 1, 'price': 10}],
+        })
+        self.assertIsNone(error)
+        return order
+
+    def test_checkout_queues_instead_of_calling_the_adapter(self):
+        adapter = RecordingAdapter()
+        order = self._place(adapter)
+        self.assertEqual(adapter.synced, [])
+        self.assertEqual(OrderSyncOutbox.objects.get().order, order)
+
+        self.assertEqual(order_sync.run_once(adapter=adapter), (1, 1, 0))
+        self.assertEqual(adapter.synced, [order.id])
+        self.assertEqual(OrderSyncOutbox.objects.get().status, 'DONE')
+        self.assertEqual(order_sync.run_once(adapter=adapter), (0, 0, 0))
+
+    def test_local_backend_queues_nothing(self):
+        from api.services.adapters.local_adapter import LocalOrderAdapter
+        self._place(LocalOrderAdapter())
+        self.assertFalse(OrderSyncOutbox.objects.exists())
+
+    def test_failures_back_off_then_give_up(self):
+        self._place(RecordingAdapter())
+        failing = RecordingAdapter(fail=True)
+        with override_settings(ORDER_SYNC={'MAX_ATTEMPTS': 2, 'BACKOFF': 60}):
+            self.assertEqual(order_sync.run_once(adapter=failing), (1, 0, 1))
+            entry = OrderSyncOutbox.objects.get()
+            self.assertEqual((entry.status, entry.attempts), ('PENDING', 1))
+            self.assertGreater(entry.next_attempt_at, timezone.now() + timedelta(seconds=25))
+            self.assertIn('WooCommerce is down', entry.last_error)
+
+            # Not due yet
+            self.assertEqual(order_sync.run_once(adapter=failing), (0, 0, 0))
+            OrderSyncOutbox.objects.update(next_attempt_at=timezone.now())
+            order_sync.run_once(adapter=failing)
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), ('FAILED', 2))
+
+    def test_claimed_rows_are_invisible_until_the_lease_expires(self):
+        self._place(RecordingAdapter())
+        self.assertEqual(len(order_sync.claim_batch()), 1)
+        self.assertEqual(order_sync.claim_batch(), [])
+
+        # The first worker died: its lease runs out and the row is reclaimed
+        OrderSyncOutbox.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(order_sync.run_once(adapter=RecordingAdapter()), (1, 1, 0))
+
+    def test_batches_are_pushed_in_parallel_and_backlog_is_reported(self):
+        adapter = RecordingAdapter()
+        for _ in range(6):
+            self._place(adapter)
+        self.assertEqual(order_sync.backlog()['pending'], 6)
+
+        claimed, done, _ = order_sync.run_once(limit=6, adapter=adapter, workers=3)
+        self.assertEqual((claimed, done), (6, 6))
+        self.assertGreater(len(adapter.threads), 1)
+        backlog = order_sync.backlog()
+        self.assertEqual((backlog['pending'], backlog['done']), (0, 6))
+        self.assertEqual(backlog['oldest_pending_age_s'], 0.0)
+
+
+class WooCommerceSyncOrderTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeWooCommerce()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        http_client.reset_client()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        product = Product.objects.create(
+            slug='tomato', name='Tomato', base_price=10, pricing_unit=uom,
+            weight_value=1, weight_unit=uom, external_id='101',
+        )
+        user = User.objects.create_user(phone_number='9000000003', username='9000000003', password='pw')
+        self.order = Order.objects.create(user=user, total_price=10)
+        OrderItem.objects.create(order=self.order, product=product, quantity=1, price_at_purchase=10)
+
+    def test_failure_raises_and_success_is_not_repeated(self):
+        self.server.routes[('POST', '/orders')] = lambda query, body: (500, {'code': 'oops'})
+        with override_settings(WC_API_URL=self.server.url):
+            with self.assertRaises(RuntimeError):
+                WooCommerceOrderAdapter().sync_order(self.order)
+
+            self.server.routes[('POST', '/orders')] = lambda query, body: (201, {'id': 77})
+            self.assertEqual(WooCommerceOrderAdapter().sync_order(self.order), '77')
+            self.assertEqual(WooCommerceOrderAdapter().sync_order(self.order), '77')
+        self.assertEqual(self.server.count('POST', '/orders'), 2)
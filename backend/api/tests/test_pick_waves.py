@@ -0,0 +1,109 @@
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from io import StringIO
+from rest_framework.test import APITestCase
+from api.models import Category, Product, UnitOfMeasure, User, Order, OrderItem
+from api.services import pick_waves
+
+
+class PickWaveTests(APITestCase):
+    def setUp(self):
+        kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        greens = Category.objects.create(name='Leafy Greens', slug='leafy-greens')
+        roots = Category.objects.create(name='Roots', slug='roots')
+        self.spinach, self.potato, self.onion, self.loose = [
+            Product.objects.create(slug=slug, name=name, base_price=10, pricing_unit=kg,
+                                   weight_value=1, weight_unit=kg, category=category)
+            for slug, name, category in (
+                ('spinach', 'Spinach', greens), ('potato', 'Potato', roots),
+                ('onion', 'Onion', roots), ('loose', 'Loose Item', None),
+            )
+        ]
+        self.picker = User.objects.create_user(phone_number='9000000060', username='9000000060',
+                                               password='pw', is_staff=True)
+        self.now = timezone.now()
+
+    def _order(self, lines, status='PENDING', age_hours=1):
+        order = Order.objects.create(user=self.picker, total_price=10, delivery_status=status)
+        Order.objects.filter(pk=order.pk).update(created_at=self.now - timedelta(hours=age_hours))
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=qty, price_at_purchase=10)
+            for product, qty in lines
+        ])
+        return order
+
+    def test_quantities_are_summed_per_product_and_grouped_by_aisle(self):
+        first = self._order([(self.potato, 2), (self.spinach, 1)], age_hours=3)
+        second = self._order([(self.potato, 1), (self.onion, 4), (self.loose, 1)], status='PACKING', age_hours=2)
+        self._order([(self.potato, 9)], status='DELIVERED')
+        self._order([(self.potato, 9)], age_hours=-1)  # after the cut-off
+
+        with self.assertNumQueries(4):  # savepoint, pick list, put wall, release
+            wave = pick_waves.plan_wave(cutoff=self.now)
+
+        self.assertEqual((wave['order_count'], wave['line_count'], wave['total_quantity']), (2, 5, 9))
+        self.assertEqual([a['aisle'] for a in wave['aisles']], ['Unassigned', 'Leafy Greens', 'Roots'])
+        roots = wave['aisles'][2]
+        self.assertEqual([(p['name'], p['total_quantity'], p['order_count']) for p in roots['products']],
+                         [('Onion', 4, 1), ('Potato', 3, 2)])
+        self.assertEqual(roots['total_quantity'], 7)
+
+        self.assertEqual([(s['slot'], s['order_id']) for s in wave['put_wall']], [(1, first.id), (2, second.id)])
+        self.assertEqual(len(wave['put_wall'][1]['items']), 3)
+
+    def test_claiming_moves_pending_orders_to_packing(self):
+        pending = self._order([(self.potato, 1)])
+        packing = self._order([(self.onion, 1)], status='PACKING')
+        wave = pick_waves.plan_wave(claim=True)
+        self.assertEqual(wave['claimed'], 1)
+        pending.refresh_from_db()
+        packing.refresh_from_db()
+        self.assertEqual((pending.delivery_status, packing.delivery_status), ('PACKING', 'PACKING'))
+
+    def test_claimed_orders_are_not_picked_again(self):
+        pending = self._order([(self.potato, 1)], age_hours=3)
+        packing = self._order([(self.onion, 1)], status='PACKING', age_hours=2)
+        first = pick_waves.plan_wave(cutoff=self.now, claim=True)
+        self.assertEqual([s['order_id'] for s in first['put_wall']], [pending.id, packing.id])
+
+        later = self._order([(self.spinach, 1)], age_hours=0)
+        second = pick_waves.plan_wave(cutoff=self.now + timedelta(minutes=1), claim=True)
+        self.assertEqual([s['order_id'] for s in second['put_wall']], [later.id])
+        self.assertEqual(second['claimed'], 1)
+
+        third = pick_waves.plan_wave(cutoff=self.now + timedelta(minutes=1), claim=True)
+        self.assertEqual((third['order_count'], third['put_wall'], third['claimed']), (0, [], 0))
+        self.assertEqual(pick_waves.plan_wave(cutoff=self.now + timedelta(minutes=1))['order_count'], 0)
+
+    def test_since_narrows_the_window(self):
+        self._order([(self.potato, 1)], age_hours=10)
+        recent = self._order([(self.onion, 1)], age_hours=1)
+        wave = pick_waves.plan_wave(since=self.now - timedelta(hours=5))
+        self.assertEqual([s['order_id'] for s in wave['put_wall']], [recent.id])
+
+    def test_api_previews_and_claims(self):
+        order = self._order([(self.potato, 2)])
+        self.client.force_authenticate(self.picker)
+
+        response = self.client.get('/api/picker/waves/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['order_count'], 1)
+        order.refresh_from_db()
+        self.assertEqual(order.delivery_status, 'PENDING')
+
+        response = self.client.post('/api/picker/waves/')
+        self.assertEqual(response.json()['claimed'], 1)
+        self.assertEqual(self.client.get('/api/picker/waves/', {'cutoff': 'yesterday'}).status_code, 400)
+
+    def test_api_is_staff_only(self):
+        customer = User.objects.create_user(phone_number='9000000061', username='9000000061', password='pw')
+        self.client.force_authenticate(customer)
+        self.assertEqual(self.client.get('/api/picker/waves/').status_code, 403)
+
+    def test_command_prints_the_pick_list(self):
+        self._order([(self.potato, 2), (self.spinach, 1)])
+        out = StringIO()
+        call_command('plan_pick_wave', stdout=out)
+        self.assertIn('1 orders, 2 lines, 3 units', out.getvalue())
+        self.assertIn('== Roots (2 units)', out.getvalue())
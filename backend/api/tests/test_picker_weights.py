@@ -0,0 +1,117 @@
+from decimal import Decimal
+from unittest import mock
+import requests
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from api.models import Product, UnitOfMeasure, User, Order, OrderItem
+from api.services import http_client
+from api.services.adapters.woocommerce_adapter import WooCommerceOrderAdapter
+from api.services.order_service import OrderService
+from .fake_woocommerce import FakeWooCommerce
+
+
+def make_order(user):
+    uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+    products = [
+        Product.objects.create(slug=f'veg-{i}', name=f'Veg {i}', base_price=10, pricing_unit=uom,
+                               weight_value=1, weight_unit=uom, external_id=str(101 + i))
+        for i in range(3)
+    ]
+    order = Order.objects.create(user=user, total_price=30)
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product=product, quantity=1, price_at_purchase=10) for product in products
+    ])
+    return order, products
+
+
+class LocalPickerWeightTests(APITestCase):
+    def setUp(self):
+        picker = User.objects.create_user(phone_number='9000000050', username='9000000050', password='pw', is_staff=True)
+        self.client.force_authenticate(picker)
+        self.order, self.products = make_order(picker)
+
+    def test_batch_weights_are_persisted(self):
+        response = self.client.put(f'/api/picker/orders/{self.order.id}/weights/', {'items': [
+            {'product_id': '101', 'weight': '0.95'},
+            {'product_id': str(self.products[1].id), 'weight': 1.2},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        weights = dict(self.order.items.values_list('product__external_id', 'actual_weight'))
+        self.assertEqual(weights, {'101': Decimal('0.950'), '102': Decimal('1.200'), '103': None})
+
+    def test_single_update_persists_too(self):
+        response = self.client.patch(f'/api/picker/orders/{self.order.id}/update/',
+                                     {'product_id': '103', 'weight': '2.5'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.order.items.get(product__external_id='103').actual_weight, Decimal('2.500'))
+
+    def test_unknown_item_or_bad_weight_changes_nothing(self):
+        for items in ([{'product_id': '101', 'weight': 1}, {'product_id': '999', 'weight': 1}],
+                      [{'product_id': '101', 'weight': '-1'}]):
+            response = self.client.put(f'/api/picker/orders/{self.order.id}/weights/', {'items': items}, format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.order.items.filter(actual_weight__isnull=False).exists())
+
+
+class WooCommercePickerWeightTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeWooCommerce()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        http_client.reset_client()
+        self.server.calls.clear()
+        user = User.objects.create_user(phone_number='9000000051', username='9000000051', password='pw')
+        self.order, self.products = make_order(user)
+        line_items = [{'id': 900 + i, 'product_id': 101 + i} for i in range(3)]
+        self.server.routes[('POST', '/orders')] = lambda query, body: (201, {'id': 77, 'line_items': line_items})
+        self.server.routes[('GET', '/orders/77')] = {'id': 77, 'line_items': line_items}
+        self.server.routes[('PUT', '/orders/77')] = {'id': 77}
+
+    def _weigh(self):
+        service = OrderService(adapter=WooCommerceOrderAdapter())
+        return service.update_item_weights(self.order.id, [
+            {'product_id': '101', 'weight': '1.05'}, {'product_id': '102', 'weight': '0.5'},
+        ])
+
+    def test_sync_stores_line_item_ids_so_weighing_is_one_put(self):
+        self.order.items.filter(product__external_id='102').update(quantity=Decimal('1.5'))
+        with override_settings(WC_API_URL=self.server.url):
+            WooCommerceOrderAdapter().sync_order(self.order)
+            post_body = [body for method, _, _, body in self.server.calls if method == 'POST'][0]
+            self.assertEqual(sorted(line['quantity'] for line in post_body['line_items']), [1, 1, 1.5])
+            self.assertEqual(
+                sorted(self.order.items.values_list('external_line_item_id', flat=True)), ['900', '901', '902']
+            )
+            self.assertEqual(self._weigh(), (True, '2 weight(s) updated'))
+
+        self.assertEqual(self.server.count('GET', '/orders/77'), 0)
+        self.assertEqual(self.server.count('PUT', '/orders/77'), 1)
+        put_body = [body for method, _, _, body in self.server.calls if method == 'PUT'][0]
+        self.assertEqual([line['id'] for line in put_body['line_items']], [900, 901])
+        self.assertEqual(put_body['line_items'][0]['meta_data'][0]['value'], '1.050 kg')
+        self.assertEqual(self.order.items.get(product__external_id='101').actual_weight, Decimal('1.050'))
+
+    def test_calls_use_the_client_timeouts(self):
+        with mock.patch.object(requests.Session, 'request', autospec=True,
+                               side_effect=requests.Session.request) as request:
+            with override_settings(WC_API_URL=self.server.url):
+                WooCommerceOrderAdapter().sync_order(self.order)
+                self.assertTrue(self._weigh()[0])
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual({call.kwargs['timeout'] for call in request.call_args_list},
+                         {http_client.get_client().timeout})
+
+    def test_orders_synced_before_ids_were_kept_cost_one_lookup(self):
+        Order.objects.filter(pk=self.order.pk).update(external_order_id='77')
+        with override_settings(WC_API_URL=self.server.url):
+            self.assertTrue(self._weigh()[0])
+            self.assertTrue(self._weigh()[0])
+        self.assertEqual(self.server.count('GET', '/orders/77'), 1)
+        self.assertEqual(self.server.count('PUT', '/orders/77'), 2)
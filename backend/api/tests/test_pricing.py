@@ -0,0 +1,137 @@
+from decimal import Decimal
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from api.models import Product, UnitOfMeasure, User, Coupon
+from api.services import coupons, pricing
+
+
+class PricingEngineTests(TestCase):
+    def setUp(self):
+        pricing.reset()
+        self.kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.pc = UnitOfMeasure.objects.create(name='Piece', symbol='pc')
+        self.products = [
+            Product.objects.create(
+                slug=f'veg-{i}', name=f'Veg {i}', base_price=Decimal('12.50'),
+                discounted_price=Decimal('9.99') if i % 2 else None,
+                pricing_unit=self.pc if i % 3 == 0 else self.kg,
+                weight_value=1, weight_unit=self.kg, external_id=str(900 + i),
+            )
+            for i in range(100)
+        ]
+
+    def test_hundred_line_basket_prices_without_queries(self):
+        pricing.get_table()
+        items = [{'product_id': p.external_id, 'quantity': 2} for p in self.products]
+        with self.assertNumQueries(0):
+            quote = pricing.quote(items)
+        self.assertEqual(len(quote.lines), 100)
+        self.assertEqual(quote.subtotal, Decimal('2249.00'))  # 50 x 25.00 + 50 x 19.98
+
+    def test_unit_rules_and_rounding(self):
+        line = pricing.price_line(self.products[1].id, '0.333')   # kg, discounted
+        self.assertEqual((line.unit_price, line.total), (Decimal('9.99'), Decimal('3.33')))
+        with self.assertRaisesMessage(pricing.PricingError, 'fractional'):
+            pricing.price_line(self.products[0].id, 1.5)           # sold per piece
+        with self.assertRaises(pricing.PricingError):
+            pricing.price_line(self.products[1].id, 0)
+
+    def test_saves_update_the_table_in_place(self):
+        table = pricing.get_table()
+        product = self.products[2]
+        with self.captureOnCommitCallbacks(execute=True):
+            product.discounted_price = Decimal('1.10')
+            product.save()
+        with self.assertNumQueries(0):
+            self.assertIs(pricing.get_table(), table)
+            self.assertEqual(pricing.price_line(product.external_id, 1).unit_price, Decimal('1.10'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.is_active = False
+            product.save()
+        with self.assertRaises(pricing.PricingError) as ctx:
+            pricing.quote([{'product_id': product.external_id}, {'product_id': 'gone'}])
+        self.assertEqual(ctx.exception.unresolved, [product.external_id, 'gone'])
+
+    def test_rolled_back_save_leaves_the_table_alone(self):
+        table = pricing.get_table()
+        version = table.version
+        product = self.products[2]
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                product.discounted_price = Decimal('1.10')
+                product.save()
+                raise RuntimeError
+        self.assertEqual(pricing.get_table().version, version)
+        self.assertEqual(pricing.price_line(product.external_id, 1).unit_price, Decimal('12.50'))
+
+    @override_settings(LOCAL_CACHE_MAX_AGE=60)
+    def test_table_is_rebuilt_once_too_old(self):
+        # Another process changed the price; its version bump never reached this one
+        table = pricing.get_table()
+        Product.objects.filter(pk=self.products[2].pk).update(base_price=Decimal('3.00'))
+        self.assertEqual(pricing.price_line(self.products[2].id, 1).unit_price, Decimal('12.50'))
+        table.built_at -= 61
+        self.assertEqual(pricing.price_line(self.products[2].id, 1).unit_price, Decimal('3.00'))
+
+    def test_coupon_discount_is_capped_at_subtotal(self):
+        coupon = Coupon(code='HUGE', discount_amount=500, min_order_value=0)
+        quote = pricing.quote([{'product_id': '900', 'quantity': 1}], coupon=coupon)
+        self.assertEqual((quote.discount, quote.total), (Decimal('12.50'), Decimal('0.00')))
+
+
+class PricingEndpointTests(APITestCase):
+    def setUp(self):
+        pricing.reset()
+        coupons.reset()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.pc = UnitOfMeasure.objects.create(name='Piece', symbol='pc')
+        self.product = Product.objects.create(
+            slug='okra', name='Okra', base_price=40, pricing_unit=uom, weight_value=1, weight_unit=uom,
+        )
+        user = User.objects.create_user(phone_number='9000000009', username='9000000009', password='pw')
+        self.client.force_authenticate(user=user)
+
+    def test_cart_add_prices_the_line(self):
+        url = reverse('cart-add')
+        resp = self.client.post(url, {'product_id': str(self.product.id), 'quantity': 1.5}, format='json')
+        self.assertEqual(resp.json()['data']['line_total'], 60.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lemon = Product.objects.create(
+                slug='lemon', name='Lemon', base_price=5, pricing_unit=self.pc,
+                weight_value=1, weight_unit=self.pc,
+            )
+        resp = self.client.post(url, {'product_id': str(lemon.id), 'quantity': 0.5}, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('fractional', str(resp.json()))
+
+    def test_coupon_preview_prices_items_server_side(self):
+        product = self.product
+        Coupon.objects.create(code='FLAT20', discount_amount=20, min_order_value=100)
+        url = reverse('apply-coupon')
+
+        resp = self.client.post(url, {
+            'code': 'FLAT20', 'order_total': 5000,
+            'items': [{'product_id': str(product.id), 'quantity': 2}],
+        }, format='json')
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn('Minimum order value', str(resp.json()))
+
+        resp = self.client.post(url, {
+            'code': 'FLAT20', 'items': [{'product_id': str(product.id), 'quantity': 3}],
+        }, format='json')
+        self.assertEqual(resp.json()['data']['discount_amount'], 20.0)
+        self.assertEqual(resp.json()['data']['order_total'], 120.0)
+
+    def test_malformed_items_are_a_bad_request(self):
+        Coupon.objects.create(code='FLAT20', discount_amount=20)
+        for items in ('okra', 7, [str(self.product.id)], [{'product_id': str(self.product.id)}, None]):
+            resp = self.client.post(reverse('apply-coupon'), {'code': 'FLAT20', 'items': items}, format='json')
+            self.assertEqual(resp.status_code, 400, items)
+            self.assertIn('items must be a list', str(resp.json()))
+            resp = self.client.post(reverse('place-order'), {'payment_method': 'WALLET', 'items': items}, format='json')
+            self.assertEqual(resp.status_code, 400, items)
+            self.assertIn('items must be a list', str(resp.json()))
@@ -0,0 +1,89 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.models import Product, UnitOfMeasure
+from api.serializers import ProductSerializer
+from api.services import http_client
+from api.services.adapters.woocommerce_adapter import WooCommerceProductAdapter
+from .fake_woocommerce import FakeWooCommerce
+
+
+class ProductBatchTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.tomato, self.onion, self.okra = [
+            Product.objects.create(
+                slug=slug, name=slug.title(), base_price=10, pricing_unit=uom,
+                weight_value=1, weight_unit=uom, external_id=external_id,
+            )
+            for slug, external_id in (('tomato', '101'), ('onion', '102'), ('okra', None))
+        ]
+        self.url = reverse('product-batch-v2')
+
+    def test_mixed_identifiers_resolve_in_request_order_in_one_query(self):
+        ids = ['okra', str(self.tomato.id).upper(), 'no-such-product', '102']
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.url, {'ids': ','.join(ids)})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        data = resp.json()['data']
+        self.assertEqual(
+            [p['slug'] for p in data['results']], ['okra', 'tomato', 'onion']
+        )
+        self.assertEqual(data['missing'], ['no-such-product'])
+        self.assertEqual(data['results'][1], ProductSerializer(self.tomato).data)
+
+    def test_repeated_and_duplicate_ids(self):
+        resp = self.client.get(self.url + '?ids=onion&ids=onion,tomato')
+        data = resp.json()['data']
+        self.assertEqual([p['slug'] for p in data['results']], ['onion', 'tomato'])
+        self.assertEqual(data['missing'], [])
+
+    def test_ids_are_required_and_bounded(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        with override_settings(PRODUCT_BATCH_MAX_IDS=2):
+            resp = self.client.get(self.url, {'ids': 'a,b,c'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_route_does_not_shadow_detail(self):
+        resp = self.client.get(reverse('product-detail-v2', args=['tomato']))
+        self.assertEqual(resp.json()['data']['slug'], 'tomato')
+
+
+class WooCommerceBatchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeWooCommerce()
+        cls.server.routes[('GET', '/products')] = lambda query, body: (200, [
+            {'id': int(pk), 'slug': f'wc-{pk}'}
+            for pk in query.get('include', '').split(',') if pk in ('101', '102')
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        http_client.reset_client()
+        self.server.calls.clear()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        Product.objects.create(
+            slug='tomato', name='Tomato', base_price=10, pricing_unit=uom,
+            weight_value=1, weight_unit=uom, external_id='101',
+            external_source='woocommerce',
+        )
+
+    def test_single_include_call(self):
+        with override_settings(WC_API_URL=self.server.url):
+            found = WooCommerceProductAdapter().get_products(['tomato', '102', '999', 'unknown'])
+        self.assertEqual(found, {'tomato': {'id': 101, 'slug': 'wc-101'}, '102': {'id': 102, 'slug': 'wc-102'}})
+        self.assertEqual(self.server.count('GET', '/products'), 1)
+        self.assertEqual(self.server.calls[0][2]['include'], '101,102,999')
@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+from api.models import Product, UnitOfMeasure, Category
+from api.services.pagination import encode_cursor
+
+
+class ProductPaginationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        greens = Category.objects.create(name='Greens', slug='greens')
+        fruits = Category.objects.create(name='Fruits', slug='fruits')
+        for i in range(7):
+            for category in (greens, fruits, None):
+                slug = f"item-{i}-{category.slug if category else 'none'}"
+                Product.objects.create(
+                    slug=slug, name=f"Item {i % 3}", base_price=10,
+                    category=category, pricing_unit=uom,
+                    weight_value=1, weight_unit=uom,
+                )
+        self.url = reverse('product-list-v2')
+
+    def _walk(self, **params):
+        seen, cursor = [], ''
+        while cursor is not None:
+            resp = self.client.get(self.url, {**params, 'cursor': cursor})
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            data = resp.json()['data']
+            seen.extend(p['id'] for p in data['results'])
+            cursor = data['next_cursor']
+        return seen
+
+    def test_cursor_walk_matches_page_walk(self):
+        by_cursor = self._walk(per_page=4)
+        by_page = []
+        for page in range(1, 7):
+            resp = self.client.get(self.url, {'page': page, 'per_page': 4})
+            by_page.extend(p['id'] for p in resp.json()['data'])
+        self.assertEqual(len(by_cursor), 21)
+        self.assertEqual(len(set(by_cursor)), 21)
+        self.assertEqual(by_cursor, by_page)
+
+    def test_cursor_walk_with_category_filter(self):
+        self.assertEqual(len(self._walk(per_page=2, category='fruits')), 7)
+
+    def test_deep_pages_do_not_use_offset(self):
+        first = self.client.get(self.url, {'cursor': '', 'per_page': 5}).json()['data']
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {'cursor': first['next_cursor'], 'per_page': 5})
+        self.assertTrue(ctx.captured_queries)
+        for query in ctx.captured_queries:
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+    @override_settings(PRODUCT_LIST_MAX_PAGE_SIZE=5)
+    def test_per_page_is_capped(self):
+        data = self.client.get(self.url, {'per_page': 1000}).json()['data']
+        self.assertEqual(len(data), 5)
+        data = self.client.get(self.url, {'cursor': '', 'per_page': 1000}).json()['data']
+        self.assertEqual(len(data['results']), 5)
+
+    def test_invalid_cursor_is_rejected(self):
+        resp = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        product_id = Product.objects.first().id.hex
+        for values in (['greens', 'Item 0', product_id], [True, 'Item 0', product_id], [1, 5, product_id]):
+            resp = self.client.get(self.url, {'cursor': encode_cursor(values)})
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, values)
+
+    def test_uncategorised_products_come_last(self):
+        seen = self._walk(per_page=4)
+        uncategorised = {str(pk) for pk in Product.objects.filter(category__isnull=True).values_list('id', flat=True)}
+        self.assertEqual(set(seen[-7:]), uncategorised)
@@ -0,0 +1,55 @@
+import datetime
+import uuid
+from decimal import Decimal
+from unittest import skipIf
+from django.test import SimpleTestCase, override_settings
+from rest_framework.response import Response
+from api import renderers
+from api.renderers import StandardResponseRenderer
+
+
+@skipIf(renderers.orjson is None, 'orjson not installed')
+class FastRendererParityTests(SimpleTestCase):
+    """The orjson path must produce exactly the bytes of the stdlib path."""
+
+    payload = [{
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'price': Decimal('12.50'),
+        'created_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=datetime.timezone.utc),
+        'day': datetime.date(2026, 1, 2),
+        'name': 'पालक “spinach” ',
+        'nested': {1: None, 'ok': True},
+    }]
+
+    def render_both(self, data, status_code=200, context=True):
+        context = {'response': Response(status=status_code)} if context else None
+        fast = StandardResponseRenderer().render(data, 'application/json', context)
+        with override_settings(FAST_JSON_RENDERER=False):
+            slow = StandardResponseRenderer().render(data, 'application/json', context)
+        return fast, slow
+
+    def test_success_envelope(self):
+        fast, slow = self.render_both(self.payload)
+        self.assertEqual(fast, slow)
+
+    def test_validation_error_envelope(self):
+        fast, slow = self.render_both({'quantity': ['Not allowed']}, status_code=400)
+        self.assertEqual(fast, slow)
+
+    def test_request_failed_envelope(self):
+        fast, slow = self.render_both({'error': 'Product not found'}, status_code=404)
+        self.assertEqual(fast, slow)
+
+    def test_pre_enveloped_payload(self):
+        fast, slow = self.render_both({'success': False, 'user_msg': 'Insufficient Wallet Balance'})
+        self.assertEqual(fast, slow)
+
+    def test_without_renderer_context(self):
+        fast, slow = self.render_both(self.payload, context=False)
+        self.assertEqual(fast, slow)
+
+    def test_indent_uses_stdlib_path(self):
+        rendered = StandardResponseRenderer().render(
+            [1], 'application/json; indent=2', {'response': Response()}
+        )
+        self.assertIn(b'\n  "success": true', rendered)
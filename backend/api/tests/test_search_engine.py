@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from api.models import Product, UnitOfMeasure, Category
+from api.services import search_engine
+from api.services.search_engine import SearchIndex
+
+
+class SearchIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = SearchIndex(aliases={'palak': ['spinach']})
+        self.index.build([
+            {'id': 'tomato', 'name': 'Desi Tomato', 'description': '<p>Juicy red tomatoes</p>',
+             'category': 'Vegetables', 'category_slug': 'vegetables'},
+            {'id': 'spinach', 'name': 'Spinach', 'description': 'Leafy and fresh',
+             'category': 'Leafy Greens', 'category_slug': 'greens'},
+            {'id': 'soup', 'name': 'Soup Mix', 'description': 'Tomato and spinach blend',
+             'category': 'Staples', 'category_slug': 'staples'},
+        ])
+
+    def test_exact_match_ranks_name_above_description(self):
+        self.assertEqual(self.index.search('tomato'), ['tomato', 'soup'])
+
+    def test_prefix_match(self):
+        self.assertEqual(self.index.search('spin'), ['spinach', 'soup'])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.index.search('tomoto')[0], 'tomato')
+
+    def test_alias(self):
+        self.assertEqual(self.index.search('palak')[0], 'spinach')
+
+    def test_all_terms_must_match_and_category_filter(self):
+        self.assertEqual(self.index.search('tomato spinach'), ['soup'])
+        self.assertEqual(self.index.search('tomato', category_slug='vegetables'), ['tomato'])
+
+    def test_remove(self):
+        self.index.remove('tomato')
+        self.assertEqual(self.index.search('tomato'), ['soup'])
+
+
+class ProductSearchAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        search_engine.reset()
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        veg = Category.objects.create(name='Vegetables', slug='vegetables')
+        self.tomato = Product.objects.create(
+            slug='tomato', name='Desi Tomato', base_price=35, category=veg,
+            pricing_unit=uom, weight_value=1, weight_unit=uom,
+        )
+        Product.objects.create(
+            slug='spinach', name='Spinach', description='Fresh palak leaves', base_price=30,
+            category=veg, pricing_unit=uom, weight_value=1, weight_unit=uom,
+        )
+        self.url = reverse('product-list-v2')
+
+    def _names(self, query):
+        return [p['name'] for p in self.client.get(self.url, {'search': query}).json()['data']]
+
+    def test_search_uses_index(self):
+        self.assertEqual(self._names('tomoto'), ['Desi Tomato'])
+        self.assertEqual(self._names('palak'), ['Spinach'])
+
+    def test_product_save_updates_index_incrementally(self):
+        index = search_engine.get_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tomato.name = 'Cherry Tomato'
+            self.tomato.save()
+        self.assertIs(search_engine.get_index(), index)
+        self.assertEqual(index.version, search_engine.catalog_cache.get_version())
+        self.assertEqual(self._names('cherry'), ['Cherry Tomato'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tomato.is_active = False
+            self.tomato.save()
+        self.assertEqual(self._names('tomato'), [])
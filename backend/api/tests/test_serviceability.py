@@ -0,0 +1,102 @@
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+from api.models import DeliveryZone, Product, UnitOfMeasure, User
+from api.services import pricing, serviceability
+from api.services.order_service import OrderService
+
+
+class ServiceabilityMapTests(TestCase):
+    def setUp(self):
+        serviceability.reset()
+        DeliveryZone.objects.create(zip_code='226001', city='Lucknow', delivery_time_hrs=6)
+        DeliveryZone.objects.create(zip_code='2260xx', city='Lucknow', delivery_time_hrs=12)
+        DeliveryZone.objects.create(zip_code='22601*', city='Lucknow Cantt', delivery_time_hrs=8)
+        DeliveryZone.objects.create(zip_code='226099', city='Lucknow', delivery_time_hrs=12, is_serviceable=False)
+
+    def _hours(self, zip_code):
+        zone = serviceability.check(zip_code)
+        return zone.delivery_time_hrs if zone else None
+
+    def test_exact_rows_win_then_the_longest_prefix(self):
+        self.assertEqual(self._hours('226001'), 6)
+        self.assertEqual(self._hours(' 226005 '), 12)
+        self.assertEqual(self._hours('226012'), 8)
+        self.assertIsNone(self._hours('226099'))  # carved out of 2260xx
+        self.assertIsNone(self._hours('208001'))
+        self.assertIsNone(self._hours(''))
+        self.assertIsNone(self._hours(None))
+
+    def test_warm_lookups_need_no_queries_and_changes_reload(self):
+        serviceability.check('226001')
+        with self.assertNumQueries(0):
+            results = serviceability.check_many(['226001', '226050', '110001', '226001'])
+        self.assertEqual([z.city if z else None for z in results.values()], ['Lucknow', 'Lucknow', None])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DeliveryZone.objects.create(zip_code='1100xx', city='Delhi', delivery_time_hrs=48)
+        self.assertEqual(self._hours('110001'), 48)
+        with self.captureOnCommitCallbacks(execute=True):
+            DeliveryZone.objects.filter(zip_code='2260xx').get().delete()
+        self.assertIsNone(self._hours('226050'))
+
+    def test_rolled_back_changes_leave_it_alone(self):
+        version = serviceability.get_map().version
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                DeliveryZone.objects.filter(zip_code='2260xx').get().delete()
+                raise RuntimeError
+        self.assertEqual(serviceability.get_map().version, version)
+        self.assertEqual(self._hours('226050'), 12)
+
+    @override_settings(LOCAL_CACHE_MAX_AGE=60)
+    def test_map_is_rebuilt_once_too_old(self):
+        # Another process added the zone; its version bump never reached this one
+        zones = serviceability.get_map()
+        DeliveryZone.objects.bulk_create([DeliveryZone(zip_code='1100xx', city='Delhi', delivery_time_hrs=48)])
+        self.assertIsNone(self._hours('110001'))
+        zones.built_at -= 61
+        self.assertEqual(self._hours('110001'), 48)
+
+
+class CheckDeliveryApiTests(APITestCase):
+    def setUp(self):
+        serviceability.reset()
+        DeliveryZone.objects.create(zip_code='2080xx', city='Kanpur', delivery_time_hrs=24)
+
+    def test_single_and_bulk(self):
+        response = self.client.post('/api/check-delivery/', {'zip_code': '208016'}, format='json')
+        self.assertEqual(response.json()['data'], {'available': True, 'city': 'Kanpur', 'delivery_time_hrs': 24})
+
+        response = self.client.post('/api/check-delivery/bulk/', {'zip_codes': ['208001', '560001']}, format='json')
+        self.assertEqual(
+            [(r['zip_code'], r['available']) for r in response.json()['data']['results']],
+            [('208001', True), ('560001', False)],
+        )
+        self.assertEqual(self.client.post('/api/check-delivery/bulk/', {'zip_codes': '208001'},
+                                          format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/check-delivery/bulk/', {'zip_codes': ['208001'] * 51},
+                                          format='json').status_code, 400)
+
+
+class OrderZoneTests(TestCase):
+    def test_place_order_sets_the_zone_from_the_map(self):
+        pricing.reset()
+        serviceability.reset()
+        zone = DeliveryZone.objects.create(zip_code='2080xx', city='Kanpur', delivery_time_hrs=24)
+        kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        product = Product.objects.create(slug='okra', name='Okra', base_price=10, pricing_unit=kg,
+                                         weight_value=1, weight_unit=kg)
+        user = User.objects.create_user(phone_number='9000000150', username='9000000150', password='pw',
+                                        is_phone_verified=True)
+        pricing.get_table()
+        serviceability.check('208001')
+
+        with self.assertNumQueries(4):  # savepoint, order, items, release
+            order, error = OrderService().place_order(user, {
+                'payment_method': 'COD', 'delivery_zip_code': '208002',
+                'items': [{'product_id': str(product.pk), 'quantity': 1}],
+            })
+        self.assertIsNone(error)
+        order.refresh_from_db()
+        self.assertEqual(order.delivery_zone_id, zone.pk)
@@ -0,0 +1,94 @@
+import threading
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIRequestFactory
+from api.services import http_client
+from api.services.single_flight import SingleFlight
+from api.views import ProductProxyView, proxy_flight
+from .fake_woocommerce import FakeWooCommerce
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_errors_reach_every_waiter_and_are_not_cached(self):
+        flight = SingleFlight(ttl=60)
+        release = threading.Event()
+
+        def fail():
+            release.wait(2)
+            raise RuntimeError('upstream down')
+
+        errors = []
+
+        def call():
+            try:
+                flight.do('k', fail)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        for t in threads:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(flight.do('k', lambda: 'ok'), 'ok')
+
+    def test_cache_if_skips_unwanted_results(self):
+        flight = SingleFlight(ttl=60)
+        flight.do('k', lambda: 500, cache_if=lambda r: r < 400)
+        self.assertEqual(flight.do('k', lambda: 200, cache_if=lambda r: r < 400), 200)
+        self.assertEqual(flight.stats()['ttl_hits'], 0)
+
+
+class ProductProxyCoalescingTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeWooCommerce()
+        cls.server.routes[('GET', '/products')] = [{'id': 1, 'name': 'Tomato'}]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        http_client.reset_client()
+        proxy_flight.forget()
+        proxy_flight.reset_stats()
+        self.server.calls.clear()
+
+    def _get(self, query):
+        request = APIRequestFactory().get('/api/proxy/products/', query)
+        return ProductProxyView.as_view()(request)
+
+    def test_concurrent_identical_requests_share_one_upstream_call(self):
+        self.server.delay = 0.3
+        responses = []
+        with override_settings(WC_API_URL=self.server.url):
+            threads = [
+                threading.Thread(target=lambda: responses.append(self._get({'category': '5', 'page': '1'})))
+                for _ in range(10)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            # Same params in a different order, after the burst: served from the TTL cache
+            responses.append(self._get({'page': '1', 'category': '5'}))
+        self.server.delay = 0
+
+        self.assertEqual([r.status_code for r in responses], [200] * 11)
+        self.assertEqual(self.server.count('GET', '/products'), 1)
+        stats = proxy_flight.stats()
+        self.assertEqual(stats['upstream_calls'], 1)
+        self.assertEqual(stats['coalesced'] + stats['ttl_hits'], 10)
+
+    def test_different_params_are_fetched_separately(self):
+        with override_settings(WC_API_URL=self.server.url):
+            self._get({'page': '1'})
+            self._get({'page': '2'})
+        self.assertEqual(self.server.count('GET', '/products'), 2)
@@ -0,0 +1,195 @@
+from datetime import date, timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from api.models import Address, Order, OrderItem, Product, Subscription, UnitOfMeasure, User
+from api.services import pricing, subscriptions
+from api.services.adapters.local_adapter import LocalOrderAdapter
+
+RUN = date(2026, 3, 4)  # a Wednesday
+
+
+class CalendarTests(TestCase):
+    def test_daily_and_alternate_days(self):
+        self.assertEqual(subscriptions.next_date('DAILY', RUN), date(2026, 3, 5))
+        # Mon/Wed/Fri: Wed -> Fri -> Mon
+        self.assertEqual(subscriptions.next_date('ALTERNATE_DAYS', RUN), date(2026, 3, 6))
+        self.assertEqual(subscriptions.next_date('ALTERNATE_DAYS', date(2026, 3, 6)), date(2026, 3, 9))
+        self.assertEqual(subscriptions.next_date('ALTERNATE_DAYS', date(2026, 3, 7)), date(2026, 3, 9))
+
+    def test_weekly_keeps_the_start_weekday(self):
+        tuesday, wednesday = subscriptions.anchor('WEEKLY', date(2026, 1, 6)), subscriptions.anchor('WEEKLY', RUN)
+        self.assertEqual(subscriptions.next_date('WEEKLY', RUN, tuesday), date(2026, 3, 10))
+        self.assertEqual(subscriptions.next_date('WEEKLY', RUN, wednesday), date(2026, 3, 11))
+
+    def test_monthly_clamps_to_month_end(self):
+        day_31 = subscriptions.anchor('MONTHLY', date(2026, 1, 31))
+        self.assertEqual(subscriptions.next_date('MONTHLY', date(2026, 1, 31), day_31), date(2026, 2, 28))
+        self.assertEqual(subscriptions.next_date('MONTHLY', date(2026, 2, 28), day_31), date(2026, 3, 31))
+        self.assertEqual(subscriptions.next_date('MONTHLY', date(2026, 12, 31), day_31), date(2027, 1, 31))
+        # A run that fell behind still lands on the anchor day
+        self.assertEqual(subscriptions.next_date('MONTHLY', date(2026, 3, 10), day_31), date(2026, 3, 31))
+
+    def test_first_date_is_on_or_after(self):
+        self.assertEqual(subscriptions.first_date('ALTERNATE_DAYS', RUN, RUN), RUN)
+        self.assertEqual(subscriptions.first_date('ALTERNATE_DAYS', date(2026, 3, 5), RUN), date(2026, 3, 6))
+        self.assertEqual(subscriptions.first_date('MONTHLY', date(2026, 3, 5), date(2026, 1, 4)), date(2026, 4, 4))
+
+
+class FulfilmentTests(TestCase):
+    def setUp(self):
+        pricing.reset()
+        kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.milk, self.eggs = [
+            Product.objects.create(slug=slug, name=slug.title(), base_price=price, pricing_unit=kg,
+                                   weight_value=1, weight_unit=kg)
+            for slug, price in (('milk', 30), ('eggs', 70))
+        ]
+        self.users = [
+            User.objects.create_user(phone_number=f'900000008{i}', username=f'900000008{i}', password='pw')
+            for i in range(3)
+        ]
+        self.home, self.office = [
+            Address.objects.create(user=self.users[0], name=name, street='1 Main St', city='Kanpur',
+                                   zip_code='208001', is_default=default)
+            for name, default in (('Home', True), ('Office', False))
+        ]
+
+    def tearDown(self):
+        pricing.reset()
+
+    def _sub(self, user, product, frequency='DAILY', due=RUN, **fields):
+        return Subscription.objects.create(user=user, product=product, frequency=frequency,
+                                           start_date=fields.pop('start_date', due), next_delivery_date=due,
+                                           **fields)
+
+    def test_one_order_per_user_and_address(self):
+        self._sub(self.users[0], self.milk, quantity=2)
+        self._sub(self.users[0], self.eggs, frequency='ALTERNATE_DAYS')
+        self._sub(self.users[0], self.eggs, address=self.office)
+        self._sub(self.users[1], self.milk, due=RUN - timedelta(days=2))  # overdue
+        self._sub(self.users[1], self.eggs, due=RUN + timedelta(days=1))  # not yet
+        self._sub(self.users[2], self.milk, status='PAUSED')
+
+        stats = subscriptions.fulfil(RUN, adapter=LocalOrderAdapter())
+        self.assertEqual((stats.subscriptions, stats.orders, stats.items), (4, 3, 4))
+
+        home = Order.objects.get(user=self.users[0], delivery_address=self.home)
+        self.assertEqual((home.total_price, home.delivery_name, home.subscription_date), (130, 'Home', RUN))
+        self.assertTrue(home.is_subscription)
+        self.assertEqual(sorted(home.items.values_list('quantity', flat=True)), [1, 2])
+        self.assertEqual(Order.objects.get(delivery_address=self.office).items.get().product, self.eggs)
+        self.assertIsNone(Order.objects.get(user=self.users[1]).delivery_address)
+
+        self.assertEqual(
+            sorted(Subscription.objects.filter(status='ACTIVE').values_list('frequency', 'next_delivery_date')),
+            [('ALTERNATE_DAYS', date(2026, 3, 6)), ('DAILY', date(2026, 3, 5)), ('DAILY', date(2026, 3, 5)),
+             ('DAILY', date(2026, 3, 5)), ('DAILY', RUN + timedelta(days=1))],
+        )
+
+    def test_rerunning_a_date_creates_nothing(self):
+        self._sub(self.users[0], self.milk)
+        subscriptions.fulfil(RUN)
+        with self.assertNumQueries(1):
+            stats = subscriptions.fulfil(RUN)
+        self.assertEqual(stats.orders, 0)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_a_chunk_already_fulfilled_elsewhere_rolls_back(self):
+        self._sub(self.users[0], self.milk)
+        self._sub(self.users[1], self.milk)
+        # Another worker already delivered to users[0] for this run
+        Order.objects.create(user=self.users[0], total_price=30, delivery_address=self.home,
+                             subscription_address_key=self.home.pk, is_subscription=True, subscription_date=RUN)
+
+        stats = subscriptions.fulfil(RUN, chunk_size=1)
+        self.assertEqual((stats.orders, stats.conflicts), (1, 1))
+        self.assertEqual(Order.objects.filter(user=self.users[0]).count(), 1)
+        self.assertEqual(Subscription.objects.get(user=self.users[0]).next_delivery_date, RUN)
+
+    def test_orders_without_an_address_are_protected_too(self):
+        self._sub(self.users[1], self.milk)
+        # Another worker already delivered to users[1], who has no address
+        Order.objects.create(user=self.users[1], total_price=30, subscription_address_key=0,
+                             is_subscription=True, subscription_date=RUN)
+        stats = subscriptions.fulfil(RUN)
+        self.assertEqual((stats.orders, stats.conflicts), (0, 1))
+        self.assertEqual(Order.objects.filter(user=self.users[1]).count(), 1)
+
+    def test_deleting_addresses_keeps_past_run_orders_apart(self):
+        self._sub(self.users[0], self.milk)
+        self._sub(self.users[0], self.eggs, address=self.office)
+        self.assertEqual(subscriptions.fulfil(RUN).orders, 2)
+        keys = sorted([self.home.pk, self.office.pk])
+        self.home.delete()
+        self.office.delete()
+        self.assertEqual(
+            sorted(Order.objects.values_list('delivery_address', 'subscription_address_key')),
+            [(None, keys[0]), (None, keys[1])],
+        )
+
+    def test_user_id_range_partitions_the_run(self):
+        for user in self.users:
+            self._sub(user, self.milk)
+        middle = self.users[1].pk
+        first = subscriptions.fulfil(RUN, max_user_id=middle)
+        second = subscriptions.fulfil(RUN, min_user_id=middle)
+        self.assertEqual((first.orders, second.orders), (1, 2))
+        self.assertEqual(OrderItem.objects.count(), 3)
+
+    def test_products_no_longer_sold_advance_without_an_order(self):
+        sub = self._sub(self.users[0], self.milk)
+        Product.objects.filter(pk=self.milk.pk).update(is_active=False)
+        pricing.reset()
+        stats = subscriptions.fulfil(RUN)
+        self.assertEqual((stats.orders, stats.skipped), (0, 1))
+        sub.refresh_from_db()
+        self.assertEqual(sub.next_delivery_date, date(2026, 3, 5))
+
+    def test_command(self):
+        self._sub(self.users[0], self.milk)
+        out = StringIO()
+        call_command('fulfil_subscriptions', '--date', RUN.isoformat(), stdout=out)
+        self.assertIn('1 subscriptions -> 1 orders, 1 items', out.getvalue())
+
+
+class SubscriptionApiTests(APITestCase):
+    def setUp(self):
+        kg = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        self.milk = Product.objects.create(slug='milk', name='Milk', base_price=30, pricing_unit=kg,
+                                           weight_value=1, weight_unit=kg)
+        self.user = User.objects.create_user(phone_number='9000000090', username='9000000090', password='pw')
+        self.client.force_authenticate(self.user)
+
+    def test_create_starts_on_the_schedule(self):
+        today = timezone.localdate()
+        response = self.client.post('/api/subscriptions/', {
+            'product': str(self.milk.pk), 'frequency': 'ALTERNATE_DAYS', 'start_date': today.isoformat(),
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        sub = Subscription.objects.get()
+        self.assertEqual(sub.next_delivery_date, subscriptions.first_date('ALTERNATE_DAYS', today, today))
+        self.assertIn(sub.next_delivery_date.weekday(), subscriptions.ALTERNATE_WEEKDAYS)
+
+    def test_resume_skips_deliveries_missed_while_paused(self):
+        today = timezone.localdate()
+        start = today - timedelta(days=40)
+        sub = Subscription.objects.create(user=self.user, product=self.milk, frequency='WEEKLY',
+                                          start_date=start, next_delivery_date=today - timedelta(days=21))
+        self.client.post(f'/api/subscriptions/{sub.pk}/pause/')
+        self.client.post(f'/api/subscriptions/{sub.pk}/resume/')
+        sub.refresh_from_db()
+        self.assertEqual(sub.status, 'ACTIVE')
+        self.assertGreaterEqual(sub.next_delivery_date, today)
+        self.assertLess(sub.next_delivery_date, today + timedelta(days=7))
+        self.assertEqual(sub.next_delivery_date.weekday(), start.weekday())
+
+    def test_address_must_be_the_users_own(self):
+        stranger = User.objects.create_user(phone_number='9000000091', username='9000000091', password='pw')
+        theirs = Address.objects.create(user=stranger, name='X', street='Y', city='Kanpur', zip_code='208001')
+        response = self.client.post('/api/subscriptions/', {
+            'product': str(self.milk.pk), 'address': theirs.pk,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
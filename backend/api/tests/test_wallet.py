@@ -0,0 +1,151 @@
+import threading
+import time
+from decimal import Decimal
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APITestCase
+from api.models import Product, UnitOfMeasure, User, Order, WalletEntry
+from api.services import wallet
+from api.services.adapters.local_adapter import LocalOrderAdapter
+from api.services.order_service import OrderService
+
+
+def make_user(phone, balance=0):
+    user = User.objects.create_user(phone_number=phone, username=phone, password='pw', is_phone_verified=True)
+    if balance:
+        wallet.top_up(user, balance, reference='test')
+    return user
+
+
+class WalletLedgerTests(TestCase):
+    def setUp(self):
+        self.user = make_user('9000000010', balance=100)
+
+    def test_entries_add_up_to_the_balance(self):
+        wallet.debit(self.user, '30.50', reference='order')
+        wallet.credit(self.user, 5, kind='CASHBACK')
+        order = Order.objects.create(user=self.user, total_price=20)
+        wallet.refund(order)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, Decimal('94.50'))
+        self.assertEqual(wallet.ledger_total(self.user), self.user.wallet_balance)
+        last = WalletEntry.objects.filter(user=self.user).latest('id')
+        self.assertEqual((last.kind, last.amount, last.balance_after, last.order), ('REFUND', Decimal('20.00'), Decimal('94.50'), order))
+
+    def test_overdraft_is_refused_without_a_trace(self):
+        with self.assertRaises(wallet.InsufficientFunds):
+            wallet.debit(self.user, '100.01')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.wallet_balance, Decimal('100.00'))
+        self.assertEqual(WalletEntry.objects.filter(user=self.user).count(), 1)
+
+    def test_debit_does_not_rewrite_the_rest_of_the_row(self):
+        stale = User.objects.get(pk=self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(first_name='Asha')
+        wallet.debit(stale, 10)
+        self.user.refresh_from_db()
+        self.assertEqual((self.user.first_name, self.user.wallet_balance), ('Asha', Decimal('90.00')))
+        self.assertEqual(stale.wallet_balance, Decimal('90.00'))
+
+    def test_bulk_credit_is_one_update_per_chunk(self):
+        users = [make_user(f'90000001{i:02d}') for i in range(5)]
+        amounts = {user.pk: Decimal(i + 1) for i, user in enumerate(users)}
+        with self.assertNumQueries(5):  # savepoint, UPDATE, read-back, INSERT, release
+            self.assertEqual(wallet.bulk_credit(amounts, reference='diwali'), 5)
+        for i, user in enumerate(users):
+            user.refresh_from_db()
+            self.assertEqual(user.wallet_balance, Decimal(i + 1))
+            self.assertEqual(user.wallet_entries.get().reference, 'diwali')
+
+    def test_wallet_checkout_debits_through_the_ledger(self):
+        uom = UnitOfMeasure.objects.create(name='Kilogram', symbol='kg')
+        Product.objects.create(slug='tomato', name='Tomato', base_price=40, pricing_unit=uom,
+                               weight_value=1, weight_unit=uom, external_id='101')
+        order, error = OrderService(adapter=LocalOrderAdapter()).place_order(self.user, {
+            'payment_method': 'WALLET', 'items': [{'product_id': '101', 'quantity': 2}],
+        })
+        self.assertIsNone(error)
+        entry = WalletEntry.objects.get(kind='DEBIT')
+        self.assertEqual((entry.amount, entry.balance_after, entry.order), (Decimal('-80.00'), Decimal('20.00'), order))
+
+        # A stale instance passes the pre-check, but the conditional UPDATE refuses
+        stale = User.objects.get(pk=self.user.pk)
+        stale.wallet_balance = Decimal('500.00')
+        order, error = OrderService(adapter=LocalOrderAdapter()).place_order(stale, {
+            'payment_method': 'WALLET', 'items': [{'product_id': '101', 'quantity': 1}],
+        })
+        self.assertIsNone(order)
+        self.assertEqual(error['user_msg'], 'Insufficient Wallet Balance')
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class WalletViewTests(APITestCase):
+    def test_balance_and_bulk_credit(self):
+        user = make_user('9000000020', balance=50)
+        staff = make_user('9000000021')
+        User.objects.filter(pk=staff.pk).update(is_staff=True)
+        staff.refresh_from_db()
+
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/wallet/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(str(response.json()['data']['balance'])), Decimal('50.00'))
+        self.assertEqual(self.client.post('/api/wallet/bulk-credit/', {'credits': {user.pk: 5}}, format='json').status_code, 403)
+
+        self.client.force_authenticate(staff)
+        response = self.client.post('/api/wallet/bulk-credit/', {'credits': {user.pk: 5}}, format='json')
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertEqual(user.wallet_balance, Decimal('55.00'))
+        bad = self.client.post('/api/wallet/bulk-credit/', {'credits': {user.pk: -5}}, format='json')
+        self.assertEqual(bad.status_code, 400)
+
+
+class WalletConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    DEBITS_PER_THREAD = 5
+
+    def _retrying(self, fn):
+        # SQLite serialises writers; a busy database is retried, not counted
+        for _ in range(200):
+            try:
+                return fn()
+            except OperationalError:
+                time.sleep(0.01)
+        raise AssertionError('database stayed locked')
+
+    def test_concurrent_debits_lose_nothing_and_never_overdraw(self):
+        user = make_user('9000000030', balance=30)
+        outcomes = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(self.THREADS)
+
+        def spend():
+            barrier.wait()
+            try:
+                for _ in range(self.DEBITS_PER_THREAD):
+                    # Each thread works from its own (soon stale) copy of the user
+                    me = self._retrying(lambda: User.objects.get(pk=user.pk))
+                    try:
+                        self._retrying(lambda: wallet.debit(me, 1))
+                        result = 'ok'
+                    except wallet.InsufficientFunds:
+                        result = 'refused'
+                    with lock:
+                        outcomes.append(result)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=spend) for _ in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        user.refresh_from_db()
+        self.assertEqual(len(outcomes), self.THREADS * self.DEBITS_PER_THREAD)
+        self.assertEqual(outcomes.count('ok'), 30)
+        self.assertEqual(user.wallet_balance, Decimal('0.00'))
+        self.assertEqual(wallet.ledger_total(user), Decimal('0.00'))
+        self.assertEqual(WalletEntry.objects.filter(user=user, kind='DEBIT').count(), 30)
@@ -0,0 +1,82 @@
+import time
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from api.services import http_client
+from api.services.adapters import get_product_adapter
+from api.services.adapters.cached_adapter import wc_cache
+from .fake_woocommerce import FakeWooCommerce
+
+
+class StaleWhileRevalidateTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeWooCommerce()
+        cls.settings_override = override_settings(
+            PRODUCT_BACKEND='woocommerce', WC_API_URL=cls.server.url,
+            WC_CACHE_ENABLED=True, WC_CACHE_FRESH_TTL=60, WC_CACHE_STALE_TTL=600,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        http_client.reset_client()
+        wc_cache.reset_stats()
+        self.now = 1_000_000.0
+        wc_cache.clock = lambda: self.now
+        self.server.calls.clear()
+        self.server.down = False
+        self.server.routes[('GET', '/products')] = [{'id': 1, 'name': 'Tomato'}]
+        self.adapter = get_product_adapter()
+
+    def tearDown(self):
+        wc_cache.wait_for_refreshes()
+        wc_cache.clock = time.time
+
+    def test_fresh_entries_are_served_without_upstream_calls(self):
+        self.assertEqual(self.adapter.list_products(), [{'id': 1, 'name': 'Tomato'}])
+        self.now += 30
+        self.assertEqual(self.adapter.list_products(), [{'id': 1, 'name': 'Tomato'}])
+        self.assertEqual(self.server.count('GET', '/products'), 1)
+        self.assertEqual(wc_cache.stats()['fresh_hits'], 1)
+
+    def test_stale_entries_are_served_and_refreshed_in_background(self):
+        self.adapter.list_products()
+        self.server.routes[('GET', '/products')] = [{'id': 1, 'name': 'Cherry Tomato'}]
+        self.now += 120
+
+        self.assertEqual(self.adapter.list_products(), [{'id': 1, 'name': 'Tomato'}])
+        wc_cache.wait_for_refreshes()
+        self.assertEqual(self.adapter.list_products(), [{'id': 1, 'name': 'Cherry Tomato'}])
+        stats = wc_cache.stats()
+        self.assertEqual((stats['stale_hits'], stats['refreshes']), (1, 1))
+
+    def test_last_good_payload_is_served_when_upstream_is_down(self):
+        self.adapter.list_products()
+        self.server.down = True
+        self.now += 3600
+
+        self.assertEqual(self.adapter.list_products(), [{'id': 1, 'name': 'Tomato'}])
+        self.assertEqual(wc_cache.stats()['served_stale_on_error'], 1)
+        # Nothing cached for this key: fall back to the adapter's empty result
+        self.assertEqual(self.adapter.list_products(search='okra'), [])
+
+    def test_missing_product_is_cached_as_none(self):
+        self.server.routes[('GET', '/products')] = []
+        self.assertIsNone(self.adapter.get_product('no-such-slug'))
+        self.assertIsNone(self.adapter.get_product('no-such-slug'))
+        self.assertEqual(self.server.count('GET', '/products/no-such-slug'), 1)
+
+    def test_v2_endpoint_goes_through_cache(self):
+        url = reverse('product-list-v2')
+        self.client.get(url)
+        self.server.down = True
+        resp = self.client.get(url)
+        self.assertEqual(resp.json()['data'], [{'id': 1, 'name': 'Tomato'}])
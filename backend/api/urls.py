@@ -1,18 +1,20 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    ProductListView, CheckDeliveryView, CartAddView, ProductProxyView,
-    ProductListAPIView, ProductDetailAPIView, CategoryListAPIView,
+    ProductListView, CheckDeliveryView, CheckDeliveryBulkView, CartAddView, ProductProxyView,
+    ProductListAPIView, ProductDetailAPIView, ProductBatchAPIView, CategoryListAPIView,
 )
 from .views_auth import SendOTPView, VerifyOTPView, UserUpdateView
-from .views_order import PlaceOrderView, PaymentWebhookView, OrderDetailView
+from .views_order import PlaceOrderView, PaymentWebhookView, OrderDetailView, OrderStatusBulkView
 from .views_history import OrderHistoryView
 from .views_address import AddressViewSet
 from .views_coupon import ApplyCouponView, CouponListView
 from .views_root import api_root
 from .views_subscription import SubscriptionViewSet
 from .views_wishlist import WishlistViewSet
-from .views_picker import PickerUpdateView
+from .views_picker import PickerUpdateView, PickerBatchWeightView, PickWaveView
+from .views_wallet import WalletView, WalletBulkCreditView
+from .views_forecast import DemandForecastView
 
 router = DefaultRouter()
 router.register(r'addresses', AddressViewSet, basename='address')
@@ -25,6 +27,7 @@ urlpatterns = [
 
     # === NEW: Modular product/category endpoints (use these) ===
     path('v2/products/', ProductListAPIView.as_view(), name='product-list-v2'),
+    path('v2/products/batch/', ProductBatchAPIView.as_view(), name='product-batch-v2'),
     path('v2/products/<str:identifier>/', ProductDetailAPIView.as_view(), name='product-detail-v2'),
     path('v2/categories/', CategoryListAPIView.as_view(), name='category-list-v2'),
 
@@ -34,6 +37,7 @@ urlpatterns = [
 
     # === Core Endpoints ===
     path('check-delivery/', CheckDeliveryView.as_view(), name='check-delivery'),
+    path('check-delivery/bulk/', CheckDeliveryBulkView.as_view(), name='check-delivery-bulk'),
     path('cart/add/', CartAddView.as_view(), name='cart-add'),
     path('auth/otp/send/', SendOTPView.as_view(), name='send-otp'),
     path('auth/otp/verify/', VerifyOTPView.as_view(), name='verify-otp'),
@@ -41,10 +45,16 @@ urlpatterns = [
     path('orders/place/', PlaceOrderView.as_view(), name='place-order'),
     path('orders/<uuid:pk>/', OrderDetailView.as_view(), name='order-detail'),
     path('orders/history/', OrderHistoryView.as_view(), name='order-history'),
+    path('orders/status/', OrderStatusBulkView.as_view(), name='order-status-bulk'),
     path('payment/webhook/', PaymentWebhookView.as_view(), name='payment-webhook'),
     path('coupons/apply/', ApplyCouponView.as_view(), name='apply-coupon'),
     path('coupons/', CouponListView.as_view(), name='coupon-list'),
+    path('wallet/', WalletView.as_view(), name='wallet'),
+    path('wallet/bulk-credit/', WalletBulkCreditView.as_view(), name='wallet-bulk-credit'),
     
     # === Picker / Warehouse API ===
     path('picker/orders/<uuid:order_id>/update/', PickerUpdateView.as_view(), name='picker-update'),
+    path('picker/orders/<uuid:order_id>/weights/', PickerBatchWeightView.as_view(), name='picker-weights'),
+    path('picker/waves/', PickWaveView.as_view(), name='picker-waves'),
+    path('procurement/forecast/', DemandForecastView.as_view(), name='demand-forecast'),
 ]
\ No newline at end of file
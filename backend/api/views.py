@@ -1,9 +1,14 @@
+from django.conf import settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.throttling import AnonRateThrottle
+from .conditional import not_modified, set_validators
 from .renderers import StandardResponseRenderer
-from .services import ProductService
+from .services import ProductService, serviceability
+from .services.pagination import InvalidCursor
+from .services.single_flight import SingleFlight
+from .services.http_client import get_client
 
 
 class ProductProxyThrottle(AnonRateThrottle):
@@ -14,6 +19,8 @@ class ProductListAPIView(APIView):
     """
     Unified product list endpoint.
     Uses the active backend (local DB or WooCommerce) via ProductService.
+    ?page= returns a plain list; ?cursor= returns {results, next_cursor}.
+    Supports conditional GET (ETag / Last-Modified) on the local backend.
     """
     throttle_classes = [ProductProxyThrottle]
     renderer_classes = [StandardResponseRenderer]
@@ -24,69 +31,161 @@ class ProductListAPIView(APIView):
         service = ProductService()
         category = request.query_params.get('category')
         search = request.query_params.get('search')
-        page = int(request.query_params.get('page', 1))
-        per_page = int(request.query_params.get('per_page', 100))
+        try:
+            page = max(int(request.query_params.get('page', 1)), 1)
+            per_page = int(request.query_params.get('per_page', 100))
+        except ValueError:
+            return Response(
+                {'error': 'page and per_page must be integers'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        per_page = min(max(per_page, 1), settings.PRODUCT_LIST_MAX_PAGE_SIZE)
+        cursor = request.query_params.get('cursor')
+
+        validators = service.list_validators(category, search, page, per_page, cursor)
+        if validators:
+            response = not_modified(request, *validators)
+            if response is not None:
+                return response
+
+        # Cursor mode (?cursor= for the first page): keyset pagination
+        if cursor is not None:
+            try:
+                data = service.list_products_page(
+                    category_slug=category,
+                    search=search,
+                    cursor=cursor,
+                    per_page=per_page,
+                )
+            except InvalidCursor:
+                return Response(
+                    {'error': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            response = Response(data)
+        else:
+            # Legacy page mode — kept for the existing frontend
+            products = service.list_products(
+                category_slug=category,
+                search=search,
+                page=page,
+                per_page=per_page,
+            )
+            response = Response(products)
 
-        products = service.list_products(
-            category_slug=category,
-            search=search,
-            page=page,
-            per_page=per_page,
-        )
-        return Response(products)
+        if validators:
+            set_validators(response, *validators)
+        return response
 
 
 class ProductDetailAPIView(APIView):
-    """Single product by slug or ID."""
+    """Single product by slug or ID. Supports conditional GET on the local backend."""
     renderer_classes = [StandardResponseRenderer]
     permission_classes = [permissions.AllowAny]
     authentication_classes = []  # Public endpoint — skip JWT validation
 
     def get(self, request, identifier):
         service = ProductService()
+        validators = service.product_validators(identifier)
+        if validators:
+            response = not_modified(request, *validators)
+            if response is not None:
+                return response
+
         product = service.get_product(identifier)
         if product is None:
             return Response(
                 {'error': 'Product not found'},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        return Response(product)
+        response = Response(product)
+        if validators:
+            set_validators(response, *validators)
+        return response
+
+
+class ProductBatchAPIView(APIView):
+    """
+    Many products in one call: ?ids=<slug|uuid|external_id>,...
+    (comma-separated and/or repeated). Returns {results, missing}.
+    """
+    throttle_classes = [ProductProxyThrottle]
+    renderer_classes = [StandardResponseRenderer]
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []  # Public endpoint — skip JWT validation
+
+    def get(self, request):
+        identifiers = [
+            identifier.strip()
+            for value in request.query_params.getlist('ids')
+            for identifier in value.split(',')
+            if identifier.strip()
+        ]
+        if not identifiers:
+            return Response(
+                {'error': 'ids is required'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(set(identifiers)) > settings.PRODUCT_BATCH_MAX_IDS:
+            return Response(
+                {'error': f'At most {settings.PRODUCT_BATCH_MAX_IDS} ids per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(ProductService().get_products(identifiers))
 
 
 class CategoryListAPIView(APIView):
-    """List all product categories."""
+    """List all product categories. Supports conditional GET on the local backend."""
     renderer_classes = [StandardResponseRenderer]
     permission_classes = [permissions.AllowAny]
     authentication_classes = []  # Public endpoint — skip JWT validation
 
     def get(self, request):
         service = ProductService()
-        categories = service.list_categories()
-        return Response(categories)
+        validators = service.category_validators()
+        if validators:
+            response = not_modified(request, *validators)
+            if response is not None:
+                return response
+
+        response = Response(service.list_categories())
+        if validators:
+            set_validators(response, *validators)
+        return response
+
+
+# Identical concurrent proxy requests share one upstream call (see SingleFlight)
+proxy_flight = SingleFlight(ttl=getattr(settings, 'PROXY_COALESCE_TTL', 5))
 
 
 class ProductProxyView(APIView):
     """
     LEGACY: Direct WooCommerce proxy (kept for backward compatibility).
     New code should use ProductListAPIView instead.
+    Identical requests are coalesced onto one upstream call and the result
+    is reused for PROXY_COALESCE_TTL seconds.
     """
     throttle_classes = [ProductProxyThrottle]
     permission_classes = [permissions.AllowAny]
     authentication_classes = []  # Public endpoint — skip JWT validation
 
     def get(self, request):
-        from django.conf import settings
         import requests as http_requests
 
         url = f"{settings.WC_API_URL}products"
-        params = dict(request.query_params)
+        params = dict(request.query_params.lists())
         params.setdefault('per_page', ['100'])
         auth = (settings.WC_CONSUMER_KEY, settings.WC_CONSUMER_SECRET)
+        key = tuple(sorted((k, tuple(sorted(v))) for k, v in params.items()))
+
+        def fetch():
+            response = get_client().get(url, params=params, auth=auth, timeout=15)
+            return response.json(), response.status_code
 
         try:
-            response = http_requests.get(url, params=params, auth=auth, timeout=15)
-            return Response(response.json(), status=response.status_code)
-        except http_requests.RequestException as e:
+            body, status_code = proxy_flight.do(key, fetch, cache_if=lambda r: r[1] < 400)
+            return Response(body, status=status_code)
+        except (http_requests.RequestException, ValueError) as e:
             return Response(
                 {'error': f'WooCommerce connection failed: {str(e)}'},
                 status=status.HTTP_502_BAD_GATEWAY,
@@ -108,7 +207,7 @@ class RootView(APIView):
 
 class ProductListView(APIView):
     """
-    LEGACY: Lists products from local DB using Django serializer.
+    LEGACY: Lists products from local DB using the fast-path row serializer.
     Replaced by ProductListAPIView above, but kept for existing URL references.
     """
     renderer_classes = [StandardResponseRenderer]
@@ -117,12 +216,22 @@ class ProductListView(APIView):
 
     def get(self, request):
         from .models import Product
-        from .serializers import ProductSerializer
-        products = Product.objects.filter(is_active=True).select_related(
-            'category', 'pricing_unit', 'weight_unit'
-        )
-        serializer = ProductSerializer(products, many=True)
-        return Response(serializer.data)
+        from .fast_serializers import serialize_products
+        products = Product.objects.filter(is_active=True)
+        return Response(serialize_products(products))
+
+
+def _delivery(zone):
+    if zone is None:
+        return {
+            'available': False,
+            'message': 'Delivery not available in your area yet.',
+        }
+    return {
+        'available': True,
+        'city': zone.city,
+        'delivery_time_hrs': zone.delivery_time_hrs,
+    }
 
 
 class CheckDeliveryView(APIView):
@@ -130,20 +239,24 @@ class CheckDeliveryView(APIView):
     renderer_classes = [StandardResponseRenderer]
 
     def post(self, request):
-        from .models import DeliveryZone
-        zip_code = request.data.get('zip_code', '')
-        try:
-            zone = DeliveryZone.objects.get(zip_code=zip_code, is_serviceable=True)
-            return Response({
-                'available': True,
-                'city': zone.city,
-                'delivery_time_hrs': zone.delivery_time_hrs,
-            })
-        except DeliveryZone.DoesNotExist:
-            return Response({
-                'available': False,
-                'message': 'Delivery not available in your area yet.',
-            })
+        return Response(_delivery(serviceability.check(request.data.get('zip_code', ''))))
+
+
+class CheckDeliveryBulkView(APIView):
+    """Check many zip codes at once (e.g. a whole address book): {"zip_codes": [...]}."""
+    renderer_classes = [StandardResponseRenderer]
+
+    def post(self, request):
+        zip_codes = request.data.get('zip_codes')
+        limit = settings.DELIVERY_CHECK_MAX_ZIPS
+        if not isinstance(zip_codes, list) or not all(isinstance(z, str) for z in zip_codes):
+            return Response({'error': 'zip_codes must be a list of strings'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(zip_codes) > limit:
+            return Response({'error': f'At most {limit} zip codes per request'}, status=status.HTTP_400_BAD_REQUEST)
+        zones = serviceability.check_many(zip_codes)
+        return Response({'results': [
+            {'zip_code': zip_code, **_delivery(zones[zip_code])} for zip_code in zip_codes
+        ]})
 
 
 class CartAddView(APIView):
@@ -155,13 +268,13 @@ class CartAddView(APIView):
         from .serializers import CartAddSerializer
         serializer = CartAddSerializer(data=request.data)
         if serializer.is_valid():
-            product = serializer.validated_data['product']
-            quantity = serializer.validated_data['quantity']
+            line = serializer.validated_data['line']
             return Response({
                 'success': True,
-                'product_id': str(product.id),
-                'product_name': product.name,
-                'quantity': quantity,
-                'price': float(product.discounted_price or product.base_price),
+                'product_id': str(line.entry.product_id),
+                'product_name': line.entry.name,
+                'quantity': serializer.validated_data['quantity'],
+                'price': float(line.unit_price),
+                'line_total': float(line.total),
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
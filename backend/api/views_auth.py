@@ -4,10 +4,10 @@ from rest_framework import status, permissions
 from rest_framework_simplejwt.tokens import RefreshToken
 from .models import User
 from .services import OTPService
+from .services.http_client import get_client
 from .serializers import UserUpdateSerializer
 from .renderers import StandardResponseRenderer
 
-import requests
 import base64
 import os
 
@@ -36,9 +36,9 @@ class SendOTPView(APIView):
         data = {'To': phone, 'Channel': 'sms'}
         
         try:
-            response = requests.post(
-                url, 
-                data=data, 
+            response = get_client().post(
+                url,
+                data=data,
                 auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
             )
             
@@ -70,7 +70,7 @@ class VerifyOTPView(APIView):
              user.is_phone_verified = True
              user.is_staff = True
              user.is_superuser = True
-             user.save()
+             user.save(update_fields=['is_phone_verified', 'is_staff', 'is_superuser'])
              refresh = RefreshToken.for_user(user)
              return Response({
                 'message': 'Login Successful (Test)',
@@ -90,9 +90,9 @@ class VerifyOTPView(APIView):
         data = {'To': phone, 'Code': otp}
         
         try:
-            response = requests.post(
-                url, 
-                data=data, 
+            response = get_client().post(
+                url,
+                data=data,
                 auth=(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
             )
             
@@ -102,7 +102,7 @@ class VerifyOTPView(APIView):
                     # Success
                     user, created = User.objects.get_or_create(username=phone, defaults={'phone_number': phone})
                     user.is_phone_verified = True
-                    user.save()
+                    user.save(update_fields=['is_phone_verified'])
                     
                     refresh = RefreshToken.for_user(user)
                     
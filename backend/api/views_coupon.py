@@ -1,61 +1,75 @@
-from rest_framework import status, generics, permissions
+from rest_framework import status, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.utils import timezone
-from .models import Coupon
+from decimal import InvalidOperation
 from .renderers import StandardResponseRenderer
+from .services import coupons, pricing
 from .serializers import CouponSerializer # Assuming this exists, if not I will use ad-hoc serializer
 
 class ApplyCouponView(APIView):
+    """
+    Coupon preview. Send `items` ([{product_id, quantity}]) to have the
+    subtotal priced server-side; `order_total` alone is still accepted, but
+    only for coupons that cover the whole basket. Send `codes` instead of
+    `code` to preview a stack.
+    """
     renderer_classes = [StandardResponseRenderer]
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        code = request.data.get('code')
+        items = request.data.get('items')
         order_total = request.data.get('order_total')
+        try:
+            codes = pricing.coupon_codes(request.data.get('codes') or request.data.get('code'))
+        except pricing.PricingError as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not code or not order_total:
+        if not codes or not (items or order_total):
             return Response({'error': 'Code and Order Total required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            coupon = Coupon.objects.get(code=code, is_active=True)
-            
-            # Check Validity
-            if coupon.valid_until and coupon.valid_until < timezone.now():
-                return Response({'error': 'Coupon Expired'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Welcome Offer Logic
-            if coupon.code.upper() == 'WELCOME50':
-                if request.user.orders.filter(payment_status='COMPLETED').exists():
-                     return Response({'error': 'This offer is for new users only.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            # Check Min Order
-            if float(order_total) < float(coupon.min_order_value):
-                return Response({
-                    'error': f'Minimum order value of ₹{coupon.min_order_value} required'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            return Response({
-                'success': True,
-                'coupon': code,
-                'discount_amount': float(coupon.discount_amount),
-                'message': 'Coupon Applied Successfully'
-            })
-
-        except Coupon.DoesNotExist:
+        applied = [coupons.get(c) for c in codes]
+        if None in applied:
             return Response({'error': 'Invalid Coupon Code'}, status=status.HTTP_400_BAD_REQUEST)
 
-class CouponListView(generics.ListAPIView):
-    queryset = Coupon.objects.filter(is_active=True)
+        try:
+            if items:
+                quote = pricing.quote(items, coupon=applied, user=request.user)
+                subtotal, discounts = quote.subtotal, quote.discounts
+            else:
+                subtotal = pricing.to_money(str(order_total))
+                discounts = pricing.coupon_discounts(applied, subtotal, request.user)
+        except (pricing.PricingError, InvalidOperation) as e:
+            return Response({'error': getattr(e, 'message', 'Invalid order total')}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            'success': True,
+            'coupon': codes[0],
+            'discount_amount': float(sum(amount for _, amount in discounts)),
+            'discounts': [{'code': c.code, 'discount_amount': float(amount)} for c, amount in discounts],
+            'order_total': float(subtotal),
+            'message': 'Coupon Applied Successfully'
+        })
+
+class CouponListView(APIView):
     renderer_classes = [StandardResponseRenderer]
     permission_classes = [permissions.AllowAny]
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = [{
-            'code': c.code,
-            'discount_amount': float(c.discount_amount),
-            'min_order_value': float(c.min_order_value),
-            'desc': f"Get ₹{c.discount_amount} OFF above ₹{c.min_order_value}"
-        } for c in queryset]
-        return Response(data)
+    def get(self, request):
+        return Response([_describe(c) for c in coupons.available()])
+
+
+def _describe(coupon):
+    data = {
+        'code': coupon.code,
+        'discount_type': coupon.discount_type,
+        'discount_amount': float(coupon.discount_amount),
+        'min_order_value': float(coupon.min_order_value),
+        'stackable': coupon.stackable,
+        'desc': f"Get ₹{coupon.discount_amount} OFF above ₹{coupon.min_order_value}",
+    }
+    if coupon.discount_type == 'PERCENT':
+        data['discount_percent'] = float(coupon.discount_percent or 0)
+        data['max_discount'] = float(coupon.max_discount) if coupon.max_discount is not None else None
+        cap = f" (up to ₹{coupon.max_discount})" if coupon.max_discount is not None else ''
+        data['desc'] = f"Get {coupon.discount_percent}% OFF{cap} above ₹{coupon.min_order_value}"
+    return data
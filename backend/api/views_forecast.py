@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.utils.dateparse import parse_date
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from .services import demand_forecast
+from .views_picker import IsStaffOrAdmin
+
+
+class DemandForecastView(APIView):
+    """
+    Committed subscription volume per product per day, overall and per
+    delivery zone, for ?days= (default 7) days from ?start= (YYYY-MM-DD,
+    default tomorrow).
+    """
+    permission_classes = [IsStaffOrAdmin]
+
+    def get(self, request):
+        start = request.query_params.get('start')
+        days = request.query_params.get('days', '7')
+        if start and parse_date(start) is None:
+            return Response({'error': 'start must be a YYYY-MM-DD date'}, status=status.HTTP_400_BAD_REQUEST)
+        if not days.isdigit() or not 1 <= int(days) <= settings.DEMAND_FORECAST_MAX_DAYS:
+            return Response(
+                {'error': f'days must be between 1 and {settings.DEMAND_FORECAST_MAX_DAYS}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(demand_forecast.forecast(days=int(days), start=parse_date(start) if start else None))
@@ -1,12 +1,38 @@
-from rest_framework import generics, permissions
-from .models import Order
-from .serializers import OrderSerializer
+from django.conf import settings
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .serializers import OrderSerializer, OrderSummarySerializer
 from .renderers import StandardResponseRenderer
+from .services.order_history import history_page
+from .services.pagination import InvalidCursor
 
-class OrderHistoryView(generics.ListAPIView):
-    serializer_class = OrderSerializer
+class OrderHistoryView(APIView):
+    """
+    The user's orders, newest first, keyset-paginated on (created_at, id).
+    ?cursor= (empty for the first page) returns {results, next_cursor};
+    without it the newest page is returned as a plain list, for older app
+    builds. ?view=summary returns header fields plus item_count only.
+    """
     permission_classes = [permissions.IsAuthenticated]
     renderer_classes = [StandardResponseRenderer]
 
-    def get_queryset(self):
-        return Order.objects.filter(user=self.request.user).order_by('-created_at')
+    def get(self, request):
+        try:
+            per_page = int(request.query_params.get('per_page', settings.ORDER_HISTORY_PAGE_SIZE))
+        except ValueError:
+            return Response({'error': 'per_page must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        per_page = min(max(per_page, 1), settings.ORDER_HISTORY_MAX_PAGE_SIZE)
+        summary = request.query_params.get('view') == 'summary'
+        cursor = request.query_params.get('cursor')
+
+        try:
+            orders, next_cursor = history_page(request.user, cursor, per_page, summary=summary)
+        except InvalidCursor:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer_class = OrderSummarySerializer if summary else OrderSerializer
+        results = serializer_class(orders, many=True).data
+        if cursor is None:
+            return Response(results)
+        return Response({'results': results, 'next_cursor': next_cursor})
@@ -1,19 +1,25 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from .models import Order
 from .serializers import OrderSerializer
+from .idempotency import idempotent
 from .renderers import StandardResponseRenderer
-from .services import OrderService
+from .services import OrderService, order_status
+from .views_picker import IsStaffOrAdmin
 
 import uuid
 
 
 class PlaceOrderView(APIView):
+    """Send an Idempotency-Key header so retries cannot create duplicate orders."""
     renderer_classes = [StandardResponseRenderer]
     permission_classes = [permissions.IsAuthenticated]
 
+    @idempotent('place-order')
     def post(self, request):
         service = OrderService()
         order, error = service.place_order(request.user, request.data)
@@ -49,18 +55,67 @@ class OrderDetailView(generics.RetrieveAPIView):
 
 
 class PaymentWebhookView(APIView):
-    """Simulates Razorpay Success Callback"""
+    """
+    Simulates Razorpay Success Callback.
+    Redeliveries are replayed: keyed by Idempotency-Key, else by payment_id.
+    """
     renderer_classes = [StandardResponseRenderer]
-    
+
+    @idempotent('payment-webhook', fallback_key=lambda request: request.data.get('payment_id'))
     def post(self, request):
         order_id = request.data.get('order_id')
         payment_id = request.data.get('payment_id')
         
         try:
             order = Order.objects.get(id=order_id)
-            order.transaction_id = payment_id
-            order.payment_status = 'COMPLETED'
-            order.save()
-            return Response({'success': True, 'msg': 'Payment Verified'})
-        except Order.DoesNotExist:
+        except (Order.DoesNotExist, ValidationError):
             return Response({'success': False, 'msg': 'Order Not Found'}, status=404)
+
+        try:
+            order_status.transition(order, order_status.PAYMENT, 'COMPLETED', transaction_id=payment_id)
+        except order_status.InvalidTransition as e:
+            return Response({'success': False, 'msg': e.message}, status=409)
+        return Response({'success': True, 'msg': 'Payment Verified'})
+
+
+class OrderStatusBulkView(APIView):
+    """
+    Dispatcher moves many orders at once, e.g. a whole wave out for delivery:
+    {"order_ids": [...], "delivery_status": "OUT_FOR_DELIVERY", "driver_name": "..."}
+    or {"order_ids": [...], "payment_status": "FAILED"}.
+    One conditional UPDATE; orders that cannot make the move are reported.
+    """
+    renderer_classes = [StandardResponseRenderer]
+    permission_classes = [IsStaffOrAdmin]
+
+    def post(self, request):
+        data = request.data
+        fields = [f for f in (order_status.DELIVERY, order_status.PAYMENT) if f in data]
+        if len(fields) != 1:
+            return Response(
+                {'error': 'Send exactly one of delivery_status or payment_status'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        field = fields[0]
+
+        order_ids = data.get('order_ids')
+        if not isinstance(order_ids, list) or not order_ids:
+            return Response({'error': 'order_ids must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(order_ids) > settings.ORDER_STATUS_BULK_MAX:
+            return Response(
+                {'error': f'At most {settings.ORDER_STATUS_BULK_MAX} orders per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            order_ids = [uuid.UUID(str(pk)) for pk in order_ids]
+        except ValueError:
+            return Response({'error': 'order_ids must be UUIDs'}, status=status.HTTP_400_BAD_REQUEST)
+
+        extra = {
+            name: data[name] for name in ('driver_name', 'driver_phone', 'transaction_id') if name in data
+        }
+        try:
+            result = order_status.transition_many(order_ids, field, data[field], extra)
+        except order_status.InvalidTransition as e:
+            return Response({'error': e.message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict())
@@ -1,7 +1,9 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, permissions
-from .services import OrderService
+from .services import OrderService, pick_waves
 
 
 class IsStaffOrAdmin(permissions.BasePermission):
@@ -34,3 +36,65 @@ class PickerUpdateView(APIView):
             return Response({'success': True, 'message': message})
         else:
             return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PickerBatchWeightView(APIView):
+    """
+    Picker submits every weighed item of an order in one call:
+    {"items": [{"product_id": ..., "weight": ...}, ...]}.
+    Saved locally in one UPDATE and pushed to WooCommerce in one PUT.
+    """
+    permission_classes = [IsStaffOrAdmin]
+
+    def put(self, request, order_id):
+        items = request.data.get('items')
+        if not isinstance(items, list) or not items or not all(
+            isinstance(item, dict) and item.get('product_id') and item.get('weight') for item in items
+        ):
+            return Response(
+                {'error': 'items must be a list of {product_id, weight}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        service = OrderService()
+        success, message = service.update_item_weights(order_id, items)
+
+        if success:
+            return Response({'success': True, 'message': message})
+        else:
+            return Response({'error': message}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PickWaveView(APIView):
+    """
+    Pick list (per aisle) and put wall for all open orders up to ?cutoff=
+    (ISO datetime, default now), optionally after ?since=.
+    GET previews the wave; POST also claims it (PENDING -> PACKING).
+    """
+    permission_classes = [IsStaffOrAdmin]
+
+    def get(self, request):
+        return self._plan(request, claim=False)
+
+    def post(self, request):
+        return self._plan(request, claim=True)
+
+    def _plan(self, request, claim):
+        try:
+            cutoff = _parse_when(request.query_params.get('cutoff'))
+            since = _parse_when(request.query_params.get('since'))
+        except ValueError:
+            return Response(
+                {'error': 'cutoff and since must be ISO 8601 datetimes'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(pick_waves.plan_wave(cutoff=cutoff, since=since, claim=claim))
+
+
+def _parse_when(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
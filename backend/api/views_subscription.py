@@ -3,8 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Subscription
 from .serializers import SubscriptionSerializer
+from .fast_serializers import serialize_subscriptions
+from .services import subscriptions
 from django.utils import timezone
-import datetime
 
 class SubscriptionViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -13,32 +14,42 @@ class SubscriptionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Subscription.objects.filter(user=self.request.user).order_by('-created_at')
 
+    def list(self, request, *args, **kwargs):
+        # Fast path: same shape as SubscriptionSerializer, built from .values() rows
+        return Response(serialize_subscriptions(self.get_queryset(), request=request))
+
     def perform_create(self, serializer):
-        # Auto-calculate next_delivery_date based on start_date
-        start_date = serializer.validated_data.get('start_date')
-        if not start_date:
-            start_date = timezone.now().date()
-            
-        serializer.save(user=self.request.user, next_delivery_date=start_date)
+        # First delivery: the first date on the schedule from start_date onwards
+        start_date = serializer.validated_data.get('start_date') or timezone.localdate()
+        frequency = serializer.validated_data.get('frequency', 'DAILY')
+        serializer.save(
+            user=self.request.user, start_date=start_date,
+            next_delivery_date=subscriptions.first_date(frequency, start_date, start_date),
+        )
+
+    def _set_status(self, sub, status, **fields):
+        sub.status = status
+        for name, value in fields.items():
+            setattr(sub, name, value)
+        sub.save(update_fields=['status', *fields, 'updated_at'])
 
     @action(detail=True, methods=['post'])
     def pause(self, request, pk=None):
-        sub = self.get_object()
-        sub.status = 'PAUSED'
-        sub.save()
+        self._set_status(self.get_object(), 'PAUSED')
         return Response({'status': 'Subscription paused'})
 
     @action(detail=True, methods=['post'])
     def resume(self, request, pk=None):
         sub = self.get_object()
-        sub.status = 'ACTIVE'
-        # Logic to reset next_delivery_date could go here
-        sub.save()
-        return Response({'status': 'Subscription resumed'})
+        # Deliveries missed while paused are skipped, not sent all at once
+        next_delivery_date = max(
+            sub.next_delivery_date,
+            subscriptions.first_date(sub.frequency, timezone.localdate(), sub.start_date),
+        )
+        self._set_status(sub, 'ACTIVE', next_delivery_date=next_delivery_date)
+        return Response({'status': 'Subscription resumed', 'next_delivery_date': next_delivery_date})
 
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
-        sub = self.get_object()
-        sub.status = 'CANCELLED'
-        sub.save()
+        self._set_status(self.get_object(), 'CANCELLED')
         return Response({'status': 'Subscription cancelled'})
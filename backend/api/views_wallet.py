@@ -0,0 +1,50 @@
+from decimal import InvalidOperation
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status, permissions
+from .models import WalletEntry
+from .renderers import StandardResponseRenderer
+from .services import wallet
+from .views_picker import IsStaffOrAdmin
+
+RECENT_ENTRIES = 20
+
+
+class WalletView(APIView):
+    """Current balance and the most recent ledger entries."""
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [StandardResponseRenderer]
+
+    def get(self, request):
+        entries = WalletEntry.objects.filter(user=request.user).order_by('-created_at', '-id').values(
+            'kind', 'amount', 'balance_after', 'order_id', 'reference', 'created_at',
+        )[:RECENT_ENTRIES]
+        return Response({
+            'balance': wallet.current_balance(request.user),
+            'entries': list(entries),
+        })
+
+
+class WalletBulkCreditView(APIView):
+    """
+    Campaign cashback: {"credits": {"<user_id>": amount, ...}, "reference": "..."}.
+    Applied with one UPDATE per chunk, not one save per user.
+    """
+    permission_classes = [IsStaffOrAdmin]
+    renderer_classes = [StandardResponseRenderer]
+
+    def post(self, request):
+        credits = request.data.get('credits')
+        if not isinstance(credits, dict) or not credits:
+            return Response({'error': 'credits must be a non-empty object'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            amounts = {int(user_id): amount for user_id, amount in credits.items()}
+            created = wallet.bulk_credit(
+                amounts,
+                kind=request.data.get('kind', 'CASHBACK'),
+                reference=str(request.data.get('reference', ''))[:100],
+            )
+        except (TypeError, ValueError, InvalidOperation) as e:
+            return Response({'error': str(e) or 'Invalid amount'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'success': True, 'credited': created})
@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from .models import Wishlist, Product
 from .serializers import WishlistSerializer
+from .fast_serializers import serialize_wishlist
 
 class WishlistViewSet(viewsets.ModelViewSet):
     serializer_class = WishlistSerializer
@@ -12,6 +13,10 @@ class WishlistViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Wishlist.objects.filter(user=self.request.user).order_by('-created_at')
 
+    def list(self, request, *args, **kwargs):
+        # Fast path: same shape as WishlistSerializer, built from .values() rows
+        return Response(serialize_wishlist(self.get_queryset(), request=request))
+
     def perform_create(self, serializer):
         # Allow creating by just passing product_id
         # Check if already exists
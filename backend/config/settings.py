@@ -119,12 +119,25 @@ REST_FRAMEWORK = {
     }
 }
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+# Cache version keys (catalog pages, price table, search index, coupons,
+# delivery zones) must be shared by every worker and management command,
+# or an invalidation only reaches the process that made it. Set REDIS_URL
+# in production; the local-memory fallback is per process.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+        }
     }
-}
 
 from datetime import timedelta
 SIMPLE_JWT = {
@@ -140,3 +153,74 @@ WC_CONSUMER_SECRET = os.environ.get('WC_CONSUMER_SECRET', '')
 WC_API_URL = os.environ.get('WC_API_URL', 'https://www.organicsabziwala.com/wp-json/wc/v3/')
 
 PRODUCT_BACKEND = os.environ.get('PRODUCT_BACKEND', 'local')
+
+# Serialized product list pages are cached per catalog version (see api/services/catalog_cache.py).
+# Without a shared cache other workers never see a version bump, so pages and in-process
+# structures (price table, search index, coupon registry, delivery zones) age out instead.
+CATALOG_CACHE_TIMEOUT = int(os.environ.get('CATALOG_CACHE_TIMEOUT', 3600 if REDIS_URL else 60))
+LOCAL_CACHE_MAX_AGE = int(os.environ.get('LOCAL_CACHE_MAX_AGE', 0 if REDIS_URL else 60))
+PRODUCT_LIST_MAX_PAGE_SIZE = int(os.environ.get('PRODUCT_LIST_MAX_PAGE_SIZE', 100))
+PRODUCT_BATCH_MAX_IDS = int(os.environ.get('PRODUCT_BATCH_MAX_IDS', 100))
+ORDER_HISTORY_PAGE_SIZE = int(os.environ.get('ORDER_HISTORY_PAGE_SIZE', 20))
+ORDER_HISTORY_MAX_PAGE_SIZE = int(os.environ.get('ORDER_HISTORY_MAX_PAGE_SIZE', 100))
+ORDER_STATUS_BULK_MAX = int(os.environ.get('ORDER_STATUS_BULK_MAX', 5000))
+DEMAND_FORECAST_MAX_DAYS = int(os.environ.get('DEMAND_FORECAST_MAX_DAYS', 90))
+COUPON_MAX_STACK = int(os.environ.get('COUPON_MAX_STACK', 2))
+DELIVERY_CHECK_MAX_ZIPS = int(os.environ.get('DELIVERY_CHECK_MAX_ZIPS', 50))
+
+# Product search (see api/services/search_engine.py). Set PRODUCT_SEARCH_INDEX=False to use icontains.
+PRODUCT_SEARCH_INDEX = os.environ.get('PRODUCT_SEARCH_INDEX', 'True').lower() == 'true'
+SEARCH_ALIASES = {
+    'palak': ['spinach'],
+    'tamatar': ['tomato'],
+    'aloo': ['potato'],
+    'pyaz': ['onion'],
+    'bhindi': ['okra', 'ladyfinger'],
+    'gobhi': ['cauliflower', 'cabbage'],
+    'adrak': ['ginger'],
+    'lahsun': ['garlic'],
+    'dhaniya': ['coriander'],
+    'nimbu': ['lemon'],
+}
+
+# StandardResponseRenderer encodes with orjson when installed; set FAST_JSON_RENDERER=False to force the stdlib path
+FAST_JSON_RENDERER = os.environ.get('FAST_JSON_RENDERER', 'True').lower() == 'true'
+
+# Stale-while-revalidate cache in front of the WooCommerce product adapter (seconds)
+WC_CACHE_ENABLED = os.environ.get('WC_CACHE_ENABLED', 'True').lower() == 'true'
+WC_CACHE_FRESH_TTL = int(os.environ.get('WC_CACHE_FRESH_TTL', 60))
+WC_CACHE_STALE_TTL = int(os.environ.get('WC_CACHE_STALE_TTL', 600))
+
+# Seconds a coalesced proxy/products/ response is reused (api/services/single_flight.py)
+PROXY_COALESCE_TTL = float(os.environ.get('PROXY_COALESCE_TTL', 5))
+
+# Shared outbound HTTP client (api/services/http_client.py)
+HTTP_CLIENT = {
+    'CONNECT_TIMEOUT': float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05)),
+    'READ_TIMEOUT': float(os.environ.get('HTTP_READ_TIMEOUT', 15)),
+    'RETRIES': 2,
+    'BACKOFF': 0.2,
+    'POOL_SIZE': 20,
+    'FAILURE_THRESHOLD': 5,
+    'RESET_TIMEOUT': 30,
+}
+
+# Order sync outbox worker (api/services/order_sync.py, manage.py sync_orders_worker)
+ORDER_SYNC = {
+    'BATCH_SIZE': int(os.environ.get('ORDER_SYNC_BATCH_SIZE', 20)),
+    'WORKERS': int(os.environ.get('ORDER_SYNC_WORKERS', 4)),
+    'MAX_ATTEMPTS': 8,
+    'BACKOFF': 5.0,
+    'MAX_BACKOFF': 1800.0,
+    'LEASE': 120.0,
+}
+
+# Idempotency-Key handling for order placement / payment webhooks (api/idempotency.py).
+# Duplicates may land on any worker, so the cache store is only the default when the cache is shared.
+IDEMPOTENCY = {
+    'STORE': os.environ.get('IDEMPOTENCY_STORE', 'cache' if REDIS_URL else 'db'),  # 'cache' or 'db'
+    'TTL': int(os.environ.get('IDEMPOTENCY_TTL', 24 * 3600)),
+    'WAIT_TIMEOUT': 10.0,
+    'LOCK_TIMEOUT': 60.0,
+    'POLL_INTERVAL': 0.05,
+}
@@ -1,11 +1,11 @@
 import os
 import django
-import requests
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
 from django.conf import settings
+from api.services.http_client import get_client
 from api.models import Product, Category, UnitOfMeasure, Order, OrderItem, Subscription, Wishlist
 from django.utils.text import slugify
 from django.core.files.base import ContentFile
@@ -16,7 +16,7 @@ def sync_products():
     auth = (settings.WC_CONSUMER_KEY, settings.WC_CONSUMER_SECRET)
     
     # Fetch all (pagination needed in real world, fetching 100 for now)
-    response = requests.get(url, auth=auth, params={'per_page': 100})
+    response = get_client().get(url, auth=auth, params={'per_page': 100})
     
     if response.status_code != 200:
         print(f"Failed to fetch: {response.status_code} - {response.text}")
@@ -61,7 +61,7 @@ def sync_products():
             img_url = p_data['images'][0]['src']
             try:
                 print(f"Downloading image for {name}...")
-                img_resp = requests.get(img_url, timeout=10)
+                img_resp = get_client().get(img_url, timeout=10)
                 if img_resp.status_code == 200:
                     from django.core.files.base import ContentFile
                     image_content = ContentFile(img_resp.content)
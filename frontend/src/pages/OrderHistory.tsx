@@ -23,19 +23,28 @@ const OrderHistory = () => {
     const navigate = useNavigate();
     const [orders, setOrders] = useState<Order[]>([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
-    useEffect(() => {
-        client.get('orders/history/')
+    const loadPage = (cursor: string) =>
+        client.get('orders/history/', { params: { cursor } })
             .then(res => {
-                setOrders(res.data.data || res.data); // Handle wrapper
-                setLoading(false);
+                const page = res.data.data || res.data; // Handle wrapper
+                setOrders(prev => (cursor ? [...prev, ...page.results] : page.results));
+                setNextCursor(page.next_cursor);
             })
-            .catch(err => {
-                console.error(err);
-                setLoading(false);
-            });
+            .catch(err => console.error(err));
+
+    useEffect(() => {
+        loadPage('').finally(() => setLoading(false));
     }, []);
 
+    const loadMore = () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        loadPage(nextCursor).finally(() => setLoadingMore(false));
+    };
+
     if (loading) return <div className="p-10 text-center">Loading Orders...</div>;
 
     return (
@@ -103,6 +112,15 @@ const OrderHistory = () => {
                         </div>
                     ))
                 )}
+                {nextCursor && (
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="w-full py-3 text-green-600 dark:text-green-400 font-bold text-sm disabled:opacity-50"
+                    >
+                        {loadingMore ? 'Loading...' : 'Load older orders'}
+                    </button>
+                )}
             </main>
         </div>
     );